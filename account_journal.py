@@ -0,0 +1,201 @@
+import base64
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from structured_log import get_logger
+
+log = get_logger("journal")
+
+# Every segment starts with this magic so readers can reject foreign files
+SEGMENT_MAGIC = b"PFJ1"
+
+# Record header: payload length (u32), slot (u64), account pubkey (32 raw bytes)
+RECORD_HEADER = struct.Struct('<IQ32s')
+
+# Rotate to a new segment once the current one passes this size
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+# Kept under data/ (ignored by git) so it cannot shadow the account_journal module
+DEFAULT_JOURNAL_DIR = os.path.join("data", "account_journal")
+
+
+# Segment files are named by sequence number so lexical order is replay order
+def _segment_path(directory, index):
+    return os.path.join(directory, f"segment-{index:06d}.bin")
+
+
+def _segment_indexes(directory):
+    indexes = []
+    for name in os.listdir(directory):
+        if name.startswith("segment-") and name.endswith(".bin"):
+            indexes.append(int(name[len("segment-"):-len(".bin")]))
+    return sorted(indexes)
+
+
+# Walk the records of a mapped segment: (payload offset, length, slot, pubkey) for each complete one
+def _scan_records(mm):
+    offset = len(SEGMENT_MAGIC)
+    end = len(mm)
+    header_size = RECORD_HEADER.size
+    while offset + header_size <= end:
+        length, slot, pubkey = RECORD_HEADER.unpack_from(mm, offset)
+        start = offset + header_size
+        if start + length > end:
+            return
+        yield start, length, slot, pubkey
+        offset = start + length
+
+
+# Cut a segment back to the end of its last complete record before appending to it
+def _truncate_torn_tail(path):
+    """Return the number of bytes removed; a segment shorter than the magic is emptied."""
+    with open(path, 'r+b') as f:
+        size = os.fstat(f.fileno()).st_size
+        valid = 0
+        if size > len(SEGMENT_MAGIC):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                    raise ValueError(f"Not an account journal segment: {path}")
+                valid = len(SEGMENT_MAGIC)
+                for start, length, _, _ in _scan_records(mm):
+                    valid = start + length
+        if valid < size:
+            f.truncate(valid)
+    return size - valid
+
+
+# Length-prefixed binary journal of account snapshots
+class AccountJournal:
+    """
+    Append-only journal of (slot, pubkey, raw account bytes) records.
+
+    Records are written as a fixed 44-byte header followed by the raw payload,
+    so there is no base64 or JSON on the write path. Segments rotate once they
+    exceed `segment_bytes`; only the open segment is ever written to. On
+    open, a torn record left at the end of the last segment by a crash is
+    truncated away, so new records are never appended behind a partial one.
+    """
+
+    def __init__(self, directory=DEFAULT_JOURNAL_DIR, segment_bytes=DEFAULT_SEGMENT_BYTES, buffer_size=1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.buffer_size = buffer_size
+        os.makedirs(directory, exist_ok=True)
+        indexes = _segment_indexes(directory)
+        self._index = indexes[-1] if indexes else 0
+        self._file = None
+        self._size = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        path = _segment_path(self.directory, self._index)
+        if os.path.exists(path):
+            removed = _truncate_torn_tail(path)
+            if removed:
+                log.warning("truncated torn record at segment tail", path=path, bytes=removed)
+        self._file = open(path, 'ab', buffering=self.buffer_size)
+        self._size = self._file.tell()
+        if self._size == 0:
+            self._file.write(SEGMENT_MAGIC)
+            self._size = len(SEGMENT_MAGIC)
+
+    def _rotate(self):
+        self._file.close()
+        self._index += 1
+        self._open_segment()
+
+    def append(self, slot, pubkey, data):
+        """Append one account snapshot. `pubkey` is the 32-byte raw key."""
+        if self._size >= self.segment_bytes:
+            self._rotate()
+        self._file.write(RECORD_HEADER.pack(len(data), slot, pubkey))
+        self._file.write(data)
+        self._size += RECORD_HEADER.size + len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# Replay records from a single segment through an mmap
+def read_segment(path):
+    """
+    Yield (slot, pubkey, payload) for every complete record in a segment.
+
+    The segment is mapped rather than read, so only the pages actually
+    touched are paged in. A torn record at the tail (crash mid-write) is ignored.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= len(SEGMENT_MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                raise ValueError(f"Not an account journal segment: {path}")
+            for start, length, slot, pubkey in _scan_records(mm):
+                yield slot, pubkey, mm[start:start + length]
+
+
+# Replay every segment in order
+def iter_journal(directory=DEFAULT_JOURNAL_DIR):
+    """Yield (slot, pubkey, payload) across all segments in write order."""
+    for index in _segment_indexes(directory):
+        yield from read_segment(_segment_path(directory, index))
+
+
+# Legacy path kept only for the throughput comparison below
+def _legacy_store_decoded_data(decoded_data, filename):
+    try:
+        with open(filename, 'r') as f:
+            all_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        all_data = []
+    all_data.append(base64.b64encode(decoded_data).decode('utf-8'))
+    with open(filename, 'w') as f:
+        json.dump(all_data, f, indent=4)
+
+
+# Compare journal throughput with the old decoded_data.json rewrite
+def benchmark(count=2000, payload_size=150, workdir="journal_bench"):
+    """Print records/sec for the legacy JSON rewrite, journal append and mmap replay."""
+    os.makedirs(workdir, exist_ok=True)
+    payload = os.urandom(payload_size)
+    pubkey = os.urandom(32)
+
+    legacy_file = os.path.join(workdir, "decoded_data.json")
+    if os.path.exists(legacy_file):
+        os.remove(legacy_file)
+    start = time.perf_counter()
+    for _ in range(count):
+        _legacy_store_decoded_data(payload, legacy_file)
+    legacy_elapsed = time.perf_counter() - start
+
+    journal_dir = os.path.join(workdir, "journal")
+    if os.path.isdir(journal_dir):
+        for name in os.listdir(journal_dir):
+            os.remove(os.path.join(journal_dir, name))
+    journal = AccountJournal(journal_dir)
+    start = time.perf_counter()
+    for slot in range(count):
+        journal.append(slot, pubkey, payload)
+    journal.close()
+    journal_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    replayed = sum(1 for _ in iter_journal(journal_dir))
+    replay_elapsed = time.perf_counter() - start
+
+    print(f"legacy json rewrite: {count / legacy_elapsed:12.0f} records/s ({legacy_elapsed:.3f}s)")
+    print(f"journal append:      {count / journal_elapsed:12.0f} records/s ({journal_elapsed:.3f}s)")
+    print(f"journal mmap replay: {replayed / replay_elapsed:12.0f} records/s ({replay_elapsed:.3f}s)")
+    print(f"size on disk: legacy {os.path.getsize(legacy_file)} bytes, "
+          f"journal {sum(os.path.getsize(os.path.join(journal_dir, n)) for n in os.listdir(journal_dir))} bytes")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,36 @@
+import functools
+
+# Base58 (Bitcoin alphabet) encoding used for Solana public keys and signatures
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_B58_INDEX = {char: index for index, char in enumerate(B58_ALPHABET)}
+
+
+# Encode raw bytes as a base58 string
+def b58encode(data):
+    """Encode bytes (e.g. a 32-byte pubkey) to base58."""
+    data = bytes(data)
+    stripped = data.lstrip(b'\0')
+    num = int.from_bytes(stripped, 'big')
+    chars = []
+    while num:
+        num, rem = divmod(num, 58)
+        chars.append(B58_ALPHABET[rem])
+    return '1' * (len(data) - len(stripped)) + ''.join(reversed(chars))
+
+
+# Decode a base58 string back to raw bytes
+def b58decode(value):
+    """Decode a base58 string to bytes. Raises ValueError on invalid characters."""
+    num = 0
+    for char in value:
+        try:
+            num = num * 58 + _B58_INDEX[char]
+        except KeyError:
+            raise ValueError(f"Invalid base58 character: {char!r}") from None
+    stripped = value.lstrip('1')
+    body = num.to_bytes((num.bit_length() + 7) // 8, 'big')
+    return b'\0' * (len(value) - len(stripped)) + body
+
+
+# Pubkeys repeat constantly (programs, sysvars, hot mints), so memoize encoding
+b58encode_cached = functools.lru_cache(maxsize=65536)(b58encode)
@@ -1,34 +1,50 @@
 import asyncio
+import functools
 import json
 import base64
-import websockets
-import time
-import struct
-
-# Store decoded data to a file
-def store_decoded_data(decoded_data, filename='decoded_data.json'):
-    """Store decoded data into a JSON file."""
+import os
+import metrics
+from account_journal import DEFAULT_JOURNAL_DIR, AccountJournal
+from b58 import b58decode, b58encode
+from bonding_curve import bonding_curve_address, decode_bonding_curve
+from instruction_decoder import PUMP_FUN_DECODER, PUMP_FUN_IDL, CompiledInstruction
+from notifications import decode_program_notification
+from pipeline import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, Pipeline, Stage
+from structured_log import get_logger
+from token_index import QUERY_API_ENABLED, TokenIndex, start_query_server
+from ws_manager import ConnectionManager
+
+# Websocket endpoints to subscribe on at once (comma-separated), e.g. SOLANA_WSS_ENDPOINTS=wss://a,wss://b
+WSS_ENDPOINTS = os.environ.get("SOLANA_WSS_ENDPOINTS", "wss://api.mainnet-beta.solana.com").split(",")
+
+# Directory for the binary account-snapshot journal (data/account_journal)
+JOURNAL_DIR = DEFAULT_JOURNAL_DIR
+
+# Pipeline sizing: account updates are superseded by newer ones, so stale frames may be dropped
+DECODE_WORKERS = 1
+DECODE_QUEUE_SIZE = 10000
+DECODE_OVERFLOW = OVERFLOW_DROP_OLDEST
+JOURNAL_QUEUE_SIZE = 10000
+JOURNAL_OVERFLOW = OVERFLOW_BLOCK
+JOURNAL_BATCH_SIZE = 256
+STATS_INTERVAL = 30  # Seconds between queue depth / latency reports
+
+# Bonding curves kept in the in-memory token index (least recently updated evicted first)
+TOKEN_INDEX_CAPACITY = 50000
+
+log = get_logger("bot")
+
+# The bundled IDL's create definition, which PUMP_FUN_DECODER['create'] was compiled from
+PUMP_FUN_IDL_CREATE = next(ix for ix in PUMP_FUN_IDL['instructions'] if ix['name'] == 'create')
+
+# Store decoded data in the account journal
+def store_decoded_data(journal, slot, pubkey, decoded_data):
+    """Append the raw account bytes with their slot and pubkey to the binary journal."""
     try:
-        # Ensure the file exists or initialize it with an empty list if it's missing or empty
-        try:
-            with open(filename, 'r') as f:
-                all_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            # If file doesn't exist or is empty/corrupt, initialize with an empty list
-            all_data = []
-
-        # Base64 encode the raw binary data to store it in JSON format
-        base64_encoded_data = base64.b64encode(decoded_data).decode('utf-8')
-
-        # Append the base64-encoded data to the list
-        all_data.append(base64_encoded_data)
-
-        # Save the updated data back to the file
-        with open(filename, 'w') as f:
-            json.dump(all_data, f, indent=4)
-
+        journal.append(slot, b58decode(pubkey), decoded_data)
     except Exception as e:
-        print(f"Error storing decoded data: {e}")
+        metrics.inc("persist_errors")
+        log.error("error storing decoded data", pubkey=pubkey, slot=slot, error=repr(e))
 
 # Decode base64-encoded data into raw bytes
 def decode_base64_data(base64_data):
@@ -37,104 +53,104 @@ def decode_base64_data(base64_data):
         # Decode base64 into raw binary data
         decoded_data = base64.b64decode(base64_data)
 
-        # Print the first 50 bytes of the binary data for inspection
-        print(f"Decoded binary data (not UTF-8): {decoded_data[:50]}...")  # Print a part of the binary data
+        # The first 50 bytes for inspection, only formatted when debug logging is on
+        log.debug("decoded binary data", head=decoded_data[:50])
         return decoded_data  # Return raw binary data for further inspection
 
     except Exception as e:
-        print(f"Error decoding base64 data: {e}")
+        metrics.inc("decode_errors")
+        log.warning("error decoding base64 data", error=repr(e))
         return None
 
 # Decode the 'create' instruction from the transaction data
 def decode_create_instruction(ix_data, ix_def, accounts):
     """Decode the 'create' instruction from the transaction data."""
-    args = {}
-    offset = 8  # Skip 8-byte discriminator
-
-    for arg in ix_def['args']:
-        if arg['type'] == 'string':
-            length = struct.unpack_from('<I', ix_data, offset)[0]
-            offset += 4
-            value = ix_data[offset:offset+length].decode('utf-8')
-            offset += length
-        elif arg['type'] == 'publicKey':
-            value = base64.b64encode(ix_data[offset:offset+32]).decode('utf-8')
-            offset += 32
-        else:
-            raise ValueError(f"Unsupported type: {arg['type']}")
-
-        args[arg['name']] = value
-
-    # Add account keys to args
-    args['mint'] = str(accounts[0])
-    args['bondingCurve'] = str(accounts[2])
-    args['associatedBondingCurve'] = str(accounts[3])
-    args['user'] = str(accounts[7])
-
-    return args
+    # The bundled IDL is compiled once at import; any other definition is compiled for this call
+    compiled = PUMP_FUN_DECODER['create']
+    if ix_def is not None and ix_def['args'] != PUMP_FUN_IDL_CREATE['args']:
+        compiled = CompiledInstruction(ix_def)
+    return compiled.decode(ix_data, accounts)
+
+# Mint -> bonding-curve address, so the token index answers mint-keyed lookups
+def bonding_curve_for_mint(mint):
+    """Base58 curve address for a base58 mint; ValueError if `mint` is not a 32-byte key."""
+    raw = b58decode(mint)
+    if len(raw) != 32:
+        raise ValueError(f"Not a 32-byte address: {mint!r}")
+    return b58encode(bonding_curve_address(raw))
+
+# Pipeline stage: parse a programNotification, decode the account bytes and update the token index
+async def decode_stage(index, response):
+    # Typed one-pass decode; anything that is not a programNotification is rejected before parsing
+    notification = decode_program_notification(response)
+    if notification is None:
+        return None
 
-# Listen for pump transactions and decode 'create' instructions
-async def listen_for_pump_transactions():
-    wss_endpoint = "wss://api.mainnet-beta.solana.com"
-    subscription_message = json.dumps({
+    decoded_data = decode_base64_data(notification.data)
+    if decoded_data:
+        # Decode bonding-curve accounts; other pump.fun account types are stored raw
+        curve = decode_bonding_curve(decoded_data)
+        if curve:
+            log.debug("bonding curve", pubkey=notification.pubkey, slot=notification.slot, curve=curve)
+            if index is not None:
+                index.update(notification.pubkey, notification.slot, curve)
+        return notification.slot, notification.pubkey, decoded_data
+
+    log.warning("failed to decode the base64 data", pubkey=notification.pubkey)
+    return None
+
+# Pipeline stage: append a batch of snapshots to the journal
+async def journal_stage(journal, snapshots):
+    for slot, pubkey, decoded_data in snapshots:
+        store_decoded_data(journal, slot, pubkey, decoded_data)
+    journal.flush()
+
+# Build the receive -> decode -> journal pipeline
+def build_pipeline(journal, index=None):
+    return Pipeline([
+        Stage("decode", functools.partial(decode_stage, index), workers=DECODE_WORKERS, maxsize=DECODE_QUEUE_SIZE, overflow=DECODE_OVERFLOW),
+        Stage("journal", functools.partial(journal_stage, journal), maxsize=JOURNAL_QUEUE_SIZE,
+              overflow=JOURNAL_OVERFLOW, batch_size=JOURNAL_BATCH_SIZE),
+    ], stats_interval=STATS_INTERVAL)
+
+# The programSubscribe request for the pump.fun program
+def subscription_message():
+    return json.dumps({
         "jsonrpc": "2.0",
         "id": 1,
         "method": "programSubscribe",
         "params": [
             "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",  # pump.fun program address
-            {"encoding": "jsonParsed"}  # Use jsonParsed for more readable data
+            {"encoding": "base64"}  # Raw account bytes; pump.fun accounts are not jsonParsed anyway
         ]
     })
 
+# Called on every (re)connect of every endpoint
+async def subscribe_to_pump_program(websocket):
+    await websocket.send(subscription_message())
+    log.info("subscribed to pump.fun program updates", remote=websocket.remote_address)
+
+# Listen for pump transactions and decode 'create' instructions
+async def listen_for_pump_transactions():
+    journal = AccountJournal(JOURNAL_DIR)
+    index = TokenIndex(TOKEN_INDEX_CAPACITY, curve_for_mint=bonding_curve_for_mint)
+    pipeline = build_pipeline(journal, index)
+    # Local /metrics endpoint, only when PUMPFUN_METRICS is set
+    metrics_server = await metrics.start_http_server() if metrics.ENABLED else None
+    # Local token query API, only when PUMPFUN_INDEX_API is set (one fixed port per host)
+    query_server = await start_query_server(index) if QUERY_API_ENABLED else None
     try:
-        async with websockets.connect(wss_endpoint, timeout=60) as websocket:
-            await websocket.send(subscription_message)
-            print("Subscribed to program updates for pump.fun address.")
-
-            ping_interval = 20
-            last_ping_time = time.time()
-
-            while True:
-                try:
-                    current_time = time.time()
-                    if current_time - last_ping_time > ping_interval:
-                        await websocket.ping()
-                        last_ping_time = current_time
-                        print("Sending ping...")
-
-                    response = await websocket.recv()
-                    data = json.loads(response)
-                    print(f"Raw response: {json.dumps(data, indent=2)}")
-
-                    if 'method' in data and data['method'] == 'programNotification':
-                        program_data = data['params']['result']
-                        if 'value' in program_data:
-                            account_data = program_data['value']['account']['data']
-                            decoded_data = decode_base64_data(account_data[0])  # Only taking the first item in the list
-                            
-                            if decoded_data:
-                                # Process the decoded data further (Solana instruction data parsing)
-                                print(f"Decoded binary data: {decoded_data}")
-
-                                # You can optionally process the decoded data further based on its structure.
-                                # For example, decode specific Solana instructions if necessary.
-
-                                # Store the decoded data
-                                store_decoded_data(decoded_data)
-                            else:
-                                print("Failed to decode the base64 data.")
-
-                    else:
-                        print("No relevant update in response.")
-
-                except websockets.exceptions.ConnectionClosed as e:
-                    print(f"WebSocket connection closed: {e}. Reconnecting...")
-                    break
-                except Exception as e:
-                    print(f"Error receiving message: {e}")
-
-    except asyncio.TimeoutError as e:
-        print(f"Connection timed out: {e}")
+        # Fan-in across endpoints, deduplicated by (pubkey, slot); keepalive pings and reconnects are handled there
+        async with ConnectionManager(WSS_ENDPOINTS, subscribe_to_pump_program) as manager:
+            await pipeline.run(manager.recv)
+    finally:
+        if query_server is not None:
+            query_server.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        pipeline.close()
+        journal.close()
 
 # Run the listener
-asyncio.run(listen_for_pump_transactions())
+if __name__ == "__main__":
+    asyncio.run(listen_for_pump_transactions())
@@ -1,78 +1,112 @@
 import asyncio
-import websockets
+import functools
 import json
-import requests
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
 import os
+import metrics
+from frame_filter import FrameFilter, load_rules
+from mint_log_store import init_log_store
+from mint_resolver import DriverPool, MintResolver
+from pipeline import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL, Pipeline, Stage
+from pump_events import has_create_log, parse_logs_notification
+from seen_store import SeenStore, backfill_mints
+from startup_cache import check_cluster, chromedriver_path
+from structured_log import get_logger
+from ws_manager import ConnectionManager
 
 # Solana WebSocket endpoint
 SOCKET_URL = "wss://api.mainnet-beta.solana.com"
 
+# All endpoints to subscribe on at once (comma-separated), e.g. SOLANA_WSS_ENDPOINTS=wss://a,wss://b
+SOCKET_URLS = os.environ.get("SOLANA_WSS_ENDPOINTS", SOCKET_URL).split(",")
+
 # Mint Authority Public Key (this is the address of the mint authority you provided)
 MINT_AUTHORITY_PUBKEY = "TSLvdd1pWpHVjahSpsvCXUbgwsL3JAcvokwaKt1eokM"
 
 # Solana RPC endpoint for fetching transaction details
-RPC_URL = "https://api.mainnet-beta.solana.com"
-
-# Path for storing the minted token addresses
-JSON_LOG_FILE = "minted_tokens_log.json"
-
-# Initialize the JSON log file if it does not exist
-def init_json_log_file():
-    try:
-        with open(JSON_LOG_FILE, 'r') as f:
-            # Load existing logs if the file exists
-            logs = json.load(f)
-    except FileNotFoundError:
-        # If file does not exist, initialize it with an empty list
-        logs = []
-        with open(JSON_LOG_FILE, 'w') as f:
-            json.dump(logs, f)
-    return logs
-
-# Function to save minted token data to a JSON log file
-def save_minted_token_log(data, file_path):
-    # Load existing data from the log file
-    logs = init_json_log_file()
-
-    # Append new data
-    logs.append(data)
-
-    # Save the updated logs back to the file
-    with open(file_path, 'w') as f:
-        json.dump(logs, f, indent=4)
+RPC_URL = os.environ.get("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+
+# Path for storing the minted token addresses (append-only JSON Lines)
+LOG_STORE_FILE = "minted_tokens_log.jsonl"
+
+# Legacy JSON array log, migrated into the store on first start
+LEGACY_JSON_LOG_FILE = "minted_tokens_log.json"
+
+# Memory-mapped set of persisted signatures plus the last persisted slot, kept across restarts
+SEEN_STORE_FILE = "seen_signatures.bin"
+
+# Concurrent RPC lookups, and warm browsers kept for the explorer fallback
+MAX_CONCURRENT_LOOKUPS = 8
+BROWSER_POOL_SIZE = 2
+
+# Pipeline sizing: raw frames may be dropped under overload, resolved work spills to disk instead
+PARSE_QUEUE_SIZE = 10000
+PARSE_OVERFLOW = OVERFLOW_DROP_OLDEST
+RESOLVE_WORKERS = MAX_CONCURRENT_LOOKUPS
+RESOLVE_QUEUE_SIZE = 1000
+RESOLVE_OVERFLOW = OVERFLOW_SPILL
+SINK_QUEUE_SIZE = 1000
+SINK_OVERFLOW = OVERFLOW_BLOCK
+SINK_BATCH_SIZE = 50
+STATS_INTERVAL = 30  # Seconds between queue depth / latency reports
+
+# Optional JSON rule set for the raw-frame filter (creator blacklist, name/symbol regexes, minimum dev buy)
+FILTER_RULES_FILE = os.environ.get("PUMPFUN_FILTER_RULES")
+
+log = get_logger("webscrap")
+
+# Function to save minted token data to the log store
+def save_minted_token_log(data, log_writer):
+    # Queue the record; the batched writer appends and fsyncs it on its own thread
+    log_writer.append(data)
+
+# Record written to the log store for one detected mint
+def mint_record(signature, slot, mint_address):
+    return {
+        "transaction_url": f"https://explorer.solana.com/tx/{signature}?cluster=mainnet",
+        "mint_address": mint_address,
+        "timestamp": time.time(),  # Timestamp when the data was recorded
+        "signature": signature,
+        "slot": slot,
+    }
 
 # Setup the Selenium WebDriver
 def setup_driver():
+    # Selenium is only imported once the browser fallback actually starts a driver
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
     # Chrome options for running headlessly
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
-    
-    # Initialize the WebDriver
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    return driver
 
-# Function to scrape Solana Explorer for mint details using Selenium
-def scrape_mint_address(transaction_signature):
+    # Initialize the WebDriver with the cached chromedriver path
+    try:
+        return webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+    except SessionNotCreatedException:
+        # Chrome was updated past the cached driver: resolve a matching one and retry once
+        return webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=chrome_options)
+
+# Function to scrape Solana Explorer for mint details using a pooled Selenium driver
+def scrape_mint_address(driver, transaction_signature):
     """
     Scrapes the Solana Explorer for the mint address related to a specific transaction signature.
+
+    Runs on a DriverPool worker thread with that worker's long-lived driver; only
+    used when the RPC lookup finds nothing.
     """
+    from selenium.webdriver.common.by import By
+
     # Solana Explorer URL for the transaction
     transaction_url = f"https://explorer.solana.com/tx/{transaction_signature}?cluster=mainnet"
-    
-    # Setup Selenium WebDriver
-    driver = setup_driver()
-    driver.get(transaction_url)
 
     try:
+        driver.get(transaction_url)
+
         # Wait for the page to load dynamically (increase timeout if needed)
         driver.implicitly_wait(3)
 
@@ -88,12 +122,9 @@ def scrape_mint_address(transaction_signature):
                 mint_address = instruction_json['info']['mint']
                 return mint_address
         except json.JSONDecodeError:
-            print(f"Error parsing JSON for transaction {transaction_signature}")
+            log.warning("error parsing explorer JSON", signature=transaction_signature)
     except Exception as e:
-        print(f"Error scraping mint address for {transaction_signature}: {e}")
-    finally:
-        # Always close the driver after scraping
-        driver.quit()
+        log.warning("error scraping mint address", signature=transaction_signature, error=repr(e))
 
     return None
 
@@ -117,61 +148,105 @@ async def subscribe_to_mint_authority(ws):
     })
     
     await ws.send(subscribe_message)
-    print(f"Subscribed to logs for mint authority: {MINT_AUTHORITY_PUBKEY}")
+    log.info("subscribed to logs for mint authority", mint_authority=MINT_AUTHORITY_PUBKEY)
+
+# Pipeline stage: drop uninteresting frames on the raw text, then parse the rest into (signature, logs, slot)
+async def parse_stage(frame_filter, message):
+    with metrics.timed("filter_seconds"):
+        if not frame_filter.accept(message):
+            return None
+    return parse_logs_notification(message)
+
+# Pipeline stage: resolve the mint through the CreateEvent log, then RPC, then the warm browser pool
+async def resolve_stage(resolver, seen, item):
+    signature, logs, slot = item
+    # Persisted before a restart or reconnect: skip without a lookup
+    if seen is not None and signature in seen:
+        metrics.inc("seen_skipped")
+        return None
+    mint_address, is_new = await resolver.resolve(signature, logs)
+    if not is_new:
+        return None
+    if mint_address:
+        log.info("mint detected", signature=signature, mint=mint_address)
+
+        # Save the mint address and associated details to the log store
+        return mint_record(signature, slot, mint_address)
+    if has_create_log(logs):
+        metrics.inc("resolve_misses")
+        log.warning("no mint address found", signature=signature)
+    return None
+
+# Pipeline stage: hand a batch of records to the log writer
+async def sink_stage(log_writer, records):
+    for minted_token_data in records:
+        save_minted_token_log(minted_token_data, log_writer)
+
+# Build the receive -> parse -> resolve -> sink pipeline
+def build_pipeline(log_writer, resolver, frame_filter=None, seen=None):
+    frame_filter = frame_filter or FrameFilter(load_rules(FILTER_RULES_FILE))
+    return Pipeline([
+        Stage("parse", functools.partial(parse_stage, frame_filter), maxsize=PARSE_QUEUE_SIZE,
+              overflow=PARSE_OVERFLOW),
+        Stage("resolve", functools.partial(resolve_stage, resolver, seen), workers=RESOLVE_WORKERS,
+              maxsize=RESOLVE_QUEUE_SIZE, overflow=RESOLVE_OVERFLOW),
+        Stage("sink", functools.partial(sink_stage, log_writer), maxsize=SINK_QUEUE_SIZE,
+              overflow=SINK_OVERFLOW, batch_size=SINK_BATCH_SIZE),
+    ], stats_interval=STATS_INTERVAL)
 
 # Listen for mint transactions and handle them
-async def listen_for_mints():
+async def listen_for_mints(log_writer, resolver, seen=None):
     """
     Listens for mint transactions from the specified mint authority and extracts the minted token's public key.
+
+    The receive loop only enqueues raw frames; parsing, lookups and writes run in pipeline stages.
     """
-    async with websockets.connect(SOCKET_URL) as ws:
-        await subscribe_to_mint_authority(ws)
-        
-        while True:
-            try:
-                # Listen for incoming messages (transaction logs)
-                message = await ws.recv()
-                data = json.loads(message)
-
-                # Process the logs if they contain the required information
-                if 'params' in data and 'result' in data['params']:
-                    result = data['params']['result']
-                    if 'value' in result:
-                        logs = result['value'].get('logs', [])
-                        signature = result['value'].get('signature', None)
-                        err = result['value'].get('err', None)  # Get the 'err' field to check for errors
-
-                        if err is None and signature:
-                            for log in logs:
-                                if "Program log: Create" in log:
-                                    print(f"Signature: {signature}")
-                                    
-                                    # Scrape the transaction page for the mint address
-                                    mint_address = scrape_mint_address(signature)
-                                    if mint_address:
-                                        print(f"Mint Address: {mint_address}")
-
-                                        # Save the mint address and associated details to the JSON log
-                                        minted_token_data = {
-                                            "transaction_url": f"https://explorer.solana.com/tx/{signature}?cluster=mainnet",
-                                            "mint_address": mint_address,
-                                            "timestamp": time.time()  # Timestamp when the data was recorded
-                                        }
-                                        save_minted_token_log(minted_token_data, JSON_LOG_FILE)
-                                    else:
-                                        print(f"No mint address found for transaction {signature}")
-
-            except Exception as e:
-                print(f"Error receiving or processing message: {e}")
-                await asyncio.sleep(1)  # Handle error and retry
+    pipeline = build_pipeline(log_writer, resolver, seen=seen)
+    # Local /metrics endpoint, only when PUMPFUN_METRICS is set
+    metrics_server = await metrics.start_http_server() if metrics.ENABLED else None
+    backfill = None
+    try:
+        # Subscribed on every endpoint at once; first copy of each signature wins, reconnects are automatic
+        async with ConnectionManager(SOCKET_URLS, subscribe_to_mint_authority) as manager:
+            if seen is not None:
+                # Catch up on the gap since the last run while the live subscription runs
+                backfill = asyncio.ensure_future(backfill_mints(
+                    resolver, seen, MINT_AUTHORITY_PUBKEY,
+                    lambda signature, slot, mint_address: save_minted_token_log(
+                        mint_record(signature, slot, mint_address), log_writer)))
+            await pipeline.run(manager.recv)
+    finally:
+        if backfill is not None:
+            backfill.cancel()
+            await asyncio.gather(backfill, return_exceptions=True)
+        if metrics_server is not None:
+            metrics_server.close()
+        pipeline.close()
 
 # Main function to initialize the log file and start listening
 async def main():
-    # Initialize the JSON log file if needed
-    init_json_log_file()
-    
+    seen = SeenStore(SEEN_STORE_FILE)
+    # Open the log store, migrating the legacy JSON log if needed; signatures are marked seen once on disk
+    log_writer = init_log_store(LOG_STORE_FILE, LEGACY_JSON_LOG_FILE, on_persisted=seen.record_persisted)
+
+    # Batched RPC client with a browser pool fallback; drivers start on first use
+    resolver = MintResolver(
+        RPC_URL,
+        max_concurrency=MAX_CONCURRENT_LOOKUPS,
+        driver_pool=DriverPool(setup_driver, scrape_mint_address, size=BROWSER_POOL_SIZE),
+    )
+
+    # Cached genesis hash check; runs beside the subscription instead of in front of it
+    cluster_check = asyncio.ensure_future(check_cluster(resolver.rpc, RPC_URL))
+
     # Start listening for mints from the mint authority
-    await listen_for_mints()
+    try:
+        await listen_for_mints(log_writer, resolver, seen)
+    finally:
+        cluster_check.cancel()
+        await resolver.close()
+        log_writer.close()
+        seen.close()
 
 # Run the script
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Entry points are imported inside their handlers, so a command only pays for the backends it uses
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Listener commands the startup benchmark can launch
+LISTENERS = ("mints", "webscrap", "program")
+
+
+def _run_mints(args):
+    import newBot
+    asyncio.run(newBot.main())
+
+
+def _run_webscrap(args):
+    import botUsingWebScrap
+    asyncio.run(botUsingWebScrap.main())
+
+
+def _run_program(args):
+    import bot
+    asyncio.run(bot.listen_for_pump_transactions())
+
+
+def _run_runner(argv):
+    import runner
+    runner.main(argv)
+
+
+def _run_replay(argv):
+    import replay
+    replay.main(argv)
+
+
+def _run_index(argv):
+    import indexer
+    indexer.main(argv)
+
+
+# Commands whose arguments are parsed by the tool's own parser
+PASSTHROUGH = {"runner": _run_runner, "replay": _run_replay, "index": _run_index}
+
+
+# Resolve the slow startup facts ahead of time (e.g. in a deploy step)
+async def _warm(rpc_url, with_driver):
+    from rpc_client import RpcClient
+    from startup_cache import chromedriver_path, rpc_metadata
+
+    if with_driver:
+        try:
+            print(f"chromedriver: {await asyncio.to_thread(chromedriver_path, True)}")
+        except ImportError:
+            print("chromedriver: skipped (webdriver_manager not installed)")
+        except Exception as e:
+            print(f"chromedriver: failed ({e!r})")
+    rpc = RpcClient(rpc_url)
+    try:
+        print(f"rpc metadata: {await rpc_metadata(rpc, rpc_url, refresh=True)}")
+    finally:
+        await rpc.close()
+
+
+def _run_warm(args):
+    rpc_url = args.rpc_url or os.environ.get("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+    asyncio.run(_warm(rpc_url, not args.no_driver))
+
+
+# Time from process spawn until the listener's logsSubscribe/programSubscribe reaches a local endpoint
+async def startup_benchmark(targets=LISTENERS, runs=5, timeout=30.0):
+    from mock_rpc import MockRpcServer
+    from mock_ws_server import MockWebSocketServer
+
+    results = {}
+    async with MockRpcServer() as rpc:
+        for target in targets:
+            samples = []
+            for _ in range(runs):
+                with tempfile.TemporaryDirectory() as workdir:
+                    env = dict(os.environ, PYTHONPATH=REPO_DIR, PUMPFUN_CACHE_DIR=workdir, SOLANA_RPC_URL=rpc.url)
+                    async with MockWebSocketServer([]) as ws:
+                        env["SOLANA_WSS_ENDPOINTS"] = ws.url
+                        started = time.perf_counter()
+                        process = await asyncio.create_subprocess_exec(
+                            sys.executable, os.path.join(REPO_DIR, "cli.py"), target, cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                        try:
+                            while ws.first_subscribe_at is None and time.perf_counter() - started < timeout:
+                                if process.returncode is not None:
+                                    break
+                                await asyncio.sleep(0.001)
+                        finally:
+                            if process.returncode is None:
+                                process.terminate()
+                            await process.wait()
+                        if ws.first_subscribe_at is not None:
+                            samples.append(ws.first_subscribe_at - started)
+            results[target] = samples
+    return results
+
+
+def _run_startup_bench(args):
+    results = asyncio.run(startup_benchmark(args.targets or LISTENERS, args.runs))
+    for target, samples in results.items():
+        if not samples:
+            print(f"{target:10s} never subscribed")
+            continue
+        print(f"{target:10s} time to first subscription: min={min(samples) * 1000:7.1f}ms "
+              f"median={statistics.median(samples) * 1000:7.1f}ms ({len(samples)} runs)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="pump.fun listeners, tools and benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("mints", help="mint-authority logs listener (newBot.py)").set_defaults(handler=_run_mints)
+    sub.add_parser("webscrap", help="mint listener with the browser fallback (botUsingWebScrap.py)").set_defaults(
+        handler=_run_webscrap)
+    sub.add_parser("program", help="pump.fun program account listener (bot.py)").set_defaults(handler=_run_program)
+
+    sub.add_parser("runner", help="multi-process runner; arguments go to runner.py")
+    sub.add_parser("replay", help="record/replay tool; arguments go to replay.py")
+    sub.add_parser("index", help="historical create/buy/sell indexer; arguments go to indexer.py")
+
+    warm = sub.add_parser("warm", help="resolve and cache chromedriver and RPC metadata before the first start")
+    warm.add_argument("--rpc-url", help="default: $SOLANA_RPC_URL or mainnet-beta")
+    warm.add_argument("--no-driver", action="store_true", help="skip chromedriver resolution")
+    warm.set_defaults(handler=_run_warm)
+
+    bench = sub.add_parser("startup-bench", help="time from launch to first subscription against local mocks")
+    bench.add_argument("targets", nargs="*", metavar="target", help=f"any of {', '.join(LISTENERS)} (default: all)")
+    bench.add_argument("--runs", type=int, default=5)
+    bench.set_defaults(handler=_run_startup_bench)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in PASSTHROUGH:
+        PASSTHROUGH[argv[0]](argv[1:])
+        return
+
+    args = parser.parse_args(argv)
+    if args.command == "startup-bench" and not set(args.targets) <= set(LISTENERS):
+        parser.error(f"startup-bench targets must be among {', '.join(LISTENERS)}")
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import hashlib
+
+# Signing needs a constant-time C/Rust implementation: PyNaCl, or solders as a second choice.
+# The pure-Python RFC 8032 code below only handles public data (verification, curve checks).
+try:
+    import nacl.signing
+except ImportError:
+    nacl = None
+
+try:
+    from solders.keypair import Keypair as _SoldersKeypair
+except ImportError:
+    _SoldersKeypair = None
+
+BACKEND = "pynacl" if nacl is not None else "solders" if _SoldersKeypair is not None else None
+
+# Curve constants (RFC 8032, section 5.1)
+P = 2 ** 255 - 19
+L = 2 ** 252 + 27742317777372353535851937790883648493
+D = -121665 * pow(121666, P - 2, P) % P
+SQRT_M1 = pow(2, (P - 1) // 4, P)
+
+_G_Y = 4 * pow(5, P - 2, P) % P
+
+
+def _recover_x(y, sign):
+    if y >= P:
+        return None
+    x2 = (y * y - 1) * pow(D * y * y + 1, P - 2, P)
+    if x2 == 0:
+        return None if sign else 0
+    x = pow(x2, (P + 3) // 8, P)
+    if (x * x - x2) % P != 0:
+        x = x * SQRT_M1 % P
+    if (x * x - x2) % P != 0:
+        return None
+    if (x & 1) != sign:
+        x = P - x
+    return x
+
+
+# Points in extended homogeneous coordinates (X, Y, Z, T)
+def _point_add(a, b):
+    x1, y1, z1, t1 = a
+    x2, y2, z2, t2 = b
+    a_ = (y1 - x1) * (y2 - x2) % P
+    b_ = (y1 + x1) * (y2 + x2) % P
+    c = 2 * t1 * t2 * D % P
+    d = 2 * z1 * z2 % P
+    e, f, g, h = b_ - a_, d - c, d + c, b_ + a_
+    return e * f % P, g * h % P, f * g % P, e * h % P
+
+
+def _point_mul(scalar, point):
+    result = (0, 1, 1, 0)
+    while scalar:
+        if scalar & 1:
+            result = _point_add(result, point)
+        point = _point_add(point, point)
+        scalar >>= 1
+    return result
+
+
+def _point_equal(a, b):
+    x1, y1, z1, _ = a
+    x2, y2, z2, _ = b
+    return (x1 * z2 - x2 * z1) % P == 0 and (y1 * z2 - y2 * z1) % P == 0
+
+
+def _compress(point):
+    x, y, z, _ = point
+    z_inv = pow(z, P - 2, P)
+    x, y = x * z_inv % P, y * z_inv % P
+    return int.to_bytes(y | ((x & 1) << 255), 32, 'little')
+
+
+def _decompress(data):
+    if len(data) != 32:
+        return None
+    y = int.from_bytes(data, 'little')
+    sign = y >> 255
+    y &= (1 << 255) - 1
+    x = _recover_x(y, sign)
+    if x is None:
+        return None
+    return x, y, 1, x * y % P
+
+
+_BASE = (_recover_x(_G_Y, 0), _G_Y, 1, _recover_x(_G_Y, 0) * _G_Y % P)
+
+# 2^i * B for every bit, so fixed-base multiplications are additions only
+_BASE_POWERS = []
+_point = _BASE
+for _ in range(256):
+    _BASE_POWERS.append(_point)
+    _point = _point_add(_point, _point)
+del _point
+
+
+def _base_mul(scalar):
+    result = (0, 1, 1, 0)
+    i = 0
+    while scalar:
+        if scalar & 1:
+            result = _point_add(result, _BASE_POWERS[i])
+        scalar >>= 1
+        i += 1
+    return result
+
+
+def is_on_curve(public_key):
+    """True if the 32 bytes decode to a curve point; program-derived addresses must not."""
+    return _decompress(public_key) is not None
+
+
+# Program-derived addresses
+def find_program_address(seeds, program_id):
+    """Return (address, bump) for the first bump from 255 down that lands off the ed25519 curve."""
+    for bump in range(255, -1, -1):
+        candidate = hashlib.sha256(b"".join(seeds) + bytes([bump]) + program_id + b"ProgramDerivedAddress").digest()
+        if not is_on_curve(candidate):
+            return candidate, bump
+    raise ValueError("No viable bump seed")
+
+
+def _require_backend():
+    if BACKEND is None:
+        raise ImportError("Signing requires PyNaCl (pip install pynacl) or solders; the pure-Python "
+                          "Ed25519 code is not constant-time and is only used for verification")
+
+
+def public_key_from_seed(seed):
+    """32-byte public key for a 32-byte secret seed."""
+    return SigningKey(seed).public_key
+
+
+# Signing key with the backend chosen once
+class SigningKey:
+    """Ed25519 key from a 32-byte seed; `sign(message)` returns the 64-byte signature."""
+
+    def __init__(self, seed):
+        _require_backend()
+        if len(seed) != 32:
+            raise ValueError("Ed25519 seed must be 32 bytes")
+        self.seed = bytes(seed)
+        if nacl is not None:
+            self._nacl_key = nacl.signing.SigningKey(self.seed)
+            self._solders_key = None
+            self.public_key = bytes(self._nacl_key.verify_key)
+        else:
+            self._nacl_key = None
+            self._solders_key = _SoldersKeypair.from_seed(self.seed)
+            self.public_key = bytes(self._solders_key.pubkey())
+
+    def sign(self, message):
+        if self._nacl_key is not None:
+            return self._nacl_key.sign(bytes(message)).signature
+        return bytes(self._solders_key.sign_message(bytes(message)))
+
+
+def verify(public_key, message, signature):
+    """Check a signature (pure Python; used by the mock RPC, not on the hot path)."""
+    if len(signature) != 64:
+        return False
+    a = _decompress(public_key)
+    r = _decompress(signature[:32])
+    if a is None or r is None:
+        return False
+    s = int.from_bytes(signature[32:], 'little')
+    if s >= L:
+        return False
+    h = int.from_bytes(hashlib.sha512(signature[:32] + public_key + message).digest(), 'little') % L
+    return _point_equal(_base_mul(s), _point_add(r, _point_mul(h, a)))
@@ -0,0 +1,238 @@
+import base64
+import binascii
+import json
+import re
+import struct
+import sys
+import time
+
+import metrics
+from b58 import b58encode
+from instruction_decoder import PUMP_FUN_DECODER
+from pump_events import CREATE_LOG_MARKER, PROGRAM_DATA_PREFIX, has_create_log, parse_logs_notification
+
+# Base64 of the first 6 discriminator bytes: 8 characters that prefix every such "Program data:" payload
+CREATE_EVENT_PREFIX = base64.b64encode(PUMP_FUN_DECODER.events['CreateEvent'].discriminator[:6]).decode()
+TRADE_EVENT_PREFIX = base64.b64encode(PUMP_FUN_DECODER.events['TradeEvent'].discriminator[:6]).decode()
+
+# A frame must contain one of these to be a pump.fun create at all
+DEFAULT_REQUIRED_PATTERNS = (
+    PROGRAM_DATA_PREFIX + CREATE_EVENT_PREFIX,
+    CREATE_LOG_MARKER,
+)
+
+# Successful transactions carry a null err (RPC nodes emit compact JSON)
+_ERR_OK_PATTERNS = ('"err":null', '"err": null')
+
+_EVENT_DATA_RE = re.compile(
+    re.escape(PROGRAM_DATA_PREFIX) + f"((?:{re.escape(CREATE_EVENT_PREFIX)}|{re.escape(TRADE_EVENT_PREFIX)})"
+    + r"[A-Za-z0-9+/]*={0,2})"
+)
+
+REJECT_REASONS = ("no_match", "failed", "creator_blacklisted", "name_denied", "symbol_denied", "initial_buy_too_small")
+
+
+# Filter configuration
+class FilterRules:
+    """
+    What the filter lets through.
+
+    `require_any`: literal patterns of which at least one must occur in the raw frame.
+    `reject_failed`: drop transactions whose err is not null.
+    `creator_blacklist`: base58 creator wallets to drop.
+    `name_deny` / `symbol_deny`: regexes; a matching token name/symbol is dropped.
+    `min_initial_buy_lamports`: the creator's buy in the create transaction must reach this.
+    """
+
+    def __init__(self, require_any=DEFAULT_REQUIRED_PATTERNS, reject_failed=True, creator_blacklist=(),
+                 name_deny=(), symbol_deny=(), min_initial_buy_lamports=0):
+        self.require_any = tuple(require_any)
+        self.reject_failed = reject_failed
+        self.creator_blacklist = frozenset(creator_blacklist)
+        self.name_deny = tuple(name_deny)
+        self.symbol_deny = tuple(symbol_deny)
+        self.min_initial_buy_lamports = min_initial_buy_lamports
+
+    @classmethod
+    def from_dict(cls, config):
+        return cls(
+            require_any=config.get("require_any", DEFAULT_REQUIRED_PATTERNS),
+            reject_failed=config.get("reject_failed", True),
+            creator_blacklist=config.get("creator_blacklist", ()),
+            name_deny=config.get("name_deny", ()),
+            symbol_deny=config.get("symbol_deny", ()),
+            min_initial_buy_lamports=int(config.get("min_initial_buy_sol", 0) * 1_000_000_000),
+        )
+
+
+def load_rules(path=None):
+    """FilterRules from a JSON file, or the defaults (creates only, successful only) when `path` is None."""
+    if path is None:
+        return FilterRules()
+    with open(path, 'r', encoding='utf-8') as f:
+        return FilterRules.from_dict(json.load(f))
+
+
+# Raw-frame filter: substring checks first, event decode only for the survivors
+class FrameFilter:
+    """
+    Accepts or rejects a raw logsNotification frame (str or bytes) without JSON parsing.
+
+    Stage 1 is one precompiled-regex scan for the required patterns and a
+    substring check for a null `err`; almost all traffic stops here.
+    Stage 2 runs only when creator, name/symbol or initial-buy rules are
+    set: it pulls the CreateEvent/TradeEvent "Program data:" payloads out
+    with one precompiled regex and decodes just those. `stats()` reports
+    accepted frames and rejections per reason.
+    """
+
+    def __init__(self, rules=None):
+        self.rules = rules or FilterRules()
+        # One precompiled alternation scans the frame once for all required patterns
+        alternation = "|".join(re.escape(pattern) for pattern in self.rules.require_any)
+        self._required = {str: re.compile(alternation).search, bytes: re.compile(alternation.encode()).search}
+        self._err_ok = {str: _ERR_OK_PATTERNS, bytes: tuple(p.encode() for p in _ERR_OK_PATTERNS)}
+        self._name_deny = [re.compile(pattern) for pattern in self.rules.name_deny]
+        self._symbol_deny = [re.compile(pattern) for pattern in self.rules.symbol_deny]
+        self._needs_events = bool(self.rules.creator_blacklist or self._name_deny or self._symbol_deny
+                                  or self.rules.min_initial_buy_lamports)
+        self.examined = 0
+        self.accepted = 0
+        self.rejected = dict.fromkeys(REJECT_REASONS, 0)
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        metrics.inc(f"filter_rejected_{reason}")
+        return False
+
+    def __call__(self, frame):
+        return self.accept(frame)
+
+    def accept(self, frame):
+        self.examined += 1
+        kind = bytes if isinstance(frame, (bytes, bytearray)) else str
+        if self._required[kind](frame) is None:
+            return self._reject("no_match")
+        if self.rules.reject_failed and not any(pattern in frame for pattern in self._err_ok[kind]):
+            return self._reject("failed")
+        if self._needs_events:
+            reason = self._check_events(frame.decode('utf-8', 'replace') if kind is bytes else frame)
+            if reason is not None:
+                return self._reject(reason)
+        self.accepted += 1
+        metrics.inc("filter_accepted")
+        return True
+
+    def _check_events(self, frame):
+        create = None
+        initial_buy = 0
+        trades = []
+        for match in _EVENT_DATA_RE.finditer(frame):
+            try:
+                event = PUMP_FUN_DECODER.decode_event(base64.b64decode(match.group(1)))
+            except (binascii.Error, ValueError, struct.error):
+                continue
+            if event is None:
+                continue
+            name, fields = event
+            if name == 'CreateEvent' and create is None:
+                create = fields
+            elif name == 'TradeEvent':
+                trades.append(fields)
+        if create is None:
+            # Only rule-checkable once the CreateEvent is visible; logs were truncated or it is not a create
+            return "no_match"
+        if create['user'] in self.rules.creator_blacklist:
+            return "creator_blacklisted"
+        if any(pattern.search(create['name']) for pattern in self._name_deny):
+            return "name_denied"
+        if any(pattern.search(create['symbol']) for pattern in self._symbol_deny):
+            return "symbol_denied"
+        if self.rules.min_initial_buy_lamports:
+            for trade in trades:
+                if trade['isBuy'] and trade['user'] == create['user'] and trade['mint'] == create['mint']:
+                    initial_buy += trade['solAmount']
+            if initial_buy < self.rules.min_initial_buy_lamports:
+                return "initial_buy_too_small"
+        return None
+
+    def stats(self):
+        return {"examined": self.examined, "accepted": self.accepted, "rejected": dict(self.rejected)}
+
+
+# Synthetic traffic: mostly trades, some failed transactions, a few creates with a dev buy
+def _borsh_string(value):
+    raw = value.encode('utf-8')
+    return struct.pack('<I', len(raw)) + raw
+
+
+def _create_event(name, symbol, mint, curve, user):
+    return (PUMP_FUN_DECODER.events['CreateEvent'].discriminator + _borsh_string(name) + _borsh_string(symbol)
+            + _borsh_string("https://ipfs.io/ipfs/QmYwAPJzv5CZsnAzt8auVZRn5W2xrMBy7j6k2BX2FKdoNJ") + mint + curve + user)
+
+
+def _trade_event(mint, sol_amount, is_buy, user):
+    return (PUMP_FUN_DECODER.events['TradeEvent'].discriminator + mint
+            + struct.pack('<QQ?', sol_amount, 35_000_000_000, is_buy) + user
+            + struct.pack('<qQQ', 1_700_000_000, 30_000_000_000, 1_073_000_000_000_000))
+
+
+def _synthetic_frames(count, create_every=20, failed_every=9):
+    frames = []
+    for i in range(count):
+        mint, curve, user = bytes([i % 251]) * 32, bytes([(i + 1) % 251]) * 32, bytes([(i + 2) % 251]) * 32
+        logs = ["Program ComputeBudget111111111111111111111111111111 invoke [1]",
+                "Program ComputeBudget111111111111111111111111111111 success",
+                "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P invoke [1]"]
+        if i % create_every == 0:
+            logs += ["Program log: Instruction: Create",
+                     PROGRAM_DATA_PREFIX + base64.b64encode(
+                         _create_event(f"Token {i}", "SCAM" if i % 3 == 0 else f"T{i}", mint, curve, user)).decode(),
+                     "Program log: Instruction: Buy",
+                     PROGRAM_DATA_PREFIX + base64.b64encode(
+                         _trade_event(mint, (i % 7) * 250_000_000, True, user)).decode()]
+        else:
+            logs += ["Program log: Instruction: Buy",
+                     PROGRAM_DATA_PREFIX + base64.b64encode(_trade_event(mint, 10_000_000, True, user)).decode()]
+        logs += ["Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P consumed 60000 of 200000 compute units",
+                 "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P success"]
+        frames.append(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "logsNotification",
+            "params": {"result": {"context": {"slot": 300_000_000 + i}, "value": {
+                "signature": b58encode(bytes([i % 256, i // 256 % 256]) * 32),
+                "err": {"InstructionError": [2, {"Custom": 6002}]} if i % failed_every == 0 else None,
+                "logs": logs,
+            }}, "subscription": 1},
+        }, separators=(',', ':')))
+    return frames
+
+
+# Per-frame cost: parse-then-scan (current listeners) vs filter-then-parse
+def benchmark(path=None, count=50000, rules=None):
+    if path is not None:
+        from replay import read_recording
+        frames = [frame for _, frame in read_recording(path)]
+    else:
+        frames = _synthetic_frames(count)
+        rules = rules or FilterRules(symbol_deny=[r"^SCAM$"], min_initial_buy_lamports=500_000_000)
+
+    def parse_then_scan(frame):
+        parsed = parse_logs_notification(frame)
+        return parsed is not None and has_create_log(parsed[1])
+
+    frame_filter = FrameFilter(rules)
+
+    def filter_then_parse(frame):
+        return frame_filter.accept(frame) and parse_logs_notification(frame) is not None
+
+    for name, run in (("parse, then scan logs", parse_then_scan), ("raw filter, then parse", filter_then_parse)):
+        start = time.perf_counter()
+        kept = sum(1 for frame in frames if run(frame))
+        elapsed = time.perf_counter() - start
+        print(f"{name:24s} {elapsed * 1e6 / len(frames):7.2f} us/frame, {kept} of {len(frames)} kept")
+    print(f"filter stats: {frame_filter.stats()}")
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
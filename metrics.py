@@ -0,0 +1,222 @@
+import asyncio
+import os
+import threading
+import time
+
+# Metrics are off unless PUMPFUN_METRICS is set; every hot-path hook checks this flag first
+ENABLED = os.environ.get("PUMPFUN_METRICS", "") not in ("", "0")
+
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = int(os.environ.get("PUMPFUN_METRICS_PORT", "9108"))
+
+# Log-linear bucket layout: exact below 128ns, then 64 sub-buckets per power of two (~1.5% error)
+_LINEAR_LIMIT = 128
+_SUB_BUCKETS = 64
+_MAX_SHIFT = 40
+_BUCKET_COUNT = _LINEAR_LIMIT + _MAX_SHIFT * _SUB_BUCKETS
+
+REPORTED_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def enable(enabled=True):
+    """Turn collection on or off at runtime (e.g. from a CLI flag)."""
+    global ENABLED
+    ENABLED = enabled
+
+
+def _bucket_index(value):
+    if value < _LINEAR_LIMIT:
+        return value if value > 0 else 0
+    shift = value.bit_length() - 7
+    if shift > _MAX_SHIFT:
+        return _BUCKET_COUNT - 1
+    return _LINEAR_LIMIT + (shift - 1) * _SUB_BUCKETS + (value >> shift) - _SUB_BUCKETS
+
+
+def _bucket_value(index):
+    """Midpoint of a bucket's value range."""
+    if index < _LINEAR_LIMIT:
+        return index
+    shift = (index - _LINEAR_LIMIT) // _SUB_BUCKETS + 1
+    top = (index - _LINEAR_LIMIT) % _SUB_BUCKETS + _SUB_BUCKETS
+    return (top << shift) + (1 << (shift - 1))
+
+
+# HDR-style histogram of durations in nanoseconds
+class Histogram:
+    """Fixed-memory latency histogram; record is O(1), quantiles are a single bucket walk."""
+
+    __slots__ = ('name', 'help', 'counts', 'count', 'sum_ns', 'max_ns', '_lock')
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+        # Recorded from the event loop and from the log writer thread
+        self._lock = threading.Lock()
+
+    def record_ns(self, value, count=1):
+        with self._lock:
+            self.counts[_bucket_index(value)] += count
+            self.count += count
+            self.sum_ns += value * count
+            if value > self.max_ns:
+                self.max_ns = value
+
+    def record(self, seconds, count=1):
+        self.record_ns(int(seconds * 1e9), count)
+
+    def quantile_ns(self, q):
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(_bucket_value(index), self.max_ns)
+        return self.max_ns
+
+
+class Counter:
+    __slots__ = ('name', 'help', 'value', '_lock')
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.value = 0
+        # `+=` is a read-modify-write; without the lock increments from two threads can be lost
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+_histograms = {}
+_counters = {}
+_gauges = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name, help=""):
+    hist = _histograms.get(name)
+    if hist is None:
+        with _registry_lock:
+            hist = _histograms.get(name)
+            if hist is None:
+                hist = _histograms[name] = Histogram(name, help)
+    return hist
+
+
+def counter(name, help=""):
+    ctr = _counters.get(name)
+    if ctr is None:
+        with _registry_lock:
+            ctr = _counters.get(name)
+            if ctr is None:
+                ctr = _counters[name] = Counter(name, help)
+    return ctr
+
+
+def gauge(name, read_fn, help=""):
+    """Register a gauge whose value is read by calling `read_fn()` at scrape time."""
+    _gauges[name] = (read_fn, help)
+
+
+# Hot-path helpers: a single flag check when disabled
+def observe(name, seconds, count=1):
+    if ENABLED:
+        histogram(name).record(seconds, count)
+
+
+def inc(name, amount=1):
+    if ENABLED:
+        counter(name).inc(amount)
+
+
+class timed:
+    """Context manager recording the block's duration into histogram `name` when metrics are enabled."""
+
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns() if ENABLED else 0
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.started:
+            histogram(self.name).record_ns(time.perf_counter_ns() - self.started)
+        return False
+
+
+# Pipeline observer: per-stage queue wait and service time
+def observe_stage(stage_name, wait, service, count):
+    if ENABLED:
+        histogram(f"stage_{stage_name}_wait_seconds", f"Queue wait before the {stage_name} stage").record(wait, count)
+        histogram(f"stage_{stage_name}_service_seconds", f"Handler time in the {stage_name} stage").record(
+            service / count, count)
+
+
+# Prometheus text exposition format
+def render_text(prefix="pumpfun_"):
+    lines = []
+    with _registry_lock:
+        counters, histograms = sorted(_counters.items()), sorted(_histograms.items())
+    for name, ctr in counters:
+        metric = f"{prefix}{name}_total"
+        if ctr.help:
+            lines.append(f"# HELP {metric} {ctr.help}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {ctr.value}")
+    for name, (read_fn, help) in sorted(_gauges.items()):
+        metric = f"{prefix}{name}"
+        try:
+            value = read_fn()
+        except Exception:
+            continue
+        if help:
+            lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+    for name, hist in histograms:
+        metric = f"{prefix}{name}"
+        if hist.help:
+            lines.append(f"# HELP {metric} {hist.help}")
+        lines.append(f"# TYPE {metric} summary")
+        for q in REPORTED_QUANTILES:
+            lines.append(f'{metric}{{quantile="{q}"}} {hist.quantile_ns(q) / 1e9:.9f}')
+        lines.append(f"{metric}_sum {hist.sum_ns / 1e9:.9f}")
+        lines.append(f"{metric}_count {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+async def _handle_http(reader, writer):
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.split()
+        if len(parts) >= 2 and parts[1] in (b"/metrics", b"/"):
+            body = render_text().encode()
+            status = b"200 OK"
+        else:
+            body = b"not found\n"
+            status = b"404 Not Found"
+        writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+# Serve /metrics for Prometheus or curl
+async def start_http_server(host=DEFAULT_HTTP_HOST, port=DEFAULT_HTTP_PORT):
+    """Start the local text endpoint; returns the asyncio server."""
+    return await asyncio.start_server(_handle_http, host, port)
@@ -0,0 +1,251 @@
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+import metrics
+from structured_log import get_logger
+
+# Default location of the minted token log
+DEFAULT_LOG_FILE = "minted_tokens_log.jsonl"
+
+log = get_logger("store")
+
+
+# A crash mid-write leaves a partial last line; cut it so the next append starts on a fresh line
+def _truncate_torn_tail(path, chunk_size=65536):
+    """Return the number of bytes removed from the end of a JSONL file."""
+    try:
+        f = open(path, 'r+b')
+    except FileNotFoundError:
+        return 0
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        end = size
+        while end > 0:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end == size:
+            return 0
+        f.seek(end)
+        try:
+            # A complete record that only lacks its newline is kept
+            json.loads(f.read())
+        except ValueError:
+            f.truncate(end)
+            return size - end
+        f.write(b'\n')
+        return 0
+
+
+# Append-only JSON Lines backend: one record per line, never rewritten
+class JsonlLogStore:
+    """Append-only JSONL store. Each write is O(batch), independent of file size."""
+
+    def __init__(self, path):
+        self.path = path
+        removed = _truncate_torn_tail(path)
+        if removed:
+            log.warning("truncated torn record at log tail", path=path, bytes=removed)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write_batch(self, records):
+        """Append records and fsync so a crash never loses an acknowledged batch."""
+        self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def read_all(self):
+        """Yield every stored record, skipping a torn trailing line."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def close(self):
+        self._file.close()
+
+
+# SQLite backend: indexed by mint address and timestamp for lookups
+class SqliteLogStore:
+    """Indexed SQLite store. Batches are committed in a single transaction."""
+
+    def __init__(self, path):
+        self.path = path
+        # Shared by the BatchedLogWriter thread and callers reading through the store
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS minted_tokens ("
+            " id INTEGER PRIMARY KEY,"
+            " mint_address TEXT,"
+            " transaction_url TEXT,"
+            " timestamp REAL,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_minted_tokens_mint ON minted_tokens (mint_address)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_minted_tokens_ts ON minted_tokens (timestamp)")
+        self._conn.commit()
+
+    def write_batch(self, records):
+        """Insert records in one transaction (the commit fsyncs the WAL)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO minted_tokens (mint_address, transaction_url, timestamp, data) VALUES (?, ?, ?, ?)",
+                [
+                    (r.get('mint_address'), r.get('transaction_url'), r.get('timestamp'), json.dumps(r))
+                    for r in records
+                ],
+            )
+
+    def read_all(self):
+        """Yield every stored record in insertion order."""
+        # Fetched under the lock so a concurrent batch never interleaves with the cursor
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM minted_tokens ORDER BY id").fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def find_by_mint(self, mint_address):
+        """Return all records for a mint address using the index."""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM minted_tokens WHERE mint_address = ? ORDER BY id",
+                                      (mint_address,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Pick a backend from the file extension
+def open_log_store(path=DEFAULT_LOG_FILE):
+    """Open a JSONL store for .jsonl paths and a SQLite store for .db/.sqlite paths."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.db', '.sqlite', '.sqlite3'):
+        return SqliteLogStore(path)
+    if ext == '.jsonl':
+        return JsonlLogStore(path)
+    raise ValueError(f"Unsupported log store extension: {path}")
+
+
+# Batch writes on a background thread so the event loop never touches the disk
+class BatchedLogWriter:
+    """
+    Queues records and writes them to a store from a daemon thread.
+
+    `append` is O(1) and never blocks, so it is safe to call from the asyncio loop.
+    A batch is written once `batch_size` records are queued or `flush_interval`
+    seconds have passed since the first record of the batch. `on_persisted(batch)`
+    runs on the writer thread after each successful write.
+    """
+
+    _STOP = object()
+
+    def __init__(self, store, batch_size=100, flush_interval=0.5, on_persisted=None):
+        self.store = store
+        self.on_persisted = on_persisted
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="mint-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        self._queue.put(record)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            record = self._queue.get()
+            if record is self._STOP:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is self._STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            try:
+                with metrics.timed("persist_seconds"):
+                    self.store.write_batch(batch)
+                metrics.inc("persisted_records", len(batch))
+            except Exception as e:
+                metrics.inc("persist_errors")
+                log.error("error writing minted token records", count=len(batch), error=repr(e))
+                continue
+            if self.on_persisted is not None:
+                try:
+                    self.on_persisted(batch)
+                except Exception as e:
+                    log.error("error in on_persisted callback", count=len(batch), error=repr(e))
+
+    def close(self):
+        """Flush everything queued so far, then close the store."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self.store.close()
+
+
+# One-shot migration of a legacy JSON array log into a store
+def migrate_json_log(json_path, store, batch_size=1000):
+    """
+    Copy every record from a legacy JSON array file into `store`.
+
+    The source is renamed to `<json_path>.migrated` afterwards so the
+    migration runs only once. Returns the number of records copied.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        try:
+            records = json.load(f)
+        except json.JSONDecodeError:
+            records = []
+
+    for start in range(0, len(records), batch_size):
+        store.write_batch(records[start:start + batch_size])
+
+    os.replace(json_path, json_path + ".migrated")
+    return len(records)
+
+
+# Open the store, migrating a legacy JSON log first if one is still around
+def init_log_store(path=DEFAULT_LOG_FILE, legacy_json_path="minted_tokens_log.json", on_persisted=None):
+    """Return a BatchedLogWriter for `path`, importing `legacy_json_path` once if present."""
+    store = open_log_store(path)
+    if legacy_json_path and os.path.exists(legacy_json_path):
+        count = migrate_json_log(legacy_json_path, store)
+        log.info("migrated legacy log", count=count, source=legacy_json_path, target=path)
+    return BatchedLogWriter(store, on_persisted=on_persisted)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"usage: {sys.argv[0]} <legacy.json> <store.jsonl|store.db>")
+        sys.exit(1)
+
+    target = open_log_store(sys.argv[2])
+    try:
+        count = migrate_json_log(sys.argv[1], target)
+    finally:
+        target.close()
+    print(f"Migrated {count} records from {sys.argv[1]} to {sys.argv[2]}")
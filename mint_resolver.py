@@ -0,0 +1,174 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import metrics
+from pump_events import has_create_log, mint_from_logs, mint_from_transaction
+from rpc_client import RpcClient
+from structured_log import get_logger
+from ttl_cache import MISSING, TTLCache
+
+log = get_logger("resolver")
+
+# getTransaction attempts per lookup, and the delay before the first retry (doubled after each)
+RPC_ATTEMPTS = 4
+RPC_RETRY_DELAY = 0.25
+
+
+# Pool of warm browser drivers behind a worker queue
+class DriverPool:
+    """
+    Runs `scrape_fn(driver, signature)` on a fixed set of worker threads.
+
+    Each worker creates its driver once with `driver_factory()` on first use
+    and reuses it for every later job, so a lookup costs a page load rather
+    than a browser start. Jobs queue on the executor when all workers are busy.
+    """
+
+    def __init__(self, driver_factory, scrape_fn, size=2):
+        self._driver_factory = driver_factory
+        self._scrape_fn = scrape_fn
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix="driver")
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _scrape(self, signature):
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self._driver_factory()
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return self._scrape_fn(driver, signature)
+
+    async def scrape(self, signature):
+        return await asyncio.wrap_future(self._executor.submit(self._scrape, signature))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for driver in self._drivers:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    log.warning("error closing driver", error=repr(e))
+            self._drivers.clear()
+
+
+# Signature -> mint resolution shared by the listeners
+class MintResolver:
+    """
+    Resolves the mint created by a transaction signature.
+
+    Order of attempts: the signature cache, the CreateEvent in the
+    notification logs, getTransaction through the batching RpcClient, and
+    finally the optional browser pool. At most `max_concurrency` RPC/browser
+    lookups run at once, and concurrent requests for the same signature
+    share a single lookup.
+
+    Only definitive answers are cached: a mint, or a transaction (or logs)
+    that holds no create. RPC errors and transactions not yet visible at
+    "confirmed" are retried with backoff and, if still unresolved, left
+    uncached so a later notification or backfill looks again.
+    """
+
+    def __init__(self, rpc_url, max_concurrency=8, cache=None, rpc_client=None, driver_pool=None):
+        # rpc_url may be one URL or a list of endpoints to hedge across
+        self.rpc_url = rpc_url
+        self.cache = cache if cache is not None else TTLCache(maxsize=10000, ttl=600)
+        self.driver_pool = driver_pool
+        self._owns_rpc = rpc_client is None and bool(rpc_url)
+        self.rpc = rpc_client or (RpcClient(rpc_url) if rpc_url else None)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = {}
+
+    async def resolve(self, signature, logs=None):
+        """
+        Return (mint_address, is_new) for `signature`.
+
+        `is_new` is True only for the first caller to see the signature, so
+        duplicate notifications can be skipped without writing twice. When
+        `logs` are given and show no create at all, no lookup is made.
+        A None mint is only final if `settled(signature)` is True afterwards.
+        """
+        cached = self.cache.get(signature)
+        if cached is not MISSING:
+            metrics.inc("resolve_cache_hits")
+            return cached, False
+
+        pending = self._in_flight.get(signature)
+        if pending is not None:
+            mint_address, _ = await asyncio.shield(pending)
+            return mint_address, False
+
+        if logs is not None:
+            mint_address = mint_from_logs(logs)
+            if mint_address is not None or not has_create_log(logs):
+                metrics.inc("resolve_from_logs")
+                self.cache.put(signature, mint_address)
+                return mint_address, True
+
+        task = asyncio.ensure_future(self._lookup(signature))
+        self._in_flight[signature] = task
+        try:
+            mint_address, definitive = await asyncio.shield(task)
+        finally:
+            self._in_flight.pop(signature, None)
+        if definitive:
+            self.cache.put(signature, mint_address)
+        else:
+            metrics.inc("resolve_unresolved")
+        return mint_address, True
+
+    def settled(self, signature):
+        """True if a definitive answer (a mint or "no create") for `signature` is cached."""
+        return signature in self.cache
+
+    async def _lookup(self, signature):
+        # Returns (mint_address, definitive)
+        async with self._semaphore:
+            # rpc_url=None runs offline (e.g. replays): logs fast path and browser pool only
+            mint_address, definitive = await self.fetch_from_rpc(signature) if self.rpc is not None else (None, False)
+            if mint_address is None and self.driver_pool is not None:
+                try:
+                    with metrics.timed("resolve_browser_seconds"):
+                        mint_address = await self.driver_pool.scrape(signature)
+                except Exception as e:
+                    metrics.inc("resolve_errors")
+                    log.warning("error scraping mint address", signature=signature, error=repr(e))
+                # A page that shows no mint is not proof of no create; only a found mint is final
+                definitive = definitive or mint_address is not None
+            return mint_address, definitive
+
+    async def fetch_from_rpc(self, signature):
+        """
+        Resolve the mint with getTransaction; concurrent lookups share one batch.
+
+        Returns (mint_address, definitive). A fetched transaction is
+        definitive whether or not it holds a create; errors and null results
+        (not yet visible at "confirmed") are retried, then reported as
+        (None, False).
+        """
+        delay = RPC_RETRY_DELAY
+        for attempt in range(RPC_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(delay)
+                delay *= 2
+            try:
+                with metrics.timed("resolve_rpc_seconds"):
+                    transaction = await self.rpc.get_transaction(signature)
+            except Exception as e:
+                metrics.inc("resolve_errors")
+                log.warning("error fetching transaction", signature=signature, attempt=attempt + 1, error=repr(e))
+                continue
+            if transaction is not None:
+                return mint_from_transaction(transaction), True
+            metrics.inc("resolve_not_found")
+        return None, False
+
+    async def close(self):
+        if self._owns_rpc:
+            await self.rpc.close()
+        if self.driver_pool is not None:
+            await asyncio.to_thread(self.driver_pool.close)
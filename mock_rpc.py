@@ -0,0 +1,169 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+
+import ed25519
+from b58 import b58encode
+
+# Genesis hash the mock reports, so cluster checks treat it as mainnet
+MAINNET_GENESIS_HASH = "5eykt4UsFv8P8NJdTREpY1vzqKqZKvdpKuc147dw2N9d"
+
+
+# JSON-RPC error returned by a mock handler
+class MockRpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+# Local JSON-RPC-over-HTTP server standing in for a Solana RPC endpoint
+class MockRpcServer:
+    """
+    Answers the handful of RPC methods the bots use.
+
+    getLatestBlockhash hands out a new blockhash every `blockhash_period`
+    requests; sendTransaction checks the signatures and records the
+    transaction; getTransaction and getSignaturesForAddress serve the
+    `transactions` / `signatures` fixtures. `handlers` adds or overrides
+    methods: handler(params) -> result, or raise MockRpcError. Batch
+    requests and keep-alive connections work like a real endpoint, and
+    `latency` delays every response.
+    """
+
+    def __init__(self, handlers=None, latency=0.0, transactions=None, signatures=None,
+                 blockhash_period=10, verify_signatures=True, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.transactions = dict(transactions or {})
+        self.signatures = dict(signatures or {})
+        self.blockhash_period = blockhash_period
+        self.verify_signatures = verify_signatures
+        self.host = host
+        self.port = port
+        self.slot = 300_000_000
+        self.sent = []
+        self.calls = {}
+        self.batches = 0
+        self._blockhash_requests = 0
+        self._blockhash = os.urandom(32)
+        self._server = None
+        self.handlers = {
+            "getLatestBlockhash": self._get_latest_blockhash,
+            "getSlot": lambda params: self.slot,
+            "getGenesisHash": lambda params: MAINNET_GENESIS_HASH,
+            "getVersion": lambda params: {"solana-core": "mock", "feature-set": 0},
+            "sendTransaction": self._send_transaction,
+            "getTransaction": self._get_transaction,
+            "getSignaturesForAddress": self._get_signatures_for_address,
+        }
+        self.handlers.update(handlers or {})
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # Default methods
+    def _get_latest_blockhash(self, params):
+        self._blockhash_requests += 1
+        if self._blockhash_requests % self.blockhash_period == 0:
+            self._blockhash = hashlib.sha256(self._blockhash).digest()
+            self.slot += 1
+        return {
+            "context": {"slot": self.slot},
+            "value": {"blockhash": b58encode(self._blockhash), "lastValidBlockHeight": self.slot + 150},
+        }
+
+    def _send_transaction(self, params):
+        raw = base64.b64decode(params[0])
+        signature_count = raw[0]  # Fine for < 128 signatures (single-byte compact-u16)
+        message = raw[1 + 64 * signature_count:]
+        signatures = [raw[1 + 64 * i:1 + 64 * (i + 1)] for i in range(signature_count)]
+        signer_keys = [message[4 + 32 * i:4 + 32 * (i + 1)] for i in range(message[0])]
+        if self.verify_signatures:
+            for key, signature in zip(signer_keys, signatures):
+                if not ed25519.verify(key, message, signature):
+                    raise MockRpcError(-32003, "Transaction signature verification failure")
+        self.sent.append(raw)
+        return b58encode(signatures[0])
+
+    def _get_transaction(self, params):
+        return self.transactions.get(params[0])
+
+    def _get_signatures_for_address(self, params):
+        options = params[1] if len(params) > 1 else {}
+        entries = self.signatures.get(params[0], [])
+        before = options.get("before")
+        if before is not None:
+            position = next((i for i, entry in enumerate(entries) if entry["signature"] == before), None)
+            entries = entries[position + 1:] if position is not None else []
+        until = options.get("until")
+        if until is not None:
+            position = next((i for i, entry in enumerate(entries) if entry["signature"] == until), None)
+            if position is not None:
+                entries = entries[:position]
+        return entries[:options.get("limit", 1000)]
+
+    def _dispatch(self, request):
+        method = request.get("method")
+        self.calls[method] = self.calls.get(method, 0) + 1
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        handler = self.handlers.get(method)
+        if handler is None:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+            return response
+        try:
+            response["result"] = handler(request.get("params", []))
+        except MockRpcError as e:
+            response["error"] = {"code": e.code, "message": e.message}
+        return response
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode('latin-1').partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                body = json.loads(await reader.readexactly(length)) if length else None
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if isinstance(body, list):
+                    self.batches += 1
+                    payload = [self._dispatch(request) for request in body]
+                elif isinstance(body, dict):
+                    payload = self._dispatch(body)
+                else:
+                    payload = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+                data = json.dumps(payload).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: "
+                             + str(len(data)).encode() + b"\r\n\r\n" + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
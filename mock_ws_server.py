@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import websockets
+
+
+# Local websocket server that plays a fixed list of frames to each subscriber
+class MockWebSocketServer:
+    """
+    Stand-in for an RPC websocket endpoint.
+
+    Each connection waits for the client's first (subscribe) message, then
+    receives `frames` spaced `interval` seconds apart, or at the offsets in
+    `schedule` (seconds from the first frame, one per frame) when given.
+    With `close_after` set, the server drops the connection after that many
+    frames and refuses every later connection, which simulates a provider
+    going away.
+    """
+
+    def __init__(self, frames, interval=0.0, initial_delay=0.0, close_after=None, host="127.0.0.1", port=0,
+                 schedule=None):
+        self.frames = list(frames)
+        self.interval = interval
+        self.schedule = list(schedule) if schedule is not None else None
+        self.initial_delay = initial_delay
+        self.close_after = close_after
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.dead = False
+        self.first_subscribe_at = None  # perf_counter() when the first subscribe message arrived
+        self._server = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws, *args):
+        self.connections += 1
+        if self.dead:
+            await ws.close()
+            return
+        try:
+            await ws.recv()
+            if self.first_subscribe_at is None:
+                self.first_subscribe_at = time.perf_counter()
+            if self.initial_delay:
+                await asyncio.sleep(self.initial_delay)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            for sent, frame in enumerate(self.frames):
+                if self.close_after is not None and sent >= self.close_after:
+                    self.dead = True
+                    await ws.close()
+                    return
+                if self.schedule is not None:
+                    delay = started + self.schedule[sent] - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await ws.send(frame)
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+            # Keep the connection open like a quiet live subscription
+            await ws.wait_closed()
+        except websockets.exceptions.ConnectionClosed:
+            pass
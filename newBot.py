@@ -1,63 +1,59 @@
 import asyncio
-import websockets
+import functools
 import json
-import requests
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import os
-from solana.rpc.api import Client
-from solana.transaction import Signature
+import metrics
+from frame_filter import FrameFilter, load_rules
+from mint_log_store import init_log_store
+from mint_resolver import MintResolver
+from pipeline import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL, Pipeline, Stage
+from pump_events import has_create_log, parse_logs_notification
+from seen_store import SeenStore, backfill_mints
+from startup_cache import check_cluster
+from structured_log import get_logger
+from ws_manager import ConnectionManager
 
 # Solana WebSocket and RPC endpoints
 SOCKET_URL = "wss://api.mainnet-beta.solana.com"
-RPC_URL = "https://api.mainnet-beta.solana.com"
+RPC_URL = os.environ.get("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+# All endpoints to subscribe on at once (comma-separated), e.g. SOLANA_WSS_ENDPOINTS=wss://a,wss://b
+SOCKET_URLS = os.environ.get("SOLANA_WSS_ENDPOINTS", SOCKET_URL).split(",")
 MINT_AUTHORITY_PUBKEY = "TSLvdd1pWpHVjahSpsvCXUbgwsL3JAcvokwaKt1eokM"
-JSON_LOG_FILE = "minted_tokens_log.json"
+LOG_STORE_FILE = "minted_tokens_log.jsonl"
+LEGACY_JSON_LOG_FILE = "minted_tokens_log.json"
+# Memory-mapped set of persisted signatures plus the last persisted slot, kept across restarts
+SEEN_STORE_FILE = "seen_signatures.bin"
 
-# Solana RPC Client
-solana_client = Client(RPC_URL)
+# Pipeline sizing: raw frames may be dropped under overload, resolved work spills to disk instead
+PARSE_QUEUE_SIZE = 10000
+PARSE_OVERFLOW = OVERFLOW_DROP_OLDEST
+RESOLVE_WORKERS = 4
+RESOLVE_QUEUE_SIZE = 1000
+RESOLVE_OVERFLOW = OVERFLOW_SPILL
+SINK_QUEUE_SIZE = 1000
+SINK_OVERFLOW = OVERFLOW_BLOCK
+SINK_BATCH_SIZE = 50
+STATS_INTERVAL = 30  # Seconds between queue depth / latency reports
 
-# Initialize JSON log file if it doesn't exist
-def init_json_log_file():
-    try:
-        with open(JSON_LOG_FILE, 'r') as f:
-            logs = json.load(f)
-    except FileNotFoundError:
-        logs = []
-        with open(JSON_LOG_FILE, 'w') as f:
-            json.dump(logs, f)
-    return logs
+# Optional JSON rule set for the raw-frame filter (creator blacklist, name/symbol regexes, minimum dev buy)
+FILTER_RULES_FILE = os.environ.get("PUMPFUN_FILTER_RULES")
 
-def save_minted_token_log(data, file_path):
-    logs = init_json_log_file()
-    logs.append(data)
-    with open(file_path, 'w') as f:
-        json.dump(logs, f, indent=4)
+log = get_logger("mints")
 
-# Get transaction details via RPC instead of Selenium
-def get_mint_address_from_tx(signature):
-    try:
-        # Convert the string signature to a Solana Signature object
-        signature_obj = Signature.from_string(signature)
+# Queue a minted token record; the batched writer persists it off the event loop
+def save_minted_token_log(data, log_writer):
+    log_writer.append(data)
 
-        # Fetch the transaction using the correct signature format, with maxSupportedTransactionVersion
-        response = solana_client.get_transaction(signature_obj).value.block_time
-        print(f"response: {response.value}")
-        # Check if response is in expected format and contains 'result'
-        if response.result:
-            transaction = response.result
-            # Look for mint-related instructions in the transaction logs
-            for log in transaction['meta']['logMessages']:
-                if "Program log: Create" in log:
-                    print(f"Transaction {signature} minted a token")
-                    return transaction['transaction']['message']['instructions'][0]['data']
-    except Exception as e:
-        print(f"Error fetching transaction {signature}: {e}")
-    return None
+# Record written to the log store for one detected mint (runner.py's writer builds the same shape)
+def mint_record(signature, slot, mint_address, timestamp=None):
+    return {
+        "transaction_url": f"https://explorer.solana.com/tx/{signature}?cluster=mainnet",
+        "mint_address": mint_address,
+        "timestamp": timestamp if timestamp is not None else time.time(),
+        "signature": signature,
+        "slot": slot,
+    }
 
 # WebSocket subscription to listen for mint logs
 async def subscribe_to_mint_authority(ws):
@@ -71,47 +67,89 @@ async def subscribe_to_mint_authority(ws):
         "id": 1
     })
     await ws.send(subscribe_message)
-    print(f"Subscribed to logs for mint authority: {MINT_AUTHORITY_PUBKEY}")
+    log.info("subscribed to logs for mint authority", mint_authority=MINT_AUTHORITY_PUBKEY)
 
-# Listen for mint transactions and handle them
-async def listen_for_mints():
-    async with websockets.connect(SOCKET_URL) as ws:
-        await subscribe_to_mint_authority(ws)
+# Pipeline stage: drop uninteresting frames on the raw text, then parse the rest into (signature, logs, slot)
+async def parse_stage(frame_filter, message):
+    with metrics.timed("filter_seconds"):
+        if not frame_filter.accept(message):
+            return None
+    return parse_logs_notification(message)
 
-        while True:
-            try:
-                message = await ws.recv()
-                data = json.loads(message)
+# Pipeline stage: resolve the mint for a notification, once per signature
+async def resolve_stage(resolver, seen, item):
+    signature, logs, slot = item
+    # Persisted before a restart or reconnect: skip without a lookup
+    if seen is not None and signature in seen:
+        metrics.inc("seen_skipped")
+        return None
+    mint_address, is_new = await resolver.resolve(signature, logs)
+    if not is_new:
+        return None
+    if mint_address:
+        return mint_record(signature, slot, mint_address)
+    if has_create_log(logs):
+        metrics.inc("resolve_misses")
+        log.warning("no mint address found", signature=signature)
+    return None
 
-                if 'params' in data and 'result' in data['params']:
-                    result = data['params']['result']
-                    if 'value' in result:
-                        logs = result['value'].get('logs', [])
-                        signature = result['value'].get('signature', None)
-                        err = result['value'].get('err', None)
+# Pipeline stage: hand a batch of records to the log writer
+async def sink_stage(log_writer, records):
+    for minted_token_data in records:
+        save_minted_token_log(minted_token_data, log_writer)
 
-                        if err is None and signature:
-                            for log in logs:
-                                if "Program log: Create" in log:
-                                    mint_address = await asyncio.to_thread(get_mint_address_from_tx, signature)
-                                    if mint_address:
-                                        minted_token_data = {
-                                            "transaction_url": f"https://explorer.solana.com/tx/{signature}?cluster=mainnet",
-                                            "mint_address": mint_address,
-                                            "timestamp": time.time()
-                                        }
-                                        save_minted_token_log(minted_token_data, JSON_LOG_FILE)
-                                    else:
-                                        print(f"No mint address found for transaction {signature}")
+# Build the receive -> parse -> resolve -> sink pipeline
+def build_pipeline(log_writer, resolver, frame_filter=None, seen=None):
+    frame_filter = frame_filter or FrameFilter(load_rules(FILTER_RULES_FILE))
+    return Pipeline([
+        Stage("parse", functools.partial(parse_stage, frame_filter), maxsize=PARSE_QUEUE_SIZE,
+              overflow=PARSE_OVERFLOW),
+        Stage("resolve", functools.partial(resolve_stage, resolver, seen), workers=RESOLVE_WORKERS,
+              maxsize=RESOLVE_QUEUE_SIZE, overflow=RESOLVE_OVERFLOW),
+        Stage("sink", functools.partial(sink_stage, log_writer), maxsize=SINK_QUEUE_SIZE,
+              overflow=SINK_OVERFLOW, batch_size=SINK_BATCH_SIZE),
+    ], stats_interval=STATS_INTERVAL)
 
-            except Exception as e:
-                print(f"Error receiving or processing message: {e}")
-                await asyncio.sleep(1)
+# Listen for mint transactions and handle them
+async def listen_for_mints(log_writer, resolver, seen=None):
+    pipeline = build_pipeline(log_writer, resolver, seen=seen)
+    # Local /metrics endpoint, only when PUMPFUN_METRICS is set
+    metrics_server = await metrics.start_http_server() if metrics.ENABLED else None
+    backfill = None
+    try:
+        # Subscribed on every endpoint at once; first copy of each signature wins, reconnects are automatic
+        async with ConnectionManager(SOCKET_URLS, subscribe_to_mint_authority) as manager:
+            if seen is not None:
+                # Catch up on the gap since the last run while the live subscription runs
+                backfill = asyncio.ensure_future(backfill_mints(
+                    resolver, seen, MINT_AUTHORITY_PUBKEY,
+                    lambda signature, slot, mint_address: save_minted_token_log(
+                        mint_record(signature, slot, mint_address), log_writer)))
+            await pipeline.run(manager.recv)
+    finally:
+        if backfill is not None:
+            backfill.cancel()
+            await asyncio.gather(backfill, return_exceptions=True)
+        if metrics_server is not None:
+            metrics_server.close()
+        pipeline.close()
 
 # Main function to initialize and start the listener
 async def main():
-    init_json_log_file()
-    await listen_for_mints()
+    seen = SeenStore(SEEN_STORE_FILE)
+    # Signatures are marked seen (and the checkpoint advanced) only once their record is on disk
+    log_writer = init_log_store(LOG_STORE_FILE, LEGACY_JSON_LOG_FILE, on_persisted=seen.record_persisted)
+    # Logs fast path first; batched getTransaction through the RPC client as the fallback
+    resolver = MintResolver(RPC_URL)
+    # Cached genesis hash check; runs beside the subscription instead of in front of it
+    cluster_check = asyncio.ensure_future(check_cluster(resolver.rpc, RPC_URL))
+    try:
+        await listen_for_mints(log_writer, resolver, seen)
+    finally:
+        cluster_check.cancel()
+        await resolver.close()
+        log_writer.close()
+        seen.close()
 
 # Run the script
 if __name__ == "__main__":
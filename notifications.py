@@ -0,0 +1,229 @@
+import base64
+import json
+import sys
+import time
+
+# Fastest available decoder wins: msgspec (typed, one pass) > orjson > stdlib json
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+elif orjson is not None:
+    BACKEND = "orjson"
+else:
+    BACKEND = "json"
+
+# Method names searched for before any parse; anything without them is rejected
+LOGS_METHOD_TAG = '"logsNotification"'
+PROGRAM_METHOD_TAG = '"programNotification"'
+
+
+# Successful or failed transaction seen by logsSubscribe
+class LogsNotification:
+    __slots__ = ('slot', 'signature', 'err', 'logs')
+
+    def __init__(self, slot, signature, err, logs):
+        self.slot = slot
+        self.signature = signature
+        self.err = err
+        self.logs = logs
+
+    def __repr__(self):
+        return f"LogsNotification(slot={self.slot}, signature={self.signature!r}, err={self.err!r}, logs={len(self.logs)})"
+
+
+# Account update seen by programSubscribe
+class ProgramNotification:
+    __slots__ = ('slot', 'pubkey', 'data', 'encoding', 'lamports', 'owner')
+
+    def __init__(self, slot, pubkey, data, encoding, lamports, owner):
+        self.slot = slot
+        self.pubkey = pubkey
+        self.data = data
+        self.encoding = encoding
+        self.lamports = lamports
+        self.owner = owner
+
+    def __repr__(self):
+        return f"ProgramNotification(slot={self.slot}, pubkey={self.pubkey!r}, bytes={len(self.data)})"
+
+    def account_bytes(self):
+        """Raw account data (base64-decoded)."""
+        return base64.b64decode(self.data)
+
+
+if msgspec is not None:
+    # Wire layout of the two notifications; fields we never read are skipped by the decoder
+    class _Context(msgspec.Struct):
+        slot: int
+
+    class _LogsValue(msgspec.Struct):
+        signature: str
+        err: object = None
+        logs: list = []
+
+    class _LogsResult(msgspec.Struct):
+        context: _Context
+        value: _LogsValue
+
+    class _LogsParams(msgspec.Struct):
+        result: _LogsResult
+
+    class _LogsFrame(msgspec.Struct):
+        params: _LogsParams
+
+    class _Account(msgspec.Struct):
+        data: list
+        lamports: int = 0
+        owner: str = ""
+
+    class _ProgramValue(msgspec.Struct):
+        pubkey: str
+        account: _Account
+
+    class _ProgramResult(msgspec.Struct):
+        context: _Context
+        value: _ProgramValue
+
+    class _ProgramParams(msgspec.Struct):
+        result: _ProgramResult
+
+    class _ProgramFrame(msgspec.Struct):
+        params: _ProgramParams
+
+    _logs_decoder = msgspec.json.Decoder(_LogsFrame)
+    _program_decoder = msgspec.json.Decoder(_ProgramFrame)
+
+    def _decode_logs(frame):
+        result = _logs_decoder.decode(frame).params.result
+        value = result.value
+        return LogsNotification(result.context.slot, value.signature, value.err, value.logs)
+
+    def _decode_program(frame):
+        result = _program_decoder.decode(frame).params.result
+        account = result.value.account
+        return ProgramNotification(result.context.slot, result.value.pubkey, account.data[0], account.data[1],
+                                   account.lamports, account.owner)
+else:
+    _loads = orjson.loads if orjson is not None else json.loads
+
+    def _decode_logs(frame):
+        result = _loads(frame)['params']['result']
+        value = result['value']
+        return LogsNotification(result['context']['slot'], value['signature'], value.get('err'),
+                                value.get('logs') or [])
+
+    def _decode_program(frame):
+        result = _loads(frame)['params']['result']
+        value = result['value']
+        account = value['account']
+        return ProgramNotification(result['context']['slot'], value['pubkey'], account['data'][0],
+                                   account['data'][1], account.get('lamports', 0), account.get('owner', ""))
+
+
+# Typed logsNotification decode with a prefix sniff in front
+def decode_logs_notification(frame):
+    """Return a LogsNotification, or None for any other frame (subscribe acks, other methods, malformed)."""
+    tag = LOGS_METHOD_TAG if isinstance(frame, str) else LOGS_METHOD_TAG.encode()
+    if tag not in frame:
+        return None
+    try:
+        return _decode_logs(frame)
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+# Typed programNotification decode with a prefix sniff in front
+def decode_program_notification(frame):
+    """Return a ProgramNotification, or None for any other frame."""
+    tag = PROGRAM_METHOD_TAG if isinstance(frame, str) else PROGRAM_METHOD_TAG.encode()
+    if tag not in frame:
+        return None
+    try:
+        return _decode_program(frame)
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+# The previous dict-walking path, kept as the benchmark baseline
+def _legacy_parse(message):
+    data = json.loads(message)
+    if 'params' in data and 'result' in data['params']:
+        result = data['params']['result']
+        if 'value' in result:
+            logs = result['value'].get('logs', [])
+            signature = result['value'].get('signature', None)
+            err = result['value'].get('err', None)
+            if err is None and signature:
+                return signature, logs
+    return None
+
+
+# Representative frames when no recording is supplied
+def _synthetic_corpus(count):
+    logs = [
+        "Program ComputeBudget111111111111111111111111111111 invoke [1]",
+        "Program ComputeBudget111111111111111111111111111111 success",
+        "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P invoke [1]",
+        "Program log: Instruction: Create",
+        "Program data: " + base64.b64encode(bytes(range(256)) * 1).decode(),
+        "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P consumed 120000 of 200000 compute units",
+        "Program 6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P success",
+    ]
+    frames = []
+    for i in range(count):
+        if i % 5 == 4:
+            frames.append(json.dumps({"jsonrpc": "2.0", "result": i, "id": i}))
+            continue
+        frames.append(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "logsNotification",
+            "params": {
+                "result": {
+                    "context": {"slot": 290000000 + i},
+                    "value": {"signature": f"{i:0>88}", "err": None if i % 7 else {"InstructionError": [0, 1]},
+                              "logs": logs},
+                },
+                "subscription": 1,
+            },
+        }))
+    return frames
+
+
+# Load frames from a replay recording (see replay.py) or synthesize them
+def load_corpus(path=None, count=50000):
+    if path is None:
+        return _synthetic_corpus(count)
+    from replay import read_recording
+    return [frame for _, frame in read_recording(path)]
+
+
+# CPU per message, legacy dict path vs typed path
+def benchmark(path=None, count=50000):
+    """Print CPU microseconds per message for the legacy and typed decoders."""
+    frames = load_corpus(path, count)
+
+    def typed(frame):
+        notification = decode_logs_notification(frame)
+        if notification is not None and notification.err is None:
+            return notification.signature, notification.logs
+        return None
+
+    for name, parse in (("json.loads + .get chain", _legacy_parse), (f"typed ({BACKEND})", typed)):
+        start = time.process_time()
+        for frame in frames:
+            parse(frame)
+        elapsed = time.process_time() - start
+        print(f"{name:26s} {elapsed * 1e6 / len(frames):8.2f} us CPU/message over {len(frames)} frames")
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
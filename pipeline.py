@@ -0,0 +1,300 @@
+import asyncio
+import os
+import pickle
+import tempfile
+import time
+
+import metrics
+from structured_log import get_logger
+
+log = get_logger("pipeline")
+
+# What a stage queue does with a new item when it is full
+OVERFLOW_BLOCK = "block"              # Wait for room; backpressure reaches the producer
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Discard the oldest queued item to make room
+OVERFLOW_SPILL = "spill"              # Append to an on-disk overflow file, drained in order later
+
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_SPILL)
+
+
+# FIFO overflow file for the spill policy
+class SpillFile:
+    """Sequential pickle file used as an unbounded FIFO behind a full queue."""
+
+    def __init__(self, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="pipeline-spill-", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        self._file = open(path, 'w+b')
+        self._read_pos = 0
+        self.pending = 0
+
+    def push(self, entry):
+        self._file.seek(0, os.SEEK_END)
+        pickle.dump(entry, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.pending += 1
+
+    def pop(self):
+        self._file.seek(self._read_pos)
+        entry = pickle.load(self._file)
+        self._read_pos = self._file.tell()
+        self.pending -= 1
+        if self.pending == 0:
+            # Fully drained: reclaim the disk space
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_pos = 0
+        return entry
+
+    def close(self):
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# Bounded queue between two stages, with an overflow policy
+class StageQueue:
+    """
+    asyncio.Queue wrapper that timestamps items and applies an overflow policy.
+
+    Entries are `(enqueued_at, received_at, item)`: `received_at` is when the
+    item's originating frame entered the pipeline and is carried from stage
+    to stage for end-to-end latency.
+    """
+
+    def __init__(self, maxsize=1024, overflow=OVERFLOW_BLOCK, spill_path=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._queue = asyncio.Queue(maxsize)
+        self._spill = SpillFile(spill_path) if overflow == OVERFLOW_SPILL else None
+        self.dropped = 0
+        self.spilled = 0
+
+    def depth(self):
+        return self._queue.qsize() + (self._spill.pending if self._spill else 0)
+
+    async def put(self, item, received_at=None):
+        now = time.perf_counter()
+        entry = (now, received_at if received_at is not None else now, item)
+        if self.overflow == OVERFLOW_BLOCK:
+            await self._queue.put(entry)
+        elif self.overflow == OVERFLOW_DROP_OLDEST:
+            if self._queue.full():
+                self._queue.get_nowait()
+                self.dropped += 1
+                metrics.inc("pipeline_dropped")
+            self._queue.put_nowait(entry)
+        else:
+            # Once anything is spilled, later items follow it to disk to keep FIFO order
+            if self._spill.pending or self._queue.full():
+                self._spill.push(entry)
+                self.spilled += 1
+            else:
+                self._queue.put_nowait(entry)
+
+    async def get(self):
+        """Return (enqueued_at, received_at, item); queued items come before spilled ones."""
+        if self._spill is not None and self._queue.empty() and self._spill.pending:
+            return self._spill.pop()
+        return await self._queue.get()
+
+    def get_nowait(self):
+        if self._spill is not None and self._queue.empty() and self._spill.pending:
+            return self._spill.pop()
+        return self._queue.get_nowait()
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+
+
+# Running counters for one stage
+class StageStats:
+    __slots__ = ('processed', 'errors', 'wait_total', 'service_total', 'service_max')
+
+    def __init__(self):
+        self.processed = 0
+        self.errors = 0
+        self.wait_total = 0.0
+        self.service_total = 0.0
+        self.service_max = 0.0
+
+    def record(self, wait, service, count=1):
+        self.processed += count
+        self.wait_total += wait
+        self.service_total += service
+        if service > self.service_max:
+            self.service_max = service
+
+
+# One processing step with its input queue and worker count
+class Stage:
+    """
+    A pipeline step: `workers` tasks pull from this stage's queue and call `handler`.
+
+    With `batch_size` > 1 the handler receives a list of up to `batch_size`
+    items, collected for at most `batch_interval` seconds. A handler's return
+    value is passed to the next stage; returning None drops the item there.
+    """
+
+    def __init__(self, name, handler, workers=1, maxsize=1024, overflow=OVERFLOW_BLOCK,
+                 batch_size=1, batch_interval=0.05, spill_path=None):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.queue = StageQueue(maxsize, overflow, spill_path)
+        self.stats = StageStats()
+
+    def snapshot(self):
+        """Current depth, drops and mean/max latencies (milliseconds) for this stage."""
+        stats = self.stats
+        processed = stats.processed or 1
+        return {
+            "depth": self.queue.depth(),
+            "maxsize": self.queue.maxsize,
+            "processed": stats.processed,
+            "errors": stats.errors,
+            "dropped": self.queue.dropped,
+            "spilled": self.queue.spilled,
+            "avg_wait_ms": stats.wait_total / processed * 1000,
+            "avg_service_ms": stats.service_total / processed * 1000,
+            "max_service_ms": stats.service_max * 1000,
+        }
+
+
+# Receiver -> bounded queues -> workers -> batched sink
+class Pipeline:
+    """
+    Runs a receive function and a chain of stages as independent tasks.
+
+    The receiver only awaits `receive()` and enqueues the raw item into the
+    first stage, so a slow stage shows up as queue depth (and, depending on
+    the overflow policy, drops or spills) instead of stalling ws.recv().
+    """
+
+    def __init__(self, stages, stats_interval=None, observer=None):
+        self.stages = list(stages)
+        self.stats_interval = stats_interval
+        # Optional observer(stage_name, wait_seconds, service_seconds, count) called after each handler run
+        self.observer = observer if observer is not None else (metrics.observe_stage if metrics.ENABLED else None)
+        self.received = 0
+        if metrics.ENABLED:
+            for stage in self.stages:
+                metrics.gauge(f"stage_{stage.name}_depth", stage.queue.depth, f"Items queued for the {stage.name} stage")
+
+    async def run(self, receive):
+        """Run until `receive` raises (e.g. ConnectionClosed); the exception propagates."""
+        tasks = []
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            worker = self._batch_worker if stage.batch_size > 1 else self._worker
+            for _ in range(stage.workers):
+                tasks.append(asyncio.create_task(worker(stage, next_stage)))
+        if self.stats_interval:
+            tasks.append(asyncio.create_task(self._report_stats()))
+
+        try:
+            await self._receive_loop(receive)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _receive_loop(self, receive):
+        first = self.stages[0].queue
+        while True:
+            item = await receive()
+            self.received += 1
+            metrics.inc("pipeline_received")
+            await first.put(item)
+
+    async def _worker(self, stage, next_stage):
+        while True:
+            enqueued_at, received_at, item = await stage.queue.get()
+            started = time.perf_counter()
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                self._record_error(stage, e)
+                continue
+            finished = time.perf_counter()
+            service = finished - started
+            stage.stats.record(started - enqueued_at, service)
+            if self.observer is not None:
+                self.observer(stage.name, started - enqueued_at, service, 1)
+            if next_stage is None:
+                metrics.observe("pipeline_end_to_end_seconds", finished - received_at)
+            elif result is not None:
+                await next_stage.queue.put(result, received_at)
+
+    async def _batch_worker(self, stage, next_stage):
+        while True:
+            enqueued_at, received_at, item = await stage.queue.get()
+            batch = [item]
+            enqueue_times = [enqueued_at]
+            receive_times = [received_at]
+            deadline = time.perf_counter() + stage.batch_interval
+            while len(batch) < stage.batch_size:
+                try:
+                    enqueued_at, received_at, item = stage.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        enqueued_at, received_at, item = await asyncio.wait_for(stage.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                enqueue_times.append(enqueued_at)
+                receive_times.append(received_at)
+            started = time.perf_counter()
+            try:
+                result = await stage.handler(batch)
+            except Exception as e:
+                self._record_error(stage, e)
+                continue
+            finished = time.perf_counter()
+            service = finished - started
+            wait = started * len(batch) - sum(enqueue_times)
+            stage.stats.record(wait, service, len(batch))
+            if self.observer is not None:
+                self.observer(stage.name, wait / len(batch), service, len(batch))
+            if next_stage is None:
+                if metrics.ENABLED:
+                    for received_at in receive_times:
+                        metrics.observe("pipeline_end_to_end_seconds", finished - received_at)
+            elif result is not None:
+                # A batch result is as old as its oldest input
+                await next_stage.queue.put(result, min(receive_times))
+
+    def _record_error(self, stage, error):
+        stage.stats.errors += 1
+        metrics.inc(f"stage_{stage.name}_errors")
+        log.error("pipeline stage failed", stage=stage.name, error=repr(error))
+
+    def stats(self):
+        """Per-stage snapshot keyed by stage name."""
+        return {stage.name: stage.snapshot() for stage in self.stages}
+
+    async def _report_stats(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            parts = [
+                f"{name}: depth={s['depth']}/{s['maxsize']} done={s['processed']} err={s['errors']} "
+                f"drop={s['dropped']} spill={s['spilled']} wait={s['avg_wait_ms']:.2f}ms "
+                f"svc={s['avg_service_ms']:.2f}ms max={s['max_service_ms']:.2f}ms"
+                for name, s in self.stats().items()
+            ]
+            log.info("pipeline stats", received=self.received, stages=" | ".join(parts))
+
+    def close(self):
+        for stage in self.stages:
+            stage.queue.close()
@@ -0,0 +1,82 @@
+import base64
+import binascii
+
+from b58 import b58decode
+from instruction_decoder import PUMP_FUN_DECODER, PUMP_FUN_PROGRAM_ID, DecodeError
+from notifications import decode_logs_notification
+
+# Anchor logs the instruction name of every pump.fun create; used to decide whether an RPC lookup is worth it
+CREATE_LOG_MARKER = "Program log: Instruction: Create"
+
+# Anchor emits events as base64 payloads on log lines with this prefix
+PROGRAM_DATA_PREFIX = "Program data: "
+
+
+# Decode every pump.fun event found in a transaction's log messages
+def iter_pump_events(logs):
+    """Yield (event name, fields) for each pump.fun event in `logs`, in log order; malformed payloads are skipped."""
+    prefix_len = len(PROGRAM_DATA_PREFIX)
+    for log in logs:
+        if not log.startswith(PROGRAM_DATA_PREFIX):
+            continue
+        try:
+            payload = base64.b64decode(log[prefix_len:])
+        except (binascii.Error, ValueError):
+            continue
+        # Other programs in the same transaction may emit events too; the discriminator filters them
+        try:
+            event = PUMP_FUN_DECODER.decode_event(payload)
+        except DecodeError:
+            continue
+        if event is not None:
+            yield event
+
+
+# Whether `logs` show a pump.fun create instruction, with or without a decodable CreateEvent
+def has_create_log(logs):
+    return any(CREATE_LOG_MARKER in line for line in logs)
+
+
+# Pull (signature, logs, slot) out of a raw logsNotification frame
+def parse_logs_notification(message):
+    """Return (signature, logs, slot) for a successful transaction, or None for anything else."""
+    notification = decode_logs_notification(message)
+    # Failed transactions never mint anything
+    if notification is None or notification.err is not None or not notification.signature:
+        return None
+    return notification.signature, notification.logs, notification.slot
+
+
+# Fast path: the CreateEvent in the same log notification carries the mint
+def mint_from_logs(logs):
+    """Return the mint address from a CreateEvent in `logs`, or None if there is none."""
+    for name, fields in iter_pump_events(logs):
+        if name == 'CreateEvent':
+            return fields['mint']
+    return None
+
+
+# Slow path: find the mint in a getTransaction result (encoding "json")
+def mint_from_transaction(tx):
+    """
+    Extract the mint from a getTransaction `result` object.
+
+    Tries the CreateEvent in meta.logMessages first, then falls back to the
+    first account of the pump.fun create instruction.
+    """
+    if not tx:
+        return None
+
+    mint = mint_from_logs((tx.get('meta') or {}).get('logMessages') or [])
+    if mint:
+        return mint
+
+    message = tx['transaction']['message']
+    account_keys = message['accountKeys']
+    create_discriminator = PUMP_FUN_DECODER['create'].discriminator
+    for ix in message['instructions']:
+        if account_keys[ix['programIdIndex']] != PUMP_FUN_PROGRAM_ID:
+            continue
+        if b58decode(ix['data'])[:8] == create_discriminator:
+            return account_keys[ix['accounts'][0]]
+    return None
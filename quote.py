@@ -0,0 +1,203 @@
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the integer reference functions need nothing else
+    np = None
+
+from bonding_curve import BondingCurveState
+
+# pump.fun trade fee in basis points, charged on the SOL side
+DEFAULT_FEE_BPS = 100
+BPS = 10_000
+
+# _mul_div_floor's float estimate is corrected exactly while a*b stays below this and d below 2**61 (and q below 2**62)
+_EXACT_PRODUCT_LIMIT = 2.0 ** 110
+_EXACT_DIVISOR_LIMIT = 2 ** 61
+
+
+# Exact integer reference: what the program computes for a single trade
+def buy_quote(virtual_sol_reserves, virtual_token_reserves, real_token_reserves, sol_in, fee_bps=DEFAULT_FEE_BPS):
+    """
+    Raw tokens received for spending `sol_in` lamports, fee included.
+
+    The fee comes off the top, the rest moves along x*y=k on the virtual
+    reserves (rounded down), and the result is capped at the tokens the
+    curve still has for sale. A zero-sized buy on an empty curve quotes 0.
+    """
+    net_sol = sol_in * BPS // (BPS + fee_bps)
+    if not virtual_sol_reserves + net_sol:
+        return 0
+    tokens_out = virtual_token_reserves * net_sol // (virtual_sol_reserves + net_sol)
+    return min(tokens_out, real_token_reserves)
+
+
+def sell_quote(virtual_sol_reserves, virtual_token_reserves, real_sol_reserves, tokens_in, fee_bps=DEFAULT_FEE_BPS):
+    """Lamports received for selling `tokens_in` raw tokens, after the fee; capped at the real SOL reserves."""
+    if not virtual_token_reserves + tokens_in:
+        return 0
+    sol_out = virtual_sol_reserves * tokens_in // (virtual_token_reserves + tokens_in)
+    sol_out = min(sol_out, real_sol_reserves)
+    return sol_out - sol_out * fee_bps // BPS
+
+
+def buy_price_impact(virtual_sol_reserves, virtual_token_reserves, sol_in, tokens_out):
+    """Execution price over spot price, minus one (fee included); inf when nothing is received."""
+    if not tokens_out:
+        return float('inf')
+    return (sol_in * virtual_token_reserves) / (tokens_out * virtual_sol_reserves) - 1.0
+
+
+def sell_price_impact(virtual_sol_reserves, virtual_token_reserves, tokens_in, sol_out):
+    """One minus execution price over spot price (fee included)."""
+    if not tokens_in:
+        return 0.0
+    return 1.0 - (sol_out * virtual_token_reserves) / (tokens_in * virtual_sol_reserves)
+
+
+def quote_state_buy(state, sol_in, fee_bps=DEFAULT_FEE_BPS):
+    """buy_quote for a decoded BondingCurveState."""
+    return buy_quote(state.virtual_sol_reserves, state.virtual_token_reserves, state.real_token_reserves,
+                     sol_in, fee_bps)
+
+
+def quote_state_sell(state, tokens_in, fee_bps=DEFAULT_FEE_BPS):
+    """sell_quote for a decoded BondingCurveState."""
+    return sell_quote(state.virtual_sol_reserves, state.virtual_token_reserves, state.real_sol_reserves,
+                      tokens_in, fee_bps)
+
+
+# Vectorized path: exact floor(a * b / d) on uint64 arrays without 128-bit integers
+def _mul_div_floor(a, b, d):
+    """
+    floor(a * b / d) element-wise for non-negative integer arrays; 0 where d is 0.
+
+    A float64 estimate q is off by at most about a*b/d * 2**-50. The
+    remainder a*b - q*d is computed in wrapping uint64 arithmetic; while
+    a*b < 2**110, d < 2**61 and q < 2**62 its true magnitude is below
+    2**63, so the low 64 bits read as int64 are its exact value, and
+    q + remainder // d is the exact quotient. Elements outside that range
+    (far beyond lamport/token amounts) fall back to Python integers.
+    """
+    a, b, d = np.broadcast_arrays(np.asarray(a, dtype=np.uint64), np.asarray(b, dtype=np.uint64),
+                                  np.asarray(d, dtype=np.uint64))
+    zero = d == 0
+    divisor = np.where(zero, np.uint64(1), d)
+    product = a.astype(np.float64) * b.astype(np.float64)
+    estimate = product / divisor.astype(np.float64)
+    q = np.floor(np.minimum(estimate, 2.0 ** 62)).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        remainder = (a * b - q * divisor).view(np.int64)
+    q = (q.view(np.int64) + remainder // divisor.view(np.int64)).view(np.uint64)
+    exact = ((product < _EXACT_PRODUCT_LIMIT) & (divisor < np.uint64(_EXACT_DIVISOR_LIMIT))
+             & (estimate < 2.0 ** 62))
+    if not exact.all():
+        for index in zip(*np.nonzero(~exact)):
+            q[index] = int(a[index]) * int(b[index]) // int(divisor[index])
+    q[zero] = 0
+    return q
+
+
+def buy_quotes(virtual_sol_reserves, virtual_token_reserves, real_token_reserves, sol_in, fee_bps=DEFAULT_FEE_BPS):
+    """
+    Vectorized buy_quote; arguments broadcast like NumPy arrays.
+
+    Pass curve columns shaped (M, 1) and sizes shaped (K,) to price every
+    (curve, size) pair in one call. Returns (tokens_out, price_impact).
+    Matches buy_quote exactly.
+    """
+    vsol = np.asarray(virtual_sol_reserves, dtype=np.uint64)
+    vtok = np.asarray(virtual_token_reserves, dtype=np.uint64)
+    sol_in = np.asarray(sol_in, dtype=np.uint64)
+    net_sol = sol_in * np.uint64(BPS) // np.uint64(BPS + fee_bps)
+    tokens_out = np.minimum(_mul_div_floor(vtok, net_sol, vsol + net_sol),
+                            np.asarray(real_token_reserves, dtype=np.uint64))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        impact = (sol_in.astype(np.float64) * vtok.astype(np.float64)) / (
+            tokens_out.astype(np.float64) * vsol.astype(np.float64)) - 1.0
+    return tokens_out, np.where(tokens_out == 0, np.inf, impact)
+
+
+def sell_quotes(virtual_sol_reserves, virtual_token_reserves, real_sol_reserves, tokens_in, fee_bps=DEFAULT_FEE_BPS):
+    """Vectorized sell_quote; returns (sol_out, price_impact). Matches sell_quote exactly."""
+    vsol = np.asarray(virtual_sol_reserves, dtype=np.uint64)
+    vtok = np.asarray(virtual_token_reserves, dtype=np.uint64)
+    tokens_in = np.asarray(tokens_in, dtype=np.uint64)
+    sol_out = np.minimum(_mul_div_floor(vsol, tokens_in, vtok + tokens_in),
+                         np.asarray(real_sol_reserves, dtype=np.uint64))
+    sol_out = sol_out - _mul_div_floor(sol_out, np.uint64(fee_bps), np.uint64(BPS))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        impact = 1.0 - (sol_out.astype(np.float64) * vtok.astype(np.float64)) / (
+            tokens_in.astype(np.float64) * vsol.astype(np.float64))
+    return sol_out, np.where(tokens_in == 0, 0.0, impact)
+
+
+# Curve columns shaped (M, 1) so they broadcast against a row of trade sizes
+def curve_columns(states):
+    """Stack decoded BondingCurveStates into (M, 1) uint64 columns keyed by field name."""
+    fields = ('virtual_sol_reserves', 'virtual_token_reserves', 'real_sol_reserves', 'real_token_reserves')
+    return {
+        name: np.fromiter((getattr(state, name) for state in states), dtype=np.uint64, count=len(states))[:, None]
+        for name in fields
+    }
+
+
+def token_index_columns(index):
+    """Zero-copy (capacity, 1) columns over a TokenIndex (rows without state quote as empty curves)."""
+    return {
+        name: np.frombuffer(getattr(index, name), dtype=np.uint64)[:, None]
+        for name in ('virtual_sol_reserves', 'virtual_token_reserves', 'real_sol_reserves', 'real_token_reserves')
+    }
+
+
+def quote_grid(states, buy_sizes=None, sell_sizes=None, fee_bps=DEFAULT_FEE_BPS):
+    """
+    Quote every curve in `states` against every size.
+
+    Returns a dict with 'buy' -> (tokens_out, impact) and/or
+    'sell' -> (sol_out, impact), each array shaped (len(states), len(sizes)).
+    """
+    columns = curve_columns(states)
+    result = {}
+    if buy_sizes is not None:
+        result['buy'] = buy_quotes(columns['virtual_sol_reserves'], columns['virtual_token_reserves'],
+                                   columns['real_token_reserves'], np.asarray(buy_sizes, dtype=np.uint64), fee_bps)
+    if sell_sizes is not None:
+        result['sell'] = sell_quotes(columns['virtual_sol_reserves'], columns['virtual_token_reserves'],
+                                     columns['real_sol_reserves'], np.asarray(sell_sizes, dtype=np.uint64), fee_bps)
+    return result
+
+
+# A plausible curve: fresh pump.fun reserves moved by up to the full sale
+def _random_state(rng):
+    sold = rng.randint(0, 793_100_000_000_000)
+    virtual_token = 1_073_000_000_000_000 - sold
+    virtual_sol = 30_000_000_000 * 1_073_000_000_000_000 // virtual_token
+    return BondingCurveState(virtual_token, virtual_sol, 793_100_000_000_000 - sold, virtual_sol - 30_000_000_000,
+                             1_000_000_000_000_000, False)
+
+
+def benchmark(curves=1000, sizes=8, repeat=200):
+    rng = random.Random(1)
+    states = [_random_state(rng) for _ in range(curves)]
+    columns = curve_columns(states)
+    buy_sizes = np.array([rng.randint(10 ** 7, 10 ** 11) for _ in range(sizes)], dtype=np.uint64)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        buy_quotes(columns['virtual_sol_reserves'], columns['virtual_token_reserves'],
+                   columns['real_token_reserves'], buy_sizes)
+    vectorized = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for state in states:
+        for size in buy_sizes.tolist():
+            quote_state_buy(state, size)
+    reference = time.perf_counter() - start
+    print(f"{curves * sizes} buy quotes: vectorized {vectorized * 1e3:.3f} ms, integer reference {reference * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    if np is None:
+        sys.exit("NumPy is required for the vectorized quoting path")
+    benchmark()
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+
+from mock_ws_server import MockWebSocketServer
+from ws_manager import ConnectionManager, notification_key
+
+# How long the pipeline must stay idle after the last frame before a replay is considered done
+DRAIN_IDLE_SECONDS = 0.5
+
+
+# Capture raw frames with their receive time into a gzip JSON Lines file
+class FrameRecorder:
+    """Each line is `[receive_unix_time, frame]`; the file can be appended across runs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+
+    def write(self, frame, received_at=None):
+        if isinstance(frame, bytes):
+            frame = frame.decode('utf-8')
+        self._file.write(json.dumps([received_at if received_at is not None else time.time(), frame]) + '\n')
+        self.count += 1
+
+    def wrap(self, receive):
+        """Wrap an async receive function so every frame it returns is recorded."""
+        async def recording_receive():
+            frame = await receive()
+            self.write(frame)
+            return frame
+        return recording_receive
+
+    def close(self):
+        self._file.close()
+
+
+# Read a recording back as (receive_unix_time, frame) pairs
+def read_recording(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            try:
+                received_at, frame = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from an interrupted recording
+            yield received_at, frame
+
+
+# Minimal log-writer stand-in that keeps records in memory
+class _CollectingWriter:
+    def __init__(self):
+        self.records = []
+
+    def append(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+
+# Replay targets: which bot's subscription and pipeline to exercise
+def _mints_target():
+    """newBot's logs pipeline, resolving offline (logs fast path only)."""
+    import newBot
+    from mint_resolver import MintResolver
+
+    resolver = MintResolver(None)
+    pipeline = newBot.build_pipeline(_CollectingWriter(), resolver)
+
+    def sink_key(record):
+        return record['transaction_url'].split('/tx/')[1].split('?')[0]
+
+    async def close():
+        await resolver.close()
+    return newBot.subscribe_to_mint_authority, pipeline, sink_key, close
+
+
+def _program_target():
+    """bot.py's programSubscribe pipeline, journaling into a temporary directory."""
+    import bot
+    from account_journal import AccountJournal
+
+    journal_dir = tempfile.TemporaryDirectory(prefix="replay-journal-")
+    journal = AccountJournal(journal_dir.name)
+    pipeline = bot.build_pipeline(journal)
+
+    def sink_key(snapshot):
+        slot, pubkey, _ = snapshot
+        return pubkey, slot
+
+    async def close():
+        journal.close()
+        journal_dir.cleanup()
+    return bot.subscribe_to_pump_program, pipeline, sink_key, close
+
+
+TARGETS = {
+    "mints": _mints_target,
+    "program": _program_target,
+}
+
+
+# Subscribe callables for recording, imported without building a target's pipeline
+def _mints_subscriber():
+    from newBot import subscribe_to_mint_authority
+    return subscribe_to_mint_authority
+
+
+def _program_subscriber():
+    from bot import subscribe_to_pump_program
+    return subscribe_to_pump_program
+
+
+SUBSCRIBERS = {
+    "mints": _mints_subscriber,
+    "program": _program_subscriber,
+}
+
+
+# Nearest-rank percentile over a list of samples
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _format_latencies(samples):
+    return " ".join(f"p{pct}={percentile(samples, pct) * 1000:.3f}ms" for pct in (50, 90, 99, 100))
+
+
+# Replay a recording through a bot pipeline via a local websocket server
+async def replay(path, target="mints", speed=None):
+    """
+    Feed a recording through `target`'s real pipeline and return a report dict.
+
+    `speed=None` sends frames as fast as possible; otherwise recorded gaps
+    are divided by `speed` (1.0 = real time).
+    """
+    records = list(read_recording(path))
+    if not records:
+        raise ValueError(f"No frames in recording {path}")
+    frames = [frame for _, frame in records]
+    schedule = None
+    if speed:
+        first = records[0][0]
+        schedule = [(received_at - first) / speed for received_at, _ in records]
+
+    subscribe, pipeline, sink_key, close_target = TARGETS[target]()
+    pipeline.stats_interval = None
+
+    stage_samples = {stage.name: {"wait": [], "service": []} for stage in pipeline.stages}
+
+    last_done = None
+    previous_observer = pipeline.observer
+
+    def observe(stage_name, wait, service, count):
+        nonlocal last_done
+        stage_samples[stage_name]["wait"].append(wait)
+        stage_samples[stage_name]["service"].append(service / count)
+        last_done = time.perf_counter()
+        if previous_observer is not None:
+            previous_observer(stage_name, wait, service, count)
+    pipeline.observer = observe
+
+    # End-to-end: frame received by the client -> item handed to the sink stage
+    received_at = {}
+    detection_latency = []
+    sink = pipeline.stages[-1]
+    sink_handler = sink.handler
+
+    async def timed_sink(items):
+        now = time.perf_counter()
+        for item in items:
+            started = received_at.pop(sink_key(item), None)
+            if started is not None:
+                detection_latency.append(now - started)
+        return await sink_handler(items)
+    sink.handler = timed_sink
+
+    server = MockWebSocketServer(frames, schedule=schedule)
+    received = 0
+    last_activity = time.perf_counter()
+    first_received = None
+    async with server:
+        async with ConnectionManager([server.url], subscribe, queue_size=len(frames) + 1) as manager:
+            async def receive():
+                nonlocal received, last_activity, first_received
+                frame = await manager.recv()
+                now = time.perf_counter()
+                if first_received is None:
+                    first_received = now
+                key = notification_key(frame)
+                if key is not None:
+                    received_at[key] = now
+                received += 1
+                last_activity = now
+                return frame
+
+            run_task = asyncio.create_task(pipeline.run(receive))
+            processed_before = -1
+            while True:
+                await asyncio.sleep(0.05)
+                processed = sum(stage.stats.processed for stage in pipeline.stages)
+                if processed != processed_before:
+                    processed_before = processed
+                    last_activity = time.perf_counter()
+                idle = time.perf_counter() - last_activity
+                drained = all(stage.queue.depth() == 0 for stage in pipeline.stages)
+                if received >= len(frames) and drained and idle > DRAIN_IDLE_SECONDS:
+                    break
+                if run_task.done():
+                    break
+            run_task.cancel()
+            await asyncio.gather(run_task, return_exceptions=True)
+    pipeline.close()
+    await close_target()
+
+    finished = last_done or last_activity
+    elapsed = max(finished - (first_received or finished), 1e-9)
+    return {
+        "frames": len(frames),
+        "received": received,
+        "elapsed_s": elapsed,
+        "messages_per_s": received / elapsed,
+        "stages": {
+            name: {
+                "wait": _format_latencies(samples["wait"]),
+                "service": _format_latencies(samples["service"]),
+            }
+            for name, samples in stage_samples.items()
+        },
+        "detections": len(detection_latency),
+        "detection_latency": _format_latencies(detection_latency),
+        "pipeline": pipeline.stats(),
+    }
+
+
+# Record live frames for a target from the configured endpoints
+async def record(path, target="mints", duration=None, max_frames=None):
+    subscribe = SUBSCRIBERS[target]()
+    endpoints = os.environ.get("SOLANA_WSS_ENDPOINTS", "wss://api.mainnet-beta.solana.com").split(",")
+    recorder = FrameRecorder(path)
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        async with ConnectionManager(endpoints, subscribe) as manager:
+            receive = recorder.wrap(manager.recv)
+            while max_frames is None or recorder.count < max_frames:
+                timeout = deadline - time.monotonic() if deadline else None
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(receive(), timeout)
+                except asyncio.TimeoutError:
+                    break
+    finally:
+        recorder.close()
+    print(f"Recorded {recorder.count} frames to {path}")
+
+
+def _print_report(report):
+    print(f"frames: {report['received']}/{report['frames']} in {report['elapsed_s']:.3f}s "
+          f"({report['messages_per_s']:.0f} msg/s)")
+    for name, latencies in report["stages"].items():
+        print(f"  stage {name:8s} wait    {latencies['wait']}")
+        print(f"  stage {name:8s} service {latencies['service']}")
+    print(f"  detections: {report['detections']}  end-to-end {report['detection_latency']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record live websocket frames or replay them through a bot pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="capture live frames to a .jsonl.gz file")
+    rec.add_argument("target", choices=sorted(TARGETS))
+    rec.add_argument("path")
+    rec.add_argument("--duration", type=float, help="seconds to record")
+    rec.add_argument("--max-frames", type=int)
+
+    rep = sub.add_parser("replay", help="feed a recording through the pipeline and report latencies")
+    rep.add_argument("target", choices=sorted(TARGETS))
+    rep.add_argument("path")
+    rep.add_argument("--speed", type=float, help="replay at recorded pace divided by SPEED (default: as fast as possible)")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        asyncio.run(record(args.path, args.target, args.duration, args.max_frames))
+    else:
+        _print_report(asyncio.run(replay(args.path, args.target, args.speed)))
+
+
+if __name__ == "__main__":
+    main()
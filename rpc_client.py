@@ -0,0 +1,274 @@
+import asyncio
+import importlib.util
+import itertools
+import time
+
+import httpx
+
+import metrics
+from structured_log import get_logger
+
+log = get_logger("rpc")
+
+# Calls arriving within this window share one JSON-RPC batch request
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 100
+
+# Per-endpoint request budget (requests/second and burst), e.g. a provider's plan limits
+DEFAULT_RATE_LIMIT = 40.0
+DEFAULT_BURST = 100
+
+# Send the same batch to the next endpoint if the first has not answered by then
+DEFAULT_HEDGE_AFTER = 0.3
+
+DEFAULT_MAX_RETRIES = 2
+RETRY_BACKOFF = 0.1
+
+# Seconds added to an endpoint's latency estimate when a request to it fails
+FAILURE_PENALTY = 1.0
+
+# HTTP/2 multiplexes every in-flight batch over one connection when the h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Status codes worth retrying elsewhere
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+# JSON-RPC error object returned for one call
+class RpcError(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+# Async token bucket
+class TokenBucket:
+    """Allows `rate` tokens per second with bursts up to `capacity`; `acquire` waits for tokens."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens=1):
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+# One RPC URL with its rate limit and observed latency
+class RpcEndpoint:
+    __slots__ = ('url', 'bucket', 'latency', 'requests', 'failures')
+
+    def __init__(self, url, rate_limit, burst):
+        self.url = url
+        self.bucket = TokenBucket(rate_limit, burst)
+        self.latency = 0.0  # EWMA of batch round-trip seconds
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, elapsed):
+        self.latency = elapsed if not self.latency else 0.8 * self.latency + 0.2 * elapsed
+
+
+# Batching, rate-limited, hedging JSON-RPC client
+class RpcClient:
+    """
+    Async Solana JSON-RPC client shared by everything that talks HTTP RPC.
+
+    Concurrent `call()`s made within `batch_window` seconds are sent as one
+    JSON-RPC batch (up to `max_batch` calls) over a pooled keep-alive (or
+    HTTP/2) connection. Every endpoint has a token bucket counting each call
+    in a batch. A batch goes to the fastest endpoint first; if it has not
+    answered after `hedge_after` seconds the same batch is also sent to the
+    next endpoint and the first answer wins. Transport failures, 429 and 5xx
+    are retried on the next endpoint up to `max_retries` times.
+    """
+
+    def __init__(self, urls, http_client=None, batch_window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH,
+                 rate_limit=DEFAULT_RATE_LIMIT, burst=DEFAULT_BURST, hedge_after=DEFAULT_HEDGE_AFTER,
+                 max_retries=DEFAULT_MAX_RETRIES, timeout=10.0):
+        if isinstance(urls, str):
+            urls = [urls]
+        if not urls:
+            raise ValueError("At least one RPC endpoint is required")
+        self.endpoints = [RpcEndpoint(url, rate_limit, burst) for url in urls]
+        self.batch_window = batch_window
+        self.max_batch = min(max_batch, burst)
+        self.hedge_after = hedge_after
+        self.max_retries = max_retries
+        self._owns_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+        )
+        self._ids = itertools.count(1)
+        self._pending = []
+        self._flush_handle = None
+        self._in_flight = set()
+
+    # Queue one call; it is sent with whatever else arrives in the same window
+    async def call(self, method, params=None):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(({"jsonrpc": "2.0", "id": next(self._ids), "method": method,
+                               "params": params if params is not None else []}, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_soon(self._flush)
+        if batch:
+            task = asyncio.ensure_future(self._execute(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _execute(self, batch):
+        metrics.inc("rpc_batches")
+        metrics.inc("rpc_calls", len(batch))
+        try:
+            responses = await self._send_with_hedging([request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_id = {response.get("id"): response for response in responses}
+        for request, future in batch:
+            if future.done():
+                continue
+            response = by_id.get(request["id"])
+            if response is None:
+                future.set_exception(RpcError(-32603, "No response for request in batch"))
+            elif "error" in response:
+                error = response["error"]
+                future.set_exception(RpcError(error.get("code"), error.get("message"), error.get("data")))
+            else:
+                future.set_result(response.get("result"))
+
+    def _by_preference(self):
+        # Unmeasured endpoints first so each gets a latency sample, then fastest first
+        return sorted(self.endpoints, key=lambda endpoint: (endpoint.latency != 0.0, endpoint.latency))
+
+    async def _post(self, endpoint, payload):
+        await endpoint.bucket.acquire(len(payload))
+        endpoint.requests += 1
+        started = time.perf_counter()
+        try:
+            response = await self._http_client.post(endpoint.url, json=payload)
+            if response.status_code in _RETRYABLE_STATUS:
+                raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request,
+                                            response=response)
+            response.raise_for_status()
+            body = response.json()
+        except asyncio.CancelledError:
+            # Lost a hedge race: at least this slow, so it is no longer tried first
+            endpoint.record(time.perf_counter() - started)
+            raise
+        except Exception:
+            endpoint.failures += 1
+            endpoint.record(time.perf_counter() - started + FAILURE_PENALTY)
+            metrics.inc("rpc_failures")
+            raise
+        elapsed = time.perf_counter() - started
+        endpoint.record(elapsed)
+        metrics.observe("rpc_batch_seconds", elapsed)
+        if isinstance(body, dict):
+            # A whole-batch error (e.g. batches disabled) comes back as a single object
+            if "error" in body:
+                error = body["error"]
+                raise RpcError(error.get("code"), error.get("message"), error.get("data"))
+            body = [body]
+        return body
+
+    async def _send_with_hedging(self, payload):
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            # Failures raise an endpoint's latency estimate, so a retry starts on a different one
+            order = self._by_preference()
+            spare = iter(order[1:])
+            tasks = {asyncio.ensure_future(self._post(order[0], payload))}
+            try:
+                while tasks:
+                    hedge = next(spare, None) if self.hedge_after is not None else None
+                    done, tasks = await asyncio.wait(tasks, timeout=self.hedge_after if hedge else None,
+                                                     return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        # Primary is slow: race the same batch on another endpoint
+                        metrics.inc("rpc_hedged")
+                        tasks.add(asyncio.ensure_future(self._post(hedge, payload)))
+                        continue
+                    if hedge is not None:
+                        spare = itertools.chain([hedge], spare)
+                    for task in done:
+                        if task.exception() is None:
+                            return task.result()
+                        last_error = task.exception()
+            finally:
+                for task in tasks:
+                    task.cancel()
+            if isinstance(last_error, RpcError):
+                raise last_error
+            log.warning("rpc batch failed, retrying", attempt=attempt + 1, error=repr(last_error))
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        raise last_error
+
+    # Typed helpers for the calls the bots make
+    async def get_transaction(self, signature, encoding="json", commitment="confirmed"):
+        return await self.call("getTransaction", [
+            signature, {"encoding": encoding, "commitment": commitment, "maxSupportedTransactionVersion": 0}])
+
+    async def get_account_info(self, pubkey, encoding="base64", commitment="confirmed"):
+        return await self.call("getAccountInfo", [pubkey, {"encoding": encoding, "commitment": commitment}])
+
+    async def get_multiple_accounts(self, pubkeys, encoding="base64", commitment="confirmed"):
+        return await self.call("getMultipleAccounts", [list(pubkeys), {"encoding": encoding, "commitment": commitment}])
+
+    async def get_signatures_for_address(self, address, before=None, until=None, limit=1000, commitment="confirmed"):
+        options = {"limit": limit, "commitment": commitment}
+        if before is not None:
+            options["before"] = before
+        if until is not None:
+            options["until"] = until
+        return await self.call("getSignaturesForAddress", [address, options])
+
+    async def get_latest_blockhash(self, commitment="confirmed"):
+        return await self.call("getLatestBlockhash", [{"commitment": commitment}])
+
+    def stats(self):
+        return {
+            endpoint.url: {"requests": endpoint.requests, "failures": endpoint.failures,
+                           "latency_ms": endpoint.latency * 1000}
+            for endpoint in self.endpoints
+        }
+
+    async def close(self):
+        if self._pending:
+            self._flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        if self._owns_client:
+            await self._http_client.aclose()
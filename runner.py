@@ -0,0 +1,496 @@
+import argparse
+import asyncio
+import collections
+import multiprocessing
+import os
+import queue
+import signal
+import struct
+import threading
+import time
+import zlib
+
+import metrics
+from b58 import b58decode, b58encode_cached
+from structured_log import get_logger
+
+log = get_logger("runner")
+
+# Compact event framing between worker processes and the writer:
+# kind (u8) + body length (u32), then a kind-specific body
+EVENT_HEADER = struct.Struct('<BI')
+EVENT_ACCOUNT = 1   # slot (u64) + pubkey (32 raw bytes) + raw account bytes
+EVENT_MINT = 2      # timestamp (f64) + slot (u64, NO_SLOT if unknown) + mint (32 raw bytes) + signature (64 raw bytes)
+EVENT_SEEN = 3      # signature (64 raw bytes) settled without a mint, to mark seen
+ACCOUNT_BODY = struct.Struct('<Q32s')
+MINT_BODY = struct.Struct('<dQ32s64s')
+SEEN_BODY = struct.Struct('<64s')
+NO_SLOT = 2 ** 64 - 1
+
+# Events are packed into one bytes blob; flush when it passes this size
+SEND_BUFFER_BYTES = 256 * 1024
+EVENT_QUEUE_SIZE = 1024
+
+# Items waiting in a process for the feeder thread, and items packed into one queue put
+FEEDER_BACKLOG = 4096
+FEEDER_BATCH = 256
+
+# Per-shard queue of frame lists from a kind's reader process to its workers
+FRAME_QUEUE_SIZE = 1024
+
+# Seconds between worker liveness checks, and before restarting a dead worker
+SUPERVISE_INTERVAL = 1.0
+RESTART_DELAY = 2.0
+
+
+def encode_account_event(slot, pubkey, data):
+    return EVENT_HEADER.pack(EVENT_ACCOUNT, ACCOUNT_BODY.size + len(data)) + ACCOUNT_BODY.pack(slot, pubkey) + data
+
+
+def encode_mint_event(timestamp, slot, mint, signature):
+    return EVENT_HEADER.pack(EVENT_MINT, MINT_BODY.size) + MINT_BODY.pack(
+        timestamp, NO_SLOT if slot is None else slot, mint, signature)
+
+
+def encode_seen_event(signature):
+    return EVENT_HEADER.pack(EVENT_SEEN, SEEN_BODY.size) + SEEN_BODY.pack(signature)
+
+
+# Walk a packed blob of events
+def iter_events(blob):
+    """
+    Yield (EVENT_ACCOUNT, slot, pubkey_bytes, data),
+    (EVENT_MINT, timestamp, slot, mint_bytes, signature_bytes) or
+    (EVENT_SEEN, signature_bytes) tuples. A mint's slot is None if unknown.
+    """
+    view = memoryview(blob)
+    offset = 0
+    end = len(blob)
+    while offset < end:
+        kind, length = EVENT_HEADER.unpack_from(view, offset)
+        offset += EVENT_HEADER.size
+        if kind == EVENT_ACCOUNT:
+            slot, pubkey = ACCOUNT_BODY.unpack_from(view, offset)
+            yield kind, slot, pubkey, bytes(view[offset + ACCOUNT_BODY.size:offset + length])
+        elif kind == EVENT_MINT:
+            timestamp, slot, mint, signature = MINT_BODY.unpack_from(view, offset)
+            yield kind, timestamp, None if slot == NO_SLOT else slot, mint, signature
+        elif kind == EVENT_SEEN:
+            yield kind, SEEN_BODY.unpack_from(view, offset)[0]
+        offset += length
+
+
+# Non-blocking hand-off from an event loop to a bounded multiprocessing queue
+class _QueueFeeder:
+    """
+    `offer(item)` never blocks the caller: items wait in a local queue and a
+    feeder thread moves them to `target`, packing whatever has accumulated
+    (up to FEEDER_BATCH items) into one list per put. Only that thread waits
+    when the consumer process falls behind. Once FEEDER_BACKLOG items are
+    waiting, new ones are dropped and counted under `drop_metric`.
+    """
+
+    def __init__(self, target, drop_metric, name="feeder"):
+        self._target = target
+        self._drop_metric = drop_metric
+        self._pending = queue.Queue(FEEDER_BACKLOG)
+        self._thread = threading.Thread(target=self._feed, name=name, daemon=True)
+        self._thread.start()
+
+    def offer(self, item):
+        try:
+            self._pending.put_nowait(item)
+            return True
+        except queue.Full:
+            metrics.inc(self._drop_metric)
+            log.warning("consumer process is behind, dropping", metric=self._drop_metric)
+            return False
+
+    def _feed(self):
+        while True:
+            items = [self._pending.get()]
+            while len(items) < FEEDER_BATCH:
+                try:
+                    items.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = items[-1] is None
+            if stop:
+                items.pop()
+            if items:
+                self._target.put(items)
+            if stop:
+                return
+
+    def close(self, timeout=5.0):
+        try:
+            self._pending.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+# Worker-side buffer that ships packed events to the writer process
+class _EventSender:
+    def __init__(self, events):
+        self._feeder = _QueueFeeder(events, "runner_blobs_dropped", name="event-feeder")
+        self._buffer = bytearray()
+
+    def _add(self, event):
+        self._buffer += event
+        if len(self._buffer) >= SEND_BUFFER_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            if self._feeder.offer(bytes(self._buffer)):
+                metrics.inc("runner_blobs_sent")
+            self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._feeder.close()
+
+
+class JournalSender(_EventSender):
+    """Stands in for AccountJournal in bot.py's pipeline; the writer process owns the real journal."""
+
+    def append(self, slot, pubkey, data):
+        self._add(encode_account_event(slot, pubkey, data))
+
+
+class LogSender(_EventSender):
+    """Stands in for the mint log writer in newBot.py's pipeline."""
+
+    def append(self, record):
+        self._add(encode_mint_event(record['timestamp'], record['slot'], b58decode(record['mint_address']),
+                                    b58decode(record['signature'])))
+        # Mints are rare and latency-sensitive: ship each one immediately
+        self.flush()
+
+    def mark_seen(self, signature):
+        self._add(encode_seen_event(b58decode(signature)))
+        self.flush()
+
+
+# Worker-side view of the writer's SeenStore for the resolve stage and backfill
+class _WorkerSeen:
+    """
+    Membership and the checkpoint are read from the shared mapping of the
+    writer's file; marks go to the writer as events, so only the writer
+    process ever modifies the store.
+    """
+
+    def __init__(self, path, sender):
+        from seen_store import SeenStore
+
+        self._store = SeenStore(path)
+        self._sender = sender
+        self.checkpoint_slot = self._store.checkpoint_slot
+
+    def __contains__(self, signature):
+        return signature in self._store
+
+    def add(self, signature):
+        self._sender.mark_seen(signature)
+
+    def close(self):
+        self._store.close()
+
+
+# Deterministic shard assignment (str hash() is salted per process)
+def shard_of(key, shards):
+    if key is None:
+        return 0
+    if isinstance(key, tuple):
+        key = key[0]
+    return zlib.crc32(key.encode()) % shards
+
+
+def _subscription(kind):
+    """(endpoints, subscribe callable) for a subscription kind; imports only that bot."""
+    if kind == "program":
+        import bot
+        return bot.WSS_ENDPOINTS, bot.subscribe_to_pump_program
+    import newBot
+    return newBot.SOCKET_URLS, newBot.subscribe_to_mint_authority
+
+
+def _queue_receive(frames):
+    """Async receive over a shard's frame queue; lists are fetched off the event loop."""
+    pending = collections.deque()
+
+    async def receive():
+        while not pending:
+            pending.extend(await asyncio.to_thread(frames.get))
+        return pending.popleft()
+    return receive
+
+
+def _pin_to_core(core):
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError as e:
+            log.warning("could not pin process", core=core, error=repr(e))
+
+
+# Reader process: the one subscription of a sharded kind, fanned out to its workers by dedup key
+async def _run_reader(kind, shard_queues, metrics_port):
+    from ws_manager import ConnectionManager, notification_key
+
+    endpoints, subscribe = _subscription(kind)
+    shards = len(shard_queues)
+    feeders = [_QueueFeeder(frames, "runner_frames_dropped", name=f"shard-{shard}-feeder")
+               for shard, frames in enumerate(shard_queues)]
+    metrics_server = await metrics.start_http_server(port=metrics_port) if metrics.ENABLED else None
+    try:
+        async with ConnectionManager(endpoints, subscribe) as manager:
+            while True:
+                frame = await manager.recv()
+                feeders[shard_of(notification_key(frame), shards)].offer(frame)
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        for feeder in feeders:
+            feeder.close()
+
+
+def reader_main(kind, shard_queues, core, metrics_port):
+    """Process entry point; must stay importable under the spawn start method."""
+    _pin_to_core(core)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent coordinates shutdown
+    asyncio.run(_run_reader(kind, shard_queues, metrics_port))
+
+
+# Worker process: one subscription kind, one shard, sends events to the writer
+async def _run_worker(kind, shard, events, frames, seen_file, metrics_port):
+    """
+    `frames` is the shard's queue from the reader, or None to subscribe
+    directly (single shard). Mint workers skip signatures in the writer's
+    seen store, and shard 0 backfills the gap since its checkpoint.
+    """
+    from ws_manager import ConnectionManager
+
+    seen = None
+    backfill = None
+    if kind == "program":
+        import bot
+        sender = JournalSender(events)
+        pipeline = bot.build_pipeline(sender)
+        resolver = None
+    else:
+        import newBot
+        from mint_resolver import MintResolver
+        from seen_store import backfill_mints
+        sender = LogSender(events)
+        resolver = MintResolver(newBot.RPC_URL)
+        seen = _WorkerSeen(seen_file, sender)
+        pipeline = newBot.build_pipeline(sender, resolver, seen=seen)
+        if shard == 0:
+            backfill = asyncio.ensure_future(backfill_mints(
+                resolver, seen, newBot.MINT_AUTHORITY_PUBKEY,
+                lambda signature, slot, mint_address: sender.append(
+                    newBot.mint_record(signature, slot, mint_address))))
+
+    metrics_server = await metrics.start_http_server(port=metrics_port) if metrics.ENABLED else None
+    try:
+        if frames is not None:
+            await pipeline.run(_queue_receive(frames))
+        else:
+            async with ConnectionManager(*_subscription(kind)) as manager:
+                await pipeline.run(manager.recv)
+    finally:
+        if backfill is not None:
+            backfill.cancel()
+            await asyncio.gather(backfill, return_exceptions=True)
+        if metrics_server is not None:
+            metrics_server.close()
+        pipeline.close()
+        sender.close()
+        if resolver is not None:
+            await resolver.close()
+        if seen is not None:
+            seen.close()
+
+
+def worker_main(kind, shard, events, frames, seen_file, core, metrics_port):
+    """Process entry point; must stay importable under the spawn start method."""
+    _pin_to_core(core)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent coordinates shutdown
+    asyncio.run(_run_worker(kind, shard, events, frames, seen_file, metrics_port))
+
+
+# Single writer: the only process that touches the journal, the mint log and the seen store
+class EventWriter:
+    """
+    Mint records have newBot.mint_record's shape, and each signature is
+    marked seen (and the checkpoint advanced) only once its record is on
+    disk, as in the single-process listener.
+    """
+
+    def __init__(self, journal_dir, log_store_file, legacy_json_log_file, seen_file):
+        from account_journal import AccountJournal
+        from mint_log_store import init_log_store
+        from newBot import mint_record
+        from seen_store import SeenStore
+
+        self._mint_record = mint_record
+        self.journal = AccountJournal(journal_dir)
+        self.seen = SeenStore(seen_file)
+        self.log_writer = init_log_store(log_store_file, legacy_json_log_file,
+                                         on_persisted=self.seen.record_persisted)
+
+    def write_blobs(self, blobs):
+        for blob in blobs:
+            self.write_blob(blob)
+
+    def write_blob(self, blob):
+        wrote_accounts = False
+        for event in iter_events(blob):
+            if event[0] == EVENT_ACCOUNT:
+                _, slot, pubkey, data = event
+                self.journal.append(slot, pubkey, data)
+                wrote_accounts = True
+            elif event[0] == EVENT_MINT:
+                _, timestamp, slot, mint, signature = event
+                signature, mint = b58encode_cached(signature), b58encode_cached(mint)
+                self.log_writer.append(self._mint_record(signature, slot, mint, timestamp))
+                log.info("mint detected", signature=signature, mint=mint, slot=slot)
+            else:
+                self.seen.add(b58encode_cached(event[1]))
+        if wrote_accounts:
+            self.journal.flush()
+
+    def close(self):
+        self.journal.close()
+        self.log_writer.close()
+        self.seen.close()
+
+
+# Parent process: starts pinned workers, supervises them, and runs the writer
+class Runner:
+    """
+    Runs each subscription kind in `workers[kind]` processes.
+
+    A kind with one worker subscribes in that worker. A kind with several
+    gets one extra reader process that holds the only subscription (so
+    bandwidth and rate-limit exposure do not grow with the worker count)
+    and fans frames out by dedup key (CRC32 of the account pubkey or
+    signature), so JSON/base64/decode work scales across cores. Each
+    process is pinned to its own core when the platform allows; the writer
+    stays on the first available core. Dead processes are restarted after
+    RESTART_DELAY without pausing the writer.
+    """
+
+    def __init__(self, workers, journal_dir, log_store_file, legacy_json_log_file, seen_file, pin=True):
+        self.workers = {kind: count for kind, count in workers.items() if count > 0}
+        self.journal_dir = journal_dir
+        self.log_store_file = log_store_file
+        self.legacy_json_log_file = legacy_json_log_file
+        self.seen_file = seen_file
+        self.pin = pin
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue(EVENT_QUEUE_SIZE)
+        self._processes = {}
+        self._restart_at = {}
+        self._cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+
+    def _specs(self):
+        # (name, target, args before core and metrics port) for every process to run
+        for kind, count in self.workers.items():
+            if count == 1:
+                yield f"{kind}-0", worker_main, (kind, 0, self._events, None, self.seen_file)
+                continue
+            shard_queues = [self._context.Queue(FRAME_QUEUE_SIZE) for _ in range(count)]
+            yield f"{kind}-reader", reader_main, (kind, shard_queues)
+            for shard, frames in enumerate(shard_queues):
+                yield f"{kind}-{shard}", worker_main, (kind, shard, self._events, frames, self.seen_file)
+
+    def _start(self, index, name, target, args):
+        core = self._cores[index % len(self._cores)] if self.pin and self._cores else None
+        process = self._context.Process(
+            target=target,
+            args=args + (core, metrics.DEFAULT_HTTP_PORT + index),
+            name=name,
+            daemon=True,
+        )
+        process.start()
+        log.info("worker started", worker=process.name, pid=process.pid, core=core)
+        self._processes[index] = (process, name, target, args)
+
+    def _supervise(self):
+        # Restarts are scheduled, never slept on: the writer keeps draining events meanwhile
+        now = time.monotonic()
+        for index, (process, name, target, args) in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            restart_at = self._restart_at.get(index)
+            if restart_at is None:
+                metrics.inc("runner_worker_restarts")
+                log.warning("worker exited, restarting", worker=name, exitcode=process.exitcode,
+                            delay=RESTART_DELAY)
+                self._restart_at[index] = now + RESTART_DELAY
+            elif now >= restart_at:
+                del self._restart_at[index]
+                self._start(index, name, target, args)
+
+    def run(self):
+        if self.pin and self._cores:
+            _pin_to_core(self._cores[0])
+        # Created before any worker starts, so workers always find the seen store on disk
+        writer = EventWriter(self.journal_dir, self.log_store_file, self.legacy_json_log_file, self.seen_file)
+        for index, spec in enumerate(self._specs(), start=1):
+            self._start(index, *spec)
+        next_check = time.monotonic() + SUPERVISE_INTERVAL
+        try:
+            while True:
+                try:
+                    writer.write_blobs(self._events.get(timeout=SUPERVISE_INTERVAL))
+                except queue.Empty:
+                    pass
+                if time.monotonic() >= next_check:
+                    self._supervise()
+                    next_check = time.monotonic() + SUPERVISE_INTERVAL
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop(writer)
+
+    def _stop(self, writer):
+        for process, *_ in self._processes.values():
+            process.terminate()
+        for process, *_ in self._processes.values():
+            process.join(timeout=5)
+        # Keep whatever the workers managed to send before exiting
+        while True:
+            try:
+                writer.write_blobs(self._events.get_nowait())
+            except queue.Empty:
+                break
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pump.fun listeners as pinned worker processes with one writer.")
+    parser.add_argument("--program-workers", type=int, default=max(1, (os.cpu_count() or 2) - 2),
+                        help="processes sharing the programSubscribe stream (sharded by account); "
+                             "more than one adds a reader process that holds the single subscription")
+    parser.add_argument("--mint-workers", type=int, default=1,
+                        help="processes sharing the mint-authority logs stream (sharded by signature)")
+    parser.add_argument("--journal-dir", default=os.path.join("data", "account_journal"))
+    parser.add_argument("--log-store", default="minted_tokens_log.jsonl")
+    parser.add_argument("--legacy-json-log", default="minted_tokens_log.json")
+    parser.add_argument("--seen-store", default="seen_signatures.bin",
+                        help="persisted seen signatures and checkpoint, shared with newBot.py")
+    parser.add_argument("--no-pin", action="store_true", help="do not set CPU affinity")
+    args = parser.parse_args(argv)
+
+    Runner(
+        {"program": args.program_workers, "mints": args.mint_workers},
+        args.journal_dir, args.log_store, args.legacy_json_log, args.seen_store, pin=not args.no_pin,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from structured_log import get_logger
+
+log = get_logger("seen")
+
+# Default file next to the mint log; slots per generation (power of two)
+DEFAULT_SEEN_FILE = "seen_signatures.bin"
+DEFAULT_CAPACITY = 1 << 20
+
+# A generation is retired once it is this full; probes stay short below 50% load
+MAX_LOAD = 0.5
+
+# Fixed header: magic, capacity, active generation, per-generation counts, checkpoint slot and signature
+_MAGIC = b"PFSEEN01"
+_HEADER = struct.Struct('<8sQQQQQ88s')
+_HEADER_SIZE = 256
+_KEY_SIZE = 16
+_EMPTY = bytes(_KEY_SIZE)
+
+# Backfill walks this many slots behind the checkpoint (out-of-order writes) and at most this many signatures
+BACKFILL_SLOT_MARGIN = 150
+BACKFILL_MAX_SIGNATURES = 20000
+BACKFILL_PAGE_SIZE = 1000
+BACKFILL_CONCURRENCY = 32
+
+# Seconds between msyncs of the mapping from record_persisted
+FLUSH_INTERVAL = 1.0
+
+
+def _key(signature):
+    key = hashlib.blake2b(signature.encode(), digest_size=_KEY_SIZE).digest()
+    return key if key != _EMPTY else b"\x01" + key[1:]
+
+
+# Memory-mapped seen-signature set plus the last persisted slot
+class SeenStore:
+    """
+    Persistent set of processed signatures with O(1) membership across restarts.
+
+    The file is two open-addressing hash tables ("generations") of 16-byte
+    BLAKE2b keys, memory-mapped. New signatures go into the active
+    generation; lookups check both. When the active one reaches MAX_LOAD it
+    rotates: the older generation is cleared and becomes active, so the
+    file stays a fixed size while remembering at least `capacity * MAX_LOAD`
+    recent signatures. The header also holds the checkpoint: the highest
+    slot (and its signature) whose record has been persisted.
+
+    Writes land in the page cache immediately, so a process crash loses
+    nothing; `flush()` (msync) makes them durable against power loss.
+    """
+
+    def __init__(self, path=DEFAULT_SEEN_FILE, capacity=DEFAULT_CAPACITY):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        exists = os.path.exists(path) and os.path.getsize(path) >= _HEADER_SIZE
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        if exists:
+            magic, capacity, *_ = _HEADER.unpack(self._file.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a seen-signature file")
+        # Sparse file: pages are only allocated once a slot in them is written
+        self._file.truncate(_HEADER_SIZE + 2 * capacity * _KEY_SIZE)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        self.capacity = capacity
+        self._mask = capacity - 1
+        if exists:
+            _, _, self._active, count0, count1, self.checkpoint_slot, signature = _HEADER.unpack_from(self._mm, 0)
+            self._counts = [count0, count1]
+            self.checkpoint_signature = signature.rstrip(b"\0").decode() or None
+        else:
+            self._active = 0
+            self._counts = [0, 0]
+            self.checkpoint_slot = 0
+            self.checkpoint_signature = None
+            self._write_header()
+
+    def _write_header(self):
+        signature = (self.checkpoint_signature or "").encode()
+        _HEADER.pack_into(self._mm, 0, _MAGIC, self.capacity, self._active, self._counts[0], self._counts[1],
+                          self.checkpoint_slot, signature)
+
+    def _probe(self, generation, key):
+        # Returns (found, offset of the matching or first empty slot)
+        base = _HEADER_SIZE + generation * self.capacity * _KEY_SIZE
+        index = int.from_bytes(key[:8], 'little') & self._mask
+        mm = self._mm
+        while True:
+            offset = base + index * _KEY_SIZE
+            slot = mm[offset:offset + _KEY_SIZE]
+            if slot == key:
+                return True, offset
+            if slot == _EMPTY:
+                return False, offset
+            index = (index + 1) & self._mask
+
+    def __contains__(self, signature):
+        key = _key(signature)
+        with self._lock:
+            return self._probe(self._active, key)[0] or self._probe(1 - self._active, key)[0]
+
+    def add(self, signature):
+        """Mark `signature` seen; returns False if it already was."""
+        key = _key(signature)
+        with self._lock:
+            found, offset = self._probe(self._active, key)
+            if found or self._probe(1 - self._active, key)[0]:
+                return False
+            self._mm[offset:offset + _KEY_SIZE] = key
+            self._counts[self._active] += 1
+            if self._counts[self._active] >= self.capacity * MAX_LOAD:
+                self._rotate()
+            self._write_header()
+            return True
+
+    def _rotate(self):
+        retired = 1 - self._active
+        base = _HEADER_SIZE + retired * self.capacity * _KEY_SIZE
+        self._mm[base:base + self.capacity * _KEY_SIZE] = bytes(self.capacity * _KEY_SIZE)
+        self._counts[retired] = 0
+        self._active = retired
+        log.info("seen set rotated", generation=retired, capacity=self.capacity)
+
+    def set_checkpoint(self, slot, signature=None):
+        """Advance the checkpoint; older slots are ignored so out-of-order writes never move it back."""
+        with self._lock:
+            if slot > self.checkpoint_slot:
+                self.checkpoint_slot = slot
+                self.checkpoint_signature = signature
+                self._write_header()
+
+    def record_persisted(self, records):
+        """BatchedLogWriter callback: mark each written record's signature seen and advance the checkpoint."""
+        newest = None
+        for record in records:
+            signature = record.get('signature')
+            if signature is None:
+                continue
+            self.add(signature)
+            slot = record.get('slot')
+            if slot is not None and (newest is None or slot > newest[0]):
+                newest = (slot, signature)
+        if newest is not None:
+            self.set_checkpoint(*newest)
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def __len__(self):
+        return self._counts[0] + self._counts[1]
+
+    def stats(self):
+        return {"signatures": len(self), "active_generation": self._active, "capacity": self.capacity,
+                "checkpoint_slot": self.checkpoint_slot}
+
+    def flush(self):
+        with self._lock:
+            self._mm.flush()
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._mm.close()
+        self._file.close()
+
+
+# Signatures mentioning `address` since the checkpoint that have not been processed
+async def missed_signatures(rpc, address, store, margin=BACKFILL_SLOT_MARGIN, max_signatures=BACKFILL_MAX_SIGNATURES,
+                            page_size=BACKFILL_PAGE_SIZE):
+    """
+    Yield (signature, slot) newest first, walking getSignaturesForAddress back
+    to `margin` slots before the checkpoint. Failed and already-seen
+    signatures are skipped. Nothing is yielded before the first checkpoint.
+    """
+    if not store.checkpoint_slot:
+        return
+    floor = store.checkpoint_slot - margin
+    before = None
+    scanned = 0
+    while scanned < max_signatures:
+        page = await rpc.get_signatures_for_address(address, before=before, limit=page_size)
+        if not page:
+            return
+        for entry in page:
+            if entry["slot"] < floor:
+                return
+            scanned += 1
+            if entry.get("err") is None and entry["signature"] not in store:
+                yield entry["signature"], entry["slot"]
+        before = page[-1]["signature"]
+    log.warning("backfill stopped before reaching the checkpoint", scanned=scanned,
+                checkpoint_slot=store.checkpoint_slot)
+
+
+# Re-run missed signatures through the resolver after a restart
+async def backfill_mints(resolver, store, address, on_mint, concurrency=BACKFILL_CONCURRENCY):
+    """
+    Resolve every signature in `missed_signatures` and call on_mint(signature, slot, mint_address)
+    for new mints. Signatures whose transaction was fetched and holds no
+    create are marked seen directly; mints are marked once their record is
+    persisted. Lookups that failed are left unmarked so the next backfill
+    retries them. Returns the number of mints recovered.
+    """
+    if resolver.rpc is None or not store.checkpoint_slot:
+        return 0
+    since = store.checkpoint_slot
+    missed = [item async for item in missed_signatures(resolver.rpc, address, store)]
+    recovered = 0
+    unresolved = 0
+
+    async def resolve_one(signature, slot):
+        nonlocal unresolved
+        mint_address, is_new = await resolver.resolve(signature)
+        if mint_address is not None:
+            if not is_new:
+                return 0
+            on_mint(signature, slot, mint_address)
+            return 1
+        if resolver.settled(signature):
+            store.add(signature)
+        else:
+            unresolved += 1
+        return 0
+
+    # Concurrent lookups are coalesced into batched getTransaction requests by the RpcClient
+    for start in range(0, len(missed), concurrency):
+        recovered += sum(await asyncio.gather(*(resolve_one(*item) for item in missed[start:start + concurrency])))
+    log.info("backfill finished", since_slot=since, unseen=len(missed), recovered=recovered, unresolved=unresolved)
+    return recovered
+
+
+# Membership cost and persistence check on a scratch file
+def benchmark(count=200000, path="seen_benchmark.bin"):
+    if os.path.exists(path):
+        os.remove(path)
+    signatures = [f"{i:064x}" for i in range(count)]
+    store = SeenStore(path, capacity=1 << 19)
+    start = time.perf_counter()
+    for signature in signatures:
+        store.add(signature)
+    elapsed = time.perf_counter() - start
+    print(f"add       {elapsed * 1e6 / count:6.2f} us/signature")
+    store.set_checkpoint(300_000_123, signatures[-1])
+    store.close()
+
+    store = SeenStore(path)
+    start = time.perf_counter()
+    hits = sum(1 for signature in signatures if signature in store)
+    elapsed = time.perf_counter() - start
+    misses = sum(1 for i in range(count) if f"{i:063x}z" in store)
+    print(f"contains  {elapsed * 1e6 / count:6.2f} us/signature after reopen, {hits}/{count} hits, "
+          f"{misses} false hits, checkpoint={store.checkpoint_slot}")
+    store.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from structured_log import get_logger
+
+log = get_logger("startup")
+
+# Resolved-once startup facts live here, e.g. PUMPFUN_CACHE_DIR=/var/cache/pumpfunbot
+CACHE_DIR = os.environ.get("PUMPFUN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pumpfunbot"))
+CACHE_FILE = "startup.json"
+
+# RPC metadata (genesis hash, node version) is re-fetched after this many seconds
+RPC_METADATA_TTL = 24 * 3600
+
+MAINNET_GENESIS_HASH = "5eykt4UsFv8P8NJdTREpY1vzqKqZKvdpKuc147dw2N9d"
+
+
+def _cache_path():
+    return os.path.join(CACHE_DIR, CACHE_FILE)
+
+
+def _load():
+    try:
+        with open(_cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(cache):
+    # Write-then-rename so concurrent starts never read a torn file
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".startup-", suffix=".json")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, _cache_path())
+
+
+# chromedriver binary, resolved by webdriver_manager only on a cache miss
+def chromedriver_path(refresh=False):
+    """
+    Path of a chromedriver binary.
+
+    ChromeDriverManager().install() does network and filesystem version
+    resolution on every call; its result is cached here and reused as long
+    as the binary still exists. Pass refresh=True after Chrome was updated
+    and the cached driver no longer starts a session.
+    """
+    cache = _load()
+    path = cache.get("chromedriver")
+    if not refresh and path and os.access(path, os.X_OK):
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    started = time.perf_counter()
+    path = ChromeDriverManager().install()
+    log.info("resolved chromedriver", path=path, seconds=round(time.perf_counter() - started, 3))
+    cache["chromedriver"] = path
+    _save(cache)
+    return path
+
+
+# Genesis hash and node version per RPC URL
+async def rpc_metadata(rpc, url, refresh=False):
+    """Return {"genesis_hash", "version", "fetched_at"} for `url`, from the cache while fresh."""
+    cache = _load()
+    entry = cache.get("rpc", {}).get(url)
+    if not refresh and entry and time.time() - entry["fetched_at"] < RPC_METADATA_TTL:
+        return entry
+    genesis_hash, version = await asyncio.gather(rpc.call("getGenesisHash"), rpc.call("getVersion"))
+    entry = {"genesis_hash": genesis_hash, "version": version.get("solana-core"), "fetched_at": time.time()}
+    cache = _load()
+    cache.setdefault("rpc", {})[url] = entry
+    _save(cache)
+    return entry
+
+
+async def check_cluster(rpc, url, expected_genesis_hash=MAINNET_GENESIS_HASH):
+    """Warn if `url` is not on the expected cluster; never blocks startup on failure."""
+    try:
+        metadata = await rpc_metadata(rpc, url)
+    except Exception as e:
+        log.warning("could not fetch RPC metadata", url=url, error=repr(e))
+        return None
+    if metadata["genesis_hash"] != expected_genesis_hash:
+        log.warning("RPC endpoint is not on the expected cluster", url=url,
+                    genesis_hash=metadata["genesis_hash"], expected=expected_genesis_hash)
+    return metadata
@@ -0,0 +1,105 @@
+import logging
+import os
+import sys
+import time
+
+# Root level for every bot logger, e.g. PUMPFUN_LOG_LEVEL=DEBUG
+LOG_LEVEL = os.environ.get("PUMPFUN_LOG_LEVEL", "INFO").upper()
+
+# Per-message budget: at most RATE_LIMIT_COUNT lines per RATE_LIMIT_INTERVAL seconds
+RATE_LIMIT_COUNT = 10
+RATE_LIMIT_INTERVAL = 1.0
+
+_configured = False
+
+
+# One line per event: time level logger message key=value ...
+class KeyValueFormatter(logging.Formatter):
+    def format(self, record):
+        line = (f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d} "
+                f"{record.levelname} {record.name} {record.getMessage()}")
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _configure():
+    global _configured
+    if _configured:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(KeyValueFormatter())
+    root = logging.getLogger("pumpfun")
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+    _configured = True
+
+
+# Leveled logger with structured fields and per-message rate limiting
+class StructuredLogger:
+    """
+    Thin wrapper over `logging` for the bots.
+
+    Messages are constant strings and variable data goes in keyword fields,
+    so the message doubles as the rate-limit key: a message that fires more
+    than `rate` times per `interval` is suppressed and the next emitted line
+    carries a `suppressed=<n>` field. Disabled levels cost one
+    `isEnabledFor` check.
+    """
+
+    def __init__(self, name, rate=RATE_LIMIT_COUNT, interval=RATE_LIMIT_INTERVAL):
+        _configure()
+        self._logger = logging.getLogger(f"pumpfun.{name}")
+        self.rate = rate
+        self.interval = interval
+        self._windows = {}
+
+    def _allow(self, msg):
+        now = time.monotonic()
+        window = self._windows.get(msg)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[msg] = [now, 1, 0]
+            return True, suppressed
+        if window[1] < self.rate:
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+            return True, suppressed
+        window[2] += 1
+        return False, 0
+
+    def log(self, level, msg, exc_info=None, **fields):
+        if not self._logger.isEnabledFor(level):
+            return
+        allowed, suppressed = self._allow(msg)
+        if not allowed:
+            return
+        if suppressed:
+            fields['suppressed'] = suppressed
+        self._logger.log(level, msg, exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, msg, **fields):
+        self.log(logging.DEBUG, msg, **fields)
+
+    def info(self, msg, **fields):
+        self.log(logging.INFO, msg, **fields)
+
+    def warning(self, msg, **fields):
+        self.log(logging.WARNING, msg, **fields)
+
+    def error(self, msg, **fields):
+        self.log(logging.ERROR, msg, **fields)
+
+    def exception(self, msg, **fields):
+        self.log(logging.ERROR, msg, exc_info=True, **fields)
+
+    def is_enabled_for(self, level):
+        return self._logger.isEnabledFor(level)
+
+
+def get_logger(name):
+    return StructuredLogger(name)
@@ -0,0 +1,84 @@
+import asyncio
+import copy
+
+from indexer import Indexer, _row_keys, _synthetic_history, decode_transaction, read_rows
+from instruction_decoder import PUMP_FUN_PROGRAM_ID
+from mock_rpc import MockRpcServer
+from rpc_client import RpcClient
+
+ENTRIES, TRANSACTIONS = _synthetic_history(300)
+PAGE_SIZE = 50
+
+
+def _with_server(body):
+    async def run():
+        async with MockRpcServer(transactions=dict(TRANSACTIONS), signatures={PUMP_FUN_PROGRAM_ID: ENTRIES}) as server:
+            return await body(server)
+
+    return asyncio.run(run())
+
+
+async def _index(server, out_dir, max_pages=None):
+    rpc = RpcClient(server.url, rate_limit=1e6, burst=1000, max_batch=16)
+    try:
+        return await Indexer(rpc, out_dir, workers=16, page_size=PAGE_SIZE, retry_delay=0.01).run(max_pages)
+    finally:
+        await rpc.close()
+
+
+def _expected_keys():
+    return sorted((row["signature"], row["ix_index"], -1 if row["inner_index"] is None else row["inner_index"])
+                  for tx in TRANSACTIONS.values() for row in decode_transaction(tx))
+
+
+def test_decode_transaction_rows():
+    create = TRANSACTIONS[ENTRIES[-1]["signature"]]  # i == 0: a create plus a buy, but failed
+    assert decode_transaction(create) == []
+    tx = TRANSACTIONS[ENTRIES[-11]["signature"]]  # i == 10: a successful create plus a buy
+    rows = decode_transaction(tx)
+    assert [(row["kind"], row["ix_index"], row["inner_index"]) for row in rows] == [("create", 0, None), ("buy", 1, None)]
+    assert rows[0]["name"] == "Token 10" and rows[0]["symbol"] == "T10"
+    assert rows[1]["token_amount"] == 11_000_000 and rows[1]["sol_amount"] == 40_000_010
+    assert rows[1]["sol_limit"] == 50_000_000
+
+
+def test_inner_index_zero_is_kept():
+    tx = copy.deepcopy(TRANSACTIONS[ENTRIES[-2]["signature"]])  # i == 1: a single buy
+    message = tx["transaction"]["message"]
+    system_program = message["accountKeys"].index("11111111111111111111111111111111")
+    tx["meta"]["innerInstructions"] = [{"index": 0, "instructions": message["instructions"]}]
+    message["instructions"] = [{"programIdIndex": system_program, "data": "", "accounts": []}]
+    (row,) = decode_transaction(tx)
+    assert (row["ix_index"], row["inner_index"]) == (0, 0)
+
+
+def test_interrupted_run_resumes_from_the_saved_cursor(tmp_path):
+    async def body(server):
+        first = await _index(server, str(tmp_path), max_pages=2)
+        assert first["pages"] == 2 and not first["done"]
+        return await _index(server, str(tmp_path))
+
+    state = _with_server(body)
+    keys = _row_keys(str(tmp_path))
+    assert state["done"] and state["missing"] == 0
+    assert state["signatures"] == len(ENTRIES)
+    assert keys == _expected_keys() and len(keys) == len(set(keys))
+    assert state["rows"] == len(keys)
+
+
+def test_missing_signatures_are_retried_by_the_next_run(tmp_path):
+    hidden = [entry["signature"] for entry in ENTRIES[1::25] if entry["err"] is None]
+
+    async def body(server):
+        held_back = {signature: server.transactions.pop(signature) for signature in hidden}
+        first = await _index(server, str(tmp_path))
+        assert first["done"] and sorted(first["missing_signatures"]) == sorted(hidden)
+        assert first["missing"] == len(hidden)
+        server.transactions.update(held_back)
+        return await _index(server, str(tmp_path))
+
+    state = _with_server(body)
+    assert state["missing"] == 0 and state["missing_signatures"] == [] and state["retries"] == 1
+    keys = _row_keys(str(tmp_path))
+    assert keys == _expected_keys() and len(keys) == len(set(keys))
+    assert state["rows"] == len(list(read_rows(str(tmp_path))))
@@ -0,0 +1,78 @@
+import base64
+import json
+import os
+
+import pytest
+
+from b58 import b58decode
+from instruction_decoder import PUMP_FUN_DECODER, PUMP_FUN_IDL, DecodeError
+
+with open(os.path.join(os.path.dirname(__file__), "fixtures", "pump_fun_payloads.json"), encoding="utf-8") as f:
+    FIXTURES = json.load(f)
+
+# On-chain discriminators of the deployed program, independent of how the decoder derives them
+PROGRAM_DISCRIMINATORS = {
+    "create": "181ec828051c0777",
+    "buy": "66063d1201daebea",
+    "sell": "33e685a4017f83ad",
+    "setParams": "a51f8635bdb482ff",
+    "CreateEvent": "1b72a94ddeeb6376",
+    "TradeEvent": "bddb7fd34ee661ee",
+}
+
+INSTRUCTIONS = FIXTURES["instructions"]
+EVENTS = FIXTURES["events"]
+
+
+def _ids(cases):
+    return [case["name"] for case in cases]
+
+
+@pytest.mark.parametrize("name, discriminator", PROGRAM_DISCRIMINATORS.items())
+def test_discriminators_match_the_program(name, discriminator):
+    compiled = PUMP_FUN_DECODER.events[name] if name in PUMP_FUN_DECODER.events else PUMP_FUN_DECODER[name]
+    assert compiled.discriminator.hex() == discriminator
+
+
+@pytest.mark.parametrize("case", INSTRUCTIONS, ids=_ids(INSTRUCTIONS))
+def test_instructions_decode_to_expected_values(case):
+    data = b58decode(case["data"])
+    assert data[:8].hex() == PROGRAM_DISCRIMINATORS[case["name"]]
+    assert PUMP_FUN_DECODER.decode(data, case["accounts"]) == (case["name"], case["expected"])
+
+
+@pytest.mark.parametrize("case", INSTRUCTIONS, ids=_ids(INSTRUCTIONS))
+def test_instructions_decode_from_a_memoryview_slice(case):
+    data = b58decode(case["data"])
+    view = memoryview(b"\xff" * 13 + data + b"\xff" * 7)[13:13 + len(data)]
+    assert PUMP_FUN_DECODER.decode(view, case["accounts"]) == (case["name"], case["expected"])
+
+
+@pytest.mark.parametrize("case", INSTRUCTIONS, ids=_ids(INSTRUCTIONS))
+def test_truncated_instructions_raise_decode_error(case):
+    data = b58decode(case["data"])
+    for end in range(8, len(data)):
+        with pytest.raises(DecodeError):
+            PUMP_FUN_DECODER.decode(data[:end])
+
+
+@pytest.mark.parametrize("case", EVENTS, ids=_ids(EVENTS))
+def test_events_decode_to_expected_values(case):
+    payload = base64.b64decode(case["data"])
+    assert PUMP_FUN_DECODER.decode_event(payload) == (case["name"], case["expected"])
+
+
+def test_unknown_discriminator_is_not_decoded():
+    assert PUMP_FUN_DECODER.decode(b"\0" * 24) is None
+    assert PUMP_FUN_DECODER.decode_event(b"\0" * 24) is None
+
+
+def test_bot_decode_create_instruction_keeps_its_signature():
+    import bot
+
+    case = INSTRUCTIONS[0]
+    ix_def = next(ix for ix in PUMP_FUN_IDL["instructions"] if ix["name"] == "create")
+    data = b58decode(case["data"])
+    assert bot.decode_create_instruction(data, ix_def, case["accounts"]) == case["expected"]
+    assert bot.decode_create_instruction(data, dict(ix_def, args=list(ix_def["args"])), case["accounts"]) == \
+        case["expected"]
@@ -0,0 +1,46 @@
+import sys
+import threading
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    monkeypatch.setattr(metrics, "_counters", {})
+    monkeypatch.setattr(metrics, "_histograms", {})
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible so lost updates would show
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _in_threads(fn, threads=8):
+    workers = [threading.Thread(target=fn) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def test_counter_increments_from_threads_are_not_lost(enabled):
+    _in_threads(lambda: [metrics.inc("persisted_records", 2) for _ in range(20000)])
+    assert metrics.counter("persisted_records").value == 8 * 20000 * 2
+    assert "pumpfun_persisted_records_total 320000" in metrics.render_text()
+
+
+def test_histogram_records_from_threads_are_not_lost(enabled):
+    _in_threads(lambda: [metrics.observe("persist_seconds", 0.001, count=3) for _ in range(5000)])
+    hist = metrics.histogram("persist_seconds")
+    assert hist.count == sum(hist.counts) == 8 * 5000 * 3
+    assert hist.sum_ns == hist.count * 1_000_000
+    assert 'pumpfun_persist_seconds_count 120000' in metrics.render_text()
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    monkeypatch.setattr(metrics, "_counters", {})
+    metrics.inc("ws_frames")
+    assert metrics._counters == {}
@@ -0,0 +1,65 @@
+import json
+import threading
+
+from mint_log_store import BatchedLogWriter, JsonlLogStore, SqliteLogStore
+
+
+def _record(i):
+    return {"mint_address": f"mint{i % 7}", "transaction_url": f"https://explorer.solana.com/tx/{i}",
+            "timestamp": float(i), "signature": str(i), "slot": i}
+
+
+def test_jsonl_store_cuts_a_torn_last_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text(json.dumps(_record(0)) + "\n" + json.dumps(_record(1))[:20], encoding="utf-8")
+    store = JsonlLogStore(str(path))
+    store.write_batch([_record(2)])
+    store.close()
+    assert path.read_text(encoding="utf-8").endswith("\n")
+    assert list(JsonlLogStore(str(path)).read_all()) == [_record(0), _record(2)]
+
+
+def test_jsonl_store_keeps_a_complete_line_without_newline(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text(json.dumps(_record(0)), encoding="utf-8")
+    store = JsonlLogStore(str(path))
+    store.write_batch([_record(1)])
+    store.close()
+    assert list(JsonlLogStore(str(path)).read_all()) == [_record(0), _record(1)]
+
+
+def test_jsonl_store_with_only_a_torn_line(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"mint_addr', encoding="utf-8")
+    store = JsonlLogStore(str(path))
+    store.write_batch([_record(0)])
+    store.close()
+    assert path.read_text(encoding="utf-8") == json.dumps(_record(0)) + "\n"
+
+
+def test_sqlite_store_reads_while_the_writer_thread_writes(tmp_path):
+    store = SqliteLogStore(str(tmp_path / "log.db"))
+    writer = BatchedLogWriter(store, batch_size=10, flush_interval=0.001)
+    errors = []
+
+    def read():
+        try:
+            for _ in range(200):
+                store.find_by_mint("mint3")
+                list(store.read_all())
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(2000):
+        writer.append(_record(i))
+    for reader in readers:
+        reader.join()
+    writer.close()
+    assert errors == []
+    store = SqliteLogStore(str(tmp_path / "log.db"))
+    assert list(store.read_all()) == [_record(i) for i in range(2000)]
+    assert store.find_by_mint("mint3") == [_record(i) for i in range(3, 2000, 7)]
+    store.close()
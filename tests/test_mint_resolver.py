@@ -0,0 +1,55 @@
+import asyncio
+
+import mint_resolver
+from b58 import b58encode
+from instruction_decoder import PUMP_FUN_DECODER, PUMP_FUN_PROGRAM_ID
+from mint_resolver import MintResolver
+
+MINT = "Mint111111111111111111111111111111111111111"
+
+
+def _create_transaction():
+    data = b58encode(PUMP_FUN_DECODER['create'].discriminator)
+    return {
+        "transaction": {"message": {"accountKeys": [MINT, PUMP_FUN_PROGRAM_ID],
+                                    "instructions": [{"programIdIndex": 1, "data": data, "accounts": [0]}]}},
+        "meta": {"logMessages": []},
+    }
+
+
+class _SlowRpc:
+    """getTransaction that waits long enough for a second caller to join the lookup."""
+
+    def __init__(self, transaction):
+        self.transaction = transaction
+        self.calls = 0
+
+    async def get_transaction(self, signature):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.transaction
+
+
+async def _resolve_twice(resolver, signature):
+    return await asyncio.gather(resolver.resolve(signature), resolver.resolve(signature))
+
+
+def test_concurrent_resolves_share_one_lookup_and_get_the_mint():
+    rpc = _SlowRpc(_create_transaction())
+    resolver = MintResolver(None, rpc_client=rpc)
+    first, second = asyncio.run(_resolve_twice(resolver, "sig"))
+    assert first == (MINT, True)
+    assert second == (MINT, False)
+    assert rpc.calls == 1
+    assert resolver.settled("sig")
+
+
+def test_concurrent_resolves_of_an_unresolved_lookup_return_no_mint(monkeypatch):
+    monkeypatch.setattr(mint_resolver, "RPC_RETRY_DELAY", 0.0)
+    rpc = _SlowRpc(None)
+    resolver = MintResolver(None, rpc_client=rpc)
+    first, second = asyncio.run(_resolve_twice(resolver, "sig"))
+    assert first == (None, True)
+    assert second == (None, False)
+    assert rpc.calls == mint_resolver.RPC_ATTEMPTS
+    assert not resolver.settled("sig")
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bonding_curve import BondingCurveState
+from quote import (BPS, DEFAULT_FEE_BPS, _mul_div_floor, _random_state, buy_quotes, quote_grid, quote_state_buy,
+                   quote_state_sell, sell_quotes)
+
+U64_MAX = 2 ** 64 - 1
+
+
+def _grid(seed, curves=300, sizes=16):
+    rng = random.Random(seed)
+    states = [_random_state(rng) for _ in range(curves)]
+    buy_sizes = sorted(rng.randint(0, 100 * 10 ** 9) for _ in range(sizes))
+    sell_sizes = sorted(rng.randint(0, 200_000_000_000_000) for _ in range(sizes))
+    return states, buy_sizes, sell_sizes, quote_grid(states, buy_sizes, sell_sizes)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_quotes_match_integer_reference(seed):
+    states, buy_sizes, sell_sizes, grid = _grid(seed)
+    tokens_out, _ = grid['buy']
+    sol_out, _ = grid['sell']
+    assert tokens_out.tolist() == [[quote_state_buy(state, size) for size in buy_sizes] for state in states]
+    assert sol_out.tolist() == [[quote_state_sell(state, size) for size in sell_sizes] for state in states]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_quotes_are_monotone_and_a_round_trip_never_profits(seed):
+    states, buy_sizes, sell_sizes, _ = _grid(seed, curves=100)
+    for state in states:
+        tokens = [quote_state_buy(state, size) for size in buy_sizes]
+        sol = [quote_state_sell(state, size) for size in sell_sizes]
+        assert tokens == sorted(tokens) and sol == sorted(sol)
+        for size, bought in zip(buy_sizes, tokens):
+            net_sol = size * BPS // (BPS + DEFAULT_FEE_BPS)
+            after = BondingCurveState(state.virtual_token_reserves - bought, state.virtual_sol_reserves + net_sol,
+                                      state.real_token_reserves - bought, state.real_sol_reserves + net_sol,
+                                      state.token_total_supply, False)
+            assert quote_state_sell(after, bought) <= size
+
+
+@pytest.mark.parametrize("state", [
+    BondingCurveState(0, 0, 0, 0, 0, False),
+    BondingCurveState(0, 30_000_000_000, 0, 0, 0, False),
+    BondingCurveState(1_073_000_000_000_000, 0, 793_100_000_000_000, 0, 0, False),
+    BondingCurveState(2 ** 53, 2 ** 50, 2 ** 53, 2 ** 50, 2 ** 60, False),
+], ids=["empty", "no-tokens", "no-sol", "large"])
+@pytest.mark.parametrize("size", [0, 1, 10 ** 15, 2 ** 40])
+def test_edge_curves_match_integer_reference(state, size):
+    tokens_out, _ = quote_grid([state], [size])['buy']
+    sol_out, _ = quote_grid([state], None, [size])['sell']
+    assert int(tokens_out[0, 0]) == quote_state_buy(state, size)
+    assert int(sol_out[0, 0]) == quote_state_sell(state, size)
+
+
+def test_empty_curve_quotes_zero():
+    assert quote_state_buy(BondingCurveState(0, 0, 0, 0, 0, False), 0) == 0
+    assert quote_state_sell(BondingCurveState(0, 0, 0, 0, 0, False), 0) == 0
+    tokens_out, buy_impact = buy_quotes(0, 0, 0, [0, 1])
+    sol_out, sell_impact = sell_quotes(0, 0, 0, [0, 1])
+    assert tokens_out.tolist() == [0, 0] and sol_out.tolist() == [0, 0]
+    assert np.isinf(buy_impact).all() and sell_impact[0] == 0.0
+
+
+@pytest.mark.parametrize("a, b, d", [
+    (2 ** 61 + 12345, 3, 7),
+    (2 ** 62 - 1, 2 ** 20 + 1, 2 ** 20 + 3),
+    (U64_MAX, U64_MAX, U64_MAX),
+    (U64_MAX, 1, 1),
+    (2 ** 63, 2 ** 40, 2 ** 50),
+    (12345, 678, 0),
+])
+def test_mul_div_floor_edges(a, b, d):
+    expected = a * b // d if d else 0
+    assert int(_mul_div_floor(np.array([a], dtype=np.uint64), np.array([b], dtype=np.uint64),
+                              np.array([d], dtype=np.uint64))[0]) == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_mul_div_floor_matches_integers_across_uint64(seed):
+    rng = random.Random(seed)
+    operands = [(rng.randint(0, U64_MAX), rng.randint(0, 2 ** rng.randint(0, 64)), rng.randint(1, U64_MAX))
+                for _ in range(20000)]
+    operands = [(x, y, z) for x, y, z in operands if x * y // z <= U64_MAX]
+    a, b, d = (np.array(column, dtype=np.uint64) for column in zip(*operands))
+    assert _mul_div_floor(a, b, d).tolist() == [x * y // z for x, y, z in operands]
@@ -0,0 +1,39 @@
+import json
+
+from b58 import b58decode, b58encode
+from runner import (EVENT_MINT, EVENT_SEEN, EventWriter, encode_account_event, encode_mint_event, encode_seen_event,
+                    iter_events)
+from seen_store import SeenStore
+
+SIGNATURE = b58encode(bytes(range(64)))
+OTHER_SIGNATURE = b58encode(bytes(range(1, 65)))
+MINT = b58encode(bytes([7]) * 32)
+
+
+def test_events_round_trip_including_slot_zero_and_unknown():
+    blob = (encode_account_event(5, b"\1" * 32, b"data") + encode_mint_event(1.5, 0, b"\2" * 32, b"\3" * 64)
+            + encode_mint_event(2.5, None, b"\2" * 32, b"\3" * 64) + encode_seen_event(b"\4" * 64))
+    assert list(iter_events(blob)) == [
+        (1, 5, b"\1" * 32, b"data"),
+        (EVENT_MINT, 1.5, 0, b"\2" * 32, b"\3" * 64),
+        (EVENT_MINT, 2.5, None, b"\2" * 32, b"\3" * 64),
+        (EVENT_SEEN, b"\4" * 64),
+    ]
+
+
+def test_writer_records_match_newbot_and_mark_seen_once_persisted(tmp_path):
+    import newBot
+
+    seen_file = str(tmp_path / "seen.bin")
+    writer = EventWriter(str(tmp_path / "journal"), str(tmp_path / "log.jsonl"), None, seen_file)
+    writer.write_blobs([encode_mint_event(1_700_000_000.25, 321, b58decode(MINT), b58decode(SIGNATURE))
+                        + encode_seen_event(b58decode(OTHER_SIGNATURE))])
+    writer.close()
+
+    with open(tmp_path / "log.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records == [newBot.mint_record(SIGNATURE, 321, MINT, 1_700_000_000.25)]
+    seen = SeenStore(seen_file)
+    assert SIGNATURE in seen and OTHER_SIGNATURE in seen
+    assert (seen.checkpoint_slot, seen.checkpoint_signature) == (321, SIGNATURE)
+    seen.close()
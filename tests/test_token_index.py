@@ -0,0 +1,69 @@
+import pytest
+
+from bonding_curve import BondingCurveState
+from token_index import MAX_QUERY_N, TokenIndex, _route
+
+
+def _state(real_token_reserves, real_sol_reserves=0, complete=False):
+    return BondingCurveState(1_073_000_000_000_000, 30_000_000_000, real_token_reserves, real_sol_reserves,
+                             1_000_000_000_000_000, complete)
+
+
+class _Derivations:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, mint):
+        self.calls.append(mint)
+        if not mint.startswith("mint"):
+            raise ValueError(mint)
+        return "curve" + mint[4:]
+
+
+def test_get_does_not_refresh_the_lru_order():
+    index = TokenIndex(capacity=2)
+    index.update("curve0", 1, _state(100))
+    index.update("curve1", 2, _state(200))
+    assert index.get("curve0")["real_token_reserves"] == 100
+    index.update("curve2", 3, _state(300))
+    # curve0 was read but not updated, so it is still the one evicted
+    assert index.get("curve0") is None
+    assert index.get("curve1") is not None and index.evictions == 1
+
+
+def test_mint_lookup_links_without_refreshing():
+    derive = _Derivations()
+    index = TokenIndex(capacity=2, curve_for_mint=derive)
+    index.update("curve0", 1, _state(100))
+    index.update("curve1", 2, _state(200))
+    assert index.get("mint0")["mint"] == "mint0"
+    assert index.get("mint0")["curve"] == "curve0" and derive.calls == ["mint0"]
+    index.update("curve2", 3, _state(300))
+    assert index.get("curve0") is None and index.stats()["mints_linked"] == 0
+
+
+def test_unknown_keys_are_derived_once():
+    derive = _Derivations()
+    index = TokenIndex(capacity=4, curve_for_mint=derive)
+    for _ in range(3):
+        assert index.get("mint9") is None
+        assert index.get("not-a-mint") is None
+    assert derive.calls == ["mint9", "not-a-mint"]
+    # A curve indexed after the miss is still found through the cached derivation
+    index.update("curve9", 5, _state(900))
+    assert index.get("mint9")["curve"] == "curve9" and derive.calls == ["mint9", "not-a-mint"]
+
+
+def test_query_n_is_validated():
+    index = TokenIndex(capacity=8)
+    for i in range(5):
+        index.update(f"curve{i}", i + 1, _state(100 * (i + 1), real_sol_reserves=i))
+    assert [row["curve"] for row in _route(index, "/top/graduation?n=2")] == ["curve0", "curve1"]
+    assert len(_route(index, f"/top/graduation?n={MAX_QUERY_N * 10}")) == 5
+    for target in ("/top/graduation?n=0", "/top/graduation?n=-3", "/top/movers?n=-1", "/top/movers?n=x",
+                   "/top/movers?slots=-5"):
+        with pytest.raises(ValueError):
+            _route(index, target)
+    assert len(_route(index, "/top/movers?n=3&slots=10")) == 3
+    with pytest.raises(KeyError):
+        _route(index, "/nothing")
@@ -0,0 +1,183 @@
+import asyncio
+import base64
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import ed25519
+from b58 import b58encode
+from mock_rpc import MockRpcError, MockRpcServer
+from tx_builder import (BlockhashCache, MessageTemplate, TransactionBuilder, TransactionSender, _compact_u16,
+                        compile_message)
+
+PAYER, SIGNER, WRITABLE, PROGRAM = (bytes([i]) * 32 for i in (1, 2, 3, 4))
+BLOCKHASH = bytes(range(32))
+
+
+def test_compact_u16():
+    assert _compact_u16(0) == b"\x00"
+    assert _compact_u16(0x7f) == b"\x7f"
+    assert _compact_u16(0x80) == b"\x80\x01"
+    assert _compact_u16(0x3fff) == b"\xff\x7f"
+    assert _compact_u16(0x4000) == b"\x80\x80\x01"
+
+
+def test_compile_message_layout():
+    instructions = [(PROGRAM, [(WRITABLE, False, True), (SIGNER, True, False), (PAYER, False, False)], b"\x07\x08")]
+    message, blockhash_offset, data_offsets = compile_message(PAYER, instructions, BLOCKHASH)
+
+    # Writable signers, read-only signers, writable unsigned, read-only unsigned
+    expected = (bytes([2, 1, 1]) + b"\x04" + PAYER + SIGNER + WRITABLE + PROGRAM + BLOCKHASH
+                + b"\x01" + b"\x03" + b"\x03" + bytes([2, 1, 0]) + b"\x02" + b"\x07\x08")
+    assert bytes(message) == expected
+    assert message[blockhash_offset:blockhash_offset + 32] == BLOCKHASH
+    assert message[data_offsets[0]:] == b"\x07\x08"
+
+
+def test_compile_message_merges_account_flags():
+    instructions = [
+        (PROGRAM, [(WRITABLE, False, False)], b""),
+        (PROGRAM, [(WRITABLE, True, False), (WRITABLE, False, True)], b"\x01"),
+    ]
+    message, _, data_offsets = compile_message(PAYER, instructions)
+    assert bytes(message[:3]) == bytes([2, 0, 1])
+    assert message[4:4 + 96] == PAYER + WRITABLE + PROGRAM
+    assert len(data_offsets) == 2 and message[data_offsets[1]:] == b"\x01"
+
+
+def test_template_render_requires_every_field():
+    message, blockhash_offset, data_offsets = compile_message(PAYER, [(PROGRAM, [], bytes(16))])
+    template = MessageTemplate(message, blockhash_offset, {"a": data_offsets[0], "b": data_offsets[0] + 8})
+    with pytest.raises(ValueError):
+        template.render(BLOCKHASH, a=1)
+
+
+@pytest.mark.parametrize("kind, limit_field", [("buy", "max_sol_cost"), ("sell", "min_sol_output")])
+def test_rendered_template_matches_fresh_compile(kind, limit_field):
+    # Templates only need the payer's public key; signing is covered separately
+    builder = TransactionBuilder(SimpleNamespace(public_key=os.urandom(32)))
+    mint = os.urandom(32)
+    template = builder._template(kind, mint)
+    for amount, limit, fee, blockhash in [(1, 2, 3, BLOCKHASH), (10 ** 15, 2 ** 64 - 1, 0, os.urandom(32)),
+                                          (0, 0, 0, bytes(32)), (123456789, 987654321, 50_000, os.urandom(32))]:
+        rendered = template.render(blockhash, amount=amount, priority_fee=fee, **{limit_field: limit})
+        compiled, _, _ = compile_message(builder.payer, builder._instructions(kind, mint, amount, limit, fee),
+                                         blockhash)
+        assert rendered == bytes(compiled)
+
+
+def test_prime_uses_create_accounts():
+    builder = TransactionBuilder(SimpleNamespace(public_key=os.urandom(32)))
+    mint = os.urandom(32)
+    builder.prime({"mint": b58encode(mint), "bondingCurve": b58encode(bytes([5]) * 32),
+                   "associatedBondingCurve": b58encode(bytes([6]) * 32)})
+    accounts = builder.accounts_for(mint)
+    assert accounts.bonding_curve == bytes([5]) * 32 and accounts.associated_bonding_curve == bytes([6]) * 32
+
+
+def test_signed_transaction_verifies():
+    pytest.importorskip("nacl")
+    builder = TransactionBuilder(ed25519.SigningKey(os.urandom(32)))
+    mint = os.urandom(32)
+    transaction = builder.build_buy(mint, 1_000, 2_000, BLOCKHASH, priority_fee=7)
+    message = transaction[65:]
+    compiled, _, _ = compile_message(builder.payer, builder._instructions("buy", mint, 1_000, 2_000, 7), BLOCKHASH)
+    assert transaction[0] == 1 and message == bytes(compiled)
+    assert ed25519.verify(builder.payer, message, transaction[1:65])
+
+
+def test_blockhash_cache_fails_over_and_expires():
+    async def run():
+        async with MockRpcServer() as server:
+            # First endpoint refuses connections; the cache falls through to the mock
+            cache = BlockhashCache(["http://127.0.0.1:9", server.url], max_age=30.0)
+            try:
+                assert await cache.refresh()
+                blockhash = cache.current()
+                assert len(blockhash) == 32 and cache._last_valid_block_height == server.slot + 150
+                cache._fetched_at -= 31.0
+                with pytest.raises(RuntimeError):
+                    cache.current()
+                assert await cache.refresh()
+                cache.current()
+            finally:
+                await cache.close()
+
+    asyncio.run(run())
+
+
+def test_blockhash_cache_without_any_endpoint_is_not_ready():
+    async def run():
+        cache = BlockhashCache(["http://127.0.0.1:9"])
+        try:
+            assert not await cache.refresh()
+            with pytest.raises(RuntimeError):
+                cache.current()
+        finally:
+            await cache.close()
+
+    asyncio.run(run())
+
+
+def _randomly_signed_transaction(payer):
+    message, _, _ = compile_message(payer, [(PROGRAM, [], b"\x01")], BLOCKHASH)
+    return b"\x01" + os.urandom(64) + bytes(message)
+
+
+def test_sender_returns_first_accepted_signature():
+    transaction = _randomly_signed_transaction(PAYER)
+
+    def reject(params):
+        raise MockRpcError(-32002, "Transaction simulation failed")
+
+    async def run():
+        async with MockRpcServer(verify_signatures=False) as good, \
+                MockRpcServer(handlers={"sendTransaction": reject}) as bad:
+            sender = TransactionSender([bad.url, good.url])
+            try:
+                signature = await sender.send(transaction)
+            finally:
+                await sender.close()
+            return signature, good.sent
+
+    signature, sent = asyncio.run(run())
+    assert signature == b58encode(transaction[1:65])
+    assert sent == [transaction]
+
+
+def test_sender_raises_when_every_endpoint_rejects():
+    async def run():
+        # Random signature bytes fail the mock's verification
+        async with MockRpcServer() as first, MockRpcServer() as second:
+            sender = TransactionSender([first.url, second.url])
+            try:
+                with pytest.raises(RuntimeError):
+                    await sender.send(_randomly_signed_transaction(PAYER))
+            finally:
+                await sender.close()
+            return first.sent + second.sent
+
+    assert asyncio.run(run()) == []
+
+
+def test_sender_against_mock_verifies_real_signatures():
+    pytest.importorskip("nacl")
+    builder = TransactionBuilder(ed25519.SigningKey(os.urandom(32)))
+
+    async def run():
+        async with MockRpcServer() as first, MockRpcServer() as second:
+            cache = BlockhashCache([first.url])
+            sender = TransactionSender([first.url, second.url])
+            try:
+                await cache.refresh()
+                transaction = builder.build_sell(os.urandom(32), 1_000, 1, cache.current())
+                signature = await sender.send(transaction)
+            finally:
+                await sender.close()
+                await cache.close()
+            return transaction, signature, first.sent + second.sent
+
+    transaction, signature, sent = asyncio.run(run())
+    assert signature == b58encode(transaction[1:65])
+    assert sent == [transaction, transaction]
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+
+from b58 import b58encode
+from mock_ws_server import MockWebSocketServer
+from ws_manager import ConnectionManager, RingSet, notification_key
+
+SIGNATURES = [b58encode(i.to_bytes(64, 'big')) for i in range(1, 201)]
+PUBKEY = b58encode(bytes([9]) * 32)
+
+
+def _logs_frame(signature):
+    return json.dumps({"jsonrpc": "2.0", "method": "logsNotification",
+                       "params": {"result": {"value": {"signature": signature, "err": None, "logs": []}}}})
+
+
+def _account_frame(pubkey, slot):
+    return json.dumps({"jsonrpc": "2.0", "method": "programNotification",
+                       "params": {"result": {"context": {"slot": slot},
+                                             "value": {"pubkey": pubkey, "account": {"data": ["", "base64"]}}}}})
+
+
+LOGS_FRAMES = [_logs_frame(signature) for signature in SIGNATURES]
+
+
+class _Subscriber:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, ws):
+        self.calls += 1
+        await ws.send('{"jsonrpc":"2.0","id":1,"method":"logsSubscribe","params":[]}')
+
+
+async def _collect(manager, expected, timeout=10):
+    delivered = []
+    deadline = time.perf_counter() + timeout
+    while len(delivered) < expected and time.perf_counter() < deadline:
+        try:
+            delivered.append(await asyncio.wait_for(manager.recv(), 1))
+        except asyncio.TimeoutError:
+            break
+    # Anything arriving after the expected count would be a duplicate or a stray frame
+    try:
+        delivered.append(await asyncio.wait_for(manager.recv(), 0.2))
+    except asyncio.TimeoutError:
+        pass
+    return delivered
+
+
+def test_notification_keys():
+    assert notification_key(LOGS_FRAMES[0]) == SIGNATURES[0]
+    assert notification_key(LOGS_FRAMES[0].encode()) == SIGNATURES[0]
+    assert notification_key(_account_frame(PUBKEY, 1234)) == (PUBKEY, 1234)
+    assert notification_key('{"jsonrpc":"2.0","result":42,"id":1}') is None
+
+
+def test_ring_set_forgets_oldest_keys():
+    keys = RingSet(capacity=2)
+    assert keys.add("a") and keys.add("b") and not keys.add("a")
+    assert keys.add("c")
+    assert "a" not in keys and "b" in keys and len(keys) == 2
+
+
+def test_failover_when_an_endpoint_drops():
+    async def run():
+        # The primary dies halfway through; the backup has every frame, slightly later
+        primary = MockWebSocketServer(LOGS_FRAMES, interval=0.001, close_after=100)
+        backup = MockWebSocketServer(LOGS_FRAMES, interval=0.0015, initial_delay=0.01)
+        async with primary, backup:
+            async with ConnectionManager([primary.url, backup.url], _Subscriber(), backoff_base=0.05) as manager:
+                delivered = await _collect(manager, len(LOGS_FRAMES))
+                return delivered, manager.stats()[primary.url]
+
+    delivered, primary_stats = asyncio.run(run())
+    assert sorted(notification_key(frame) for frame in delivered) == sorted(SIGNATURES)
+    assert primary_stats["reconnects"] >= 1 and not primary_stats["connected"]
+
+
+def test_duplicate_frames_from_two_endpoints_are_delivered_once():
+    async def run():
+        first = MockWebSocketServer(LOGS_FRAMES, interval=0.001)
+        second = MockWebSocketServer(LOGS_FRAMES, interval=0.001)
+        async with first, second:
+            async with ConnectionManager([first.url, second.url], _Subscriber()) as manager:
+                delivered = await _collect(manager, len(LOGS_FRAMES))
+                await asyncio.sleep(0.3)  # Let the slower copy of every frame arrive
+                return delivered, manager.stats()
+
+    delivered, stats = asyncio.run(run())
+    assert sorted(notification_key(frame) for frame in delivered) == sorted(SIGNATURES)
+    assert sum(s["first_seen"] for s in stats.values()) == len(SIGNATURES)
+    assert sum(s["duplicates"] for s in stats.values()) == len(SIGNATURES)
+
+
+def test_account_updates_are_deduplicated_by_pubkey_and_slot():
+    other = b58encode(bytes([8]) * 32)
+    frames = [_account_frame(PUBKEY, 100), _account_frame(PUBKEY, 101), _account_frame(other, 100),
+              _account_frame(PUBKEY, 100)]
+
+    async def run():
+        first = MockWebSocketServer(frames, interval=0.001)
+        second = MockWebSocketServer(frames, interval=0.001, initial_delay=0.02)
+        async with first, second:
+            async with ConnectionManager([first.url, second.url], _Subscriber()) as manager:
+                return await _collect(manager, 3)
+
+    delivered = asyncio.run(run())
+    assert [notification_key(frame) for frame in delivered] == [(PUBKEY, 100), (PUBKEY, 101), (other, 100)]
+
+
+def test_dropped_endpoint_reconnects_and_resubscribes():
+    async def run():
+        server = MockWebSocketServer(LOGS_FRAMES, interval=0.001, close_after=50)
+        subscriber = _Subscriber()
+        async with server:
+            async with ConnectionManager([server.url], subscriber, backoff_base=0.05) as manager:
+                delivered = await _collect(manager, 50)
+                # The provider comes back and replays from the start; only the unseen half is new
+                server.dead = False
+                server.close_after = None
+                delivered += await _collect(manager, len(LOGS_FRAMES) - 50)
+                return delivered, subscriber.calls, manager.stats()[server.url]
+
+    delivered, subscribe_calls, stats = asyncio.run(run())
+    assert sorted(notification_key(frame) for frame in delivered) == sorted(SIGNATURES)
+    assert subscribe_calls >= 2 and stats["reconnects"] >= 1 and stats["connected"]
@@ -0,0 +1,351 @@
+import asyncio
+import heapq
+import json
+import os
+from array import array
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; queries fall back to heapq over the same columns
+    np = None
+
+from structured_log import get_logger
+
+log = get_logger("index")
+
+# Curve rows kept in memory; the least recently updated curve is evicted beyond this
+DEFAULT_CAPACITY = 50000
+
+# Reserve samples kept per curve for "change over the last N slots" queries
+HISTORY_DEPTH = 8
+
+# Tokens a fresh pump.fun curve can sell before it graduates (raw units, 6 decimals)
+INITIAL_REAL_TOKEN_RESERVES = 793_100_000_000_000
+LAMPORTS_PER_SOL = 1_000_000_000
+TOKEN_UNITS = 1_000_000
+
+# The query API is off unless PUMPFUN_INDEX_API is set, so several listeners can share a host
+QUERY_API_ENABLED = os.environ.get("PUMPFUN_INDEX_API", "") not in ("", "0")
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = int(os.environ.get("PUMPFUN_INDEX_PORT", "9110"))
+
+_U64_MAX = 2 ** 64 - 1
+
+# Mint -> curve derivations remembered for keys that are not indexed (a PDA search costs ~0.6 ms)
+DERIVATION_CACHE_SIZE = 4096
+
+# Largest `n` the query API accepts for top-N queries
+MAX_QUERY_N = 1000
+
+
+def _zeros(typecode, length):
+    column = array(typecode)
+    column.frombytes(bytes(column.itemsize * length))
+    return column
+
+
+# Columnar, fixed-capacity index of bonding-curve state
+class TokenIndex:
+    """
+    Latest bonding-curve state per curve, stored column-wise.
+
+    Each curve owns a row in fixed-size `array` columns (reserves, price,
+    last slot, ...), so memory is set by `capacity`, not by how many tokens
+    have been seen. Rows are recycled in LRU order of their last update,
+    which evicts curves that stopped trading first. Mints are linked to
+    their curve with `link_mint` (e.g. from a CreateEvent), or on first
+    lookup through `curve_for_mint(mint) -> curve` when given, and either
+    key works for lookups.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, history=HISTORY_DEPTH, curve_for_mint=None):
+        self.capacity = capacity
+        self.history = history
+        self.curve_for_mint = curve_for_mint
+        self.virtual_token_reserves = _zeros('Q', capacity)
+        self.virtual_sol_reserves = _zeros('Q', capacity)
+        self.real_token_reserves = _zeros('Q', capacity)
+        self.real_sol_reserves = _zeros('Q', capacity)
+        self.token_total_supply = _zeros('Q', capacity)
+        self.price = _zeros('d', capacity)  # SOL per whole token
+        self.last_slot = _zeros('Q', capacity)
+        self.complete = _zeros('B', capacity)
+        self.has_state = _zeros('B', capacity)
+        # Ring of (slot, real SOL reserves) samples per row, `history` wide
+        self._history_slot = _zeros('Q', capacity * history)
+        self._history_sol = _zeros('Q', capacity * history)
+        self._history_pos = _zeros('B', capacity)
+        self._rows = OrderedDict()  # curve -> row, least recently updated first
+        self._curve_of_row = [None] * capacity
+        self._mint_of_row = [None] * capacity
+        self._curve_of_mint = {}
+        self._derived = OrderedDict()  # key -> curve_for_mint(key) (None if not a valid key), oldest first
+        self._free = list(range(capacity - 1, -1, -1))
+        self.max_slot = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _row_for(self, curve):
+        row = self._rows.get(curve)
+        if row is not None:
+            self._rows.move_to_end(curve)
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            _, row = self._rows.popitem(last=False)
+            self._clear_row(row)
+            self.evictions += 1
+        self._rows[curve] = row
+        self._curve_of_row[row] = curve
+        return row
+
+    def _clear_row(self, row):
+        mint = self._mint_of_row[row]
+        if mint is not None:
+            self._curve_of_mint.pop(mint, None)
+        self._curve_of_row[row] = None
+        self._mint_of_row[row] = None
+        for column in (self.virtual_token_reserves, self.virtual_sol_reserves, self.real_token_reserves,
+                       self.real_sol_reserves, self.token_total_supply, self.last_slot):
+            column[row] = 0
+        self.price[row] = 0.0
+        self.complete[row] = 0
+        self.has_state[row] = 0
+        self._history_pos[row] = 0
+        base = row * self.history
+        for offset in range(base, base + self.history):
+            self._history_slot[offset] = 0
+            self._history_sol[offset] = 0
+
+    def update(self, curve, slot, state):
+        """Apply a decoded BondingCurveState seen at `slot`; older slots than the stored one are ignored."""
+        row = self._row_for(curve)
+        if slot < self.last_slot[row]:
+            return row
+        self.virtual_token_reserves[row] = state.virtual_token_reserves
+        self.virtual_sol_reserves[row] = state.virtual_sol_reserves
+        self.real_token_reserves[row] = state.real_token_reserves
+        self.real_sol_reserves[row] = state.real_sol_reserves
+        self.token_total_supply[row] = state.token_total_supply
+        self.complete[row] = 1 if state.complete else 0
+        self.price[row] = (
+            (state.virtual_sol_reserves / LAMPORTS_PER_SOL) / (state.virtual_token_reserves / TOKEN_UNITS)
+            if state.virtual_token_reserves else 0.0
+        )
+
+        # Same slot overwrites the newest sample; a new slot advances the ring
+        base = row * self.history
+        pos = self._history_pos[row]
+        if self.has_state[row] and self._history_slot[base + (pos - 1) % self.history] == slot:
+            pos = (pos - 1) % self.history
+        self._history_slot[base + pos] = slot
+        self._history_sol[base + pos] = state.real_sol_reserves
+        self._history_pos[row] = (pos + 1) % self.history
+
+        self.last_slot[row] = slot
+        self.has_state[row] = 1
+        if slot > self.max_slot:
+            self.max_slot = slot
+        return row
+
+    def link_mint(self, mint, curve):
+        """Record that `curve` is the bonding curve of `mint`."""
+        row = self._row_for(curve)
+        self._mint_of_row[row] = mint
+        self._curve_of_mint[mint] = curve
+
+    def get(self, key):
+        """
+        Snapshot dict for a curve or mint address, or None if it is not indexed.
+
+        Reads never touch the LRU order, so queries cannot keep a curve that
+        stopped trading alive or push out one that is still updating.
+        """
+        curve = self._curve_of_mint.get(key, key)
+        if curve not in self._rows and self.curve_for_mint is not None:
+            derived = self._derive(key)
+            row = self._rows.get(derived)
+            if row is not None:
+                # Link without _row_for: a read must not refresh the row
+                self._mint_of_row[row] = key
+                self._curve_of_mint[key] = derived
+                curve = derived
+        row = self._rows.get(curve)
+        if row is None or not self.has_state[row]:
+            return None
+        return self._snapshot(row)
+
+    def _derive(self, key):
+        # Derivation is deterministic, so cached results never go stale; only the size is bounded
+        if key in self._derived:
+            return self._derived[key]
+        try:
+            derived = self.curve_for_mint(key)
+        except ValueError:
+            derived = None
+        self._derived[key] = derived
+        if len(self._derived) > DERIVATION_CACHE_SIZE:
+            self._derived.popitem(last=False)
+        return derived
+
+    def _snapshot(self, row, **extra):
+        snapshot = {
+            "curve": self._curve_of_row[row],
+            "mint": self._mint_of_row[row],
+            "last_slot": self.last_slot[row],
+            "price_sol": self.price[row],
+            "virtual_token_reserves": self.virtual_token_reserves[row],
+            "virtual_sol_reserves": self.virtual_sol_reserves[row],
+            "real_token_reserves": self.real_token_reserves[row],
+            "real_sol_reserves": self.real_sol_reserves[row],
+            "token_total_supply": self.token_total_supply[row],
+            "complete": bool(self.complete[row]),
+            "graduation_progress": self._progress(self.real_token_reserves[row]),
+        }
+        snapshot.update(extra)
+        return snapshot
+
+    @staticmethod
+    def _progress(real_token_reserves):
+        return max(0.0, 1.0 - real_token_reserves / INITIAL_REAL_TOKEN_RESERVES)
+
+    # Top-N: curves still trading with the fewest tokens left to sell
+    def top_near_graduation(self, n=10):
+        if np is not None:
+            live = np.frombuffer(self.has_state, dtype=np.uint8).astype(bool)
+            live &= np.frombuffer(self.complete, dtype=np.uint8) == 0
+            rows = np.flatnonzero(live)
+            remaining = np.frombuffer(self.real_token_reserves, dtype=np.uint64)[rows]
+            if len(rows) > n:
+                keep = np.argpartition(remaining, n)[:n]
+                rows, remaining = rows[keep], remaining[keep]
+            ranked = [int(row) for row in rows[np.argsort(remaining, kind='stable')]]
+        else:
+            ranked = heapq.nsmallest(
+                n,
+                (row for row in self._rows.values() if self.has_state[row] and not self.complete[row]),
+                key=self.real_token_reserves.__getitem__,
+            )
+        return [self._snapshot(row) for row in ranked]
+
+    def _baselines_numpy(self, cutoff):
+        slots = np.frombuffer(self._history_slot, dtype=np.uint64).reshape(self.capacity, self.history)
+        sols = np.frombuffer(self._history_sol, dtype=np.uint64).reshape(self.capacity, self.history)
+        filled = slots > 0
+        # Latest sample at or before the cutoff, else the oldest sample we have
+        before = filled & (slots <= cutoff)
+        latest_before = np.where(before, slots, 0).argmax(axis=1)
+        oldest = np.where(filled, slots, _U64_MAX).argmin(axis=1)
+        pick = np.where(before.any(axis=1), latest_before, oldest)
+        return sols[np.arange(self.capacity), pick].astype(np.int64)
+
+    def _baseline(self, row, cutoff):
+        base = row * self.history
+        best_slot, best_sol = -1, 0
+        oldest_slot, oldest_sol = _U64_MAX, 0
+        for offset in range(base, base + self.history):
+            slot = self._history_slot[offset]
+            if not slot:
+                continue
+            if slot <= cutoff and slot > best_slot:
+                best_slot, best_sol = slot, self._history_sol[offset]
+            if slot < oldest_slot:
+                oldest_slot, oldest_sol = slot, self._history_sol[offset]
+        return best_sol if best_slot >= 0 else oldest_sol
+
+    # Top-N: largest absolute real-SOL reserve change over the last `slots` slots
+    def top_reserve_change(self, n=10, slots=150):
+        """
+        Rank curves updated within the last `slots` slots by how much their
+        real SOL reserves moved. The baseline is the newest sample at or
+        before the window start; with only `history` samples per curve a very
+        active curve may use its oldest retained sample instead.
+        """
+        cutoff = max(0, self.max_slot - slots)
+        if np is not None:
+            current = np.frombuffer(self.real_sol_reserves, dtype=np.uint64).astype(np.int64)
+            change = current - self._baselines_numpy(cutoff)
+            recent = np.frombuffer(self.has_state, dtype=np.uint8).astype(bool)
+            recent &= np.frombuffer(self.last_slot, dtype=np.uint64) > cutoff
+            rows = np.flatnonzero(recent)
+            magnitude = np.abs(change[rows])
+            if len(rows) > n:
+                keep = np.argpartition(-magnitude, n)[:n]
+                rows, magnitude = rows[keep], magnitude[keep]
+            ranked = [(int(row), int(change[row])) for row in rows[np.argsort(-magnitude, kind='stable')]]
+        else:
+            candidates = (
+                (row, self.real_sol_reserves[row] - self._baseline(row, cutoff))
+                for row in self._rows.values()
+                if self.has_state[row] and self.last_slot[row] > cutoff
+            )
+            ranked = heapq.nlargest(n, candidates, key=lambda item: abs(item[1]))
+        return [self._snapshot(row, sol_reserve_change=change) for row, change in ranked]
+
+    def stats(self):
+        return {
+            "curves": len(self._rows),
+            "capacity": self.capacity,
+            "mints_linked": len(self._curve_of_mint),
+            "evictions": self.evictions,
+            "max_slot": self.max_slot,
+        }
+
+
+# Integer query parameter; ValueError (400) when it is not an integer or below `minimum`
+def _int_param(query, name, default, minimum):
+    value = int(query.get(name, [default])[0])
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+
+# Local JSON query API over a TokenIndex
+def _route(index, target):
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    parts = [part for part in url.path.split("/") if part]
+    if parts == ["top", "graduation"]:
+        return index.top_near_graduation(min(_int_param(query, "n", 10, 1), MAX_QUERY_N))
+    if parts == ["top", "movers"]:
+        return index.top_reserve_change(min(_int_param(query, "n", 10, 1), MAX_QUERY_N),
+                                        _int_param(query, "slots", 150, 0))
+    if parts == ["stats"]:
+        return index.stats()
+    if len(parts) == 2 and parts[0] == "token":
+        return index.get(parts[1])
+    raise KeyError(url.path)
+
+
+async def start_query_server(index, host=DEFAULT_HTTP_HOST, port=DEFAULT_HTTP_PORT):
+    """
+    Serve GET /token/<mint-or-curve>, /top/graduation?n=10,
+    /top/movers?n=10&slots=150 and /stats as JSON.
+    """
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode('latin-1').split()
+            try:
+                result = _route(index, parts[1] if len(parts) >= 2 else "/")
+                body, status = json.dumps(result).encode(), "200 OK"
+            except KeyError:
+                body, status = b'{"error": "not found"}', "404 Not Found"
+            except ValueError:
+                body, status = b'{"error": "bad query"}', "400 Bad Request"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    log.info("token index query API listening", host=host, port=port)
+    return server
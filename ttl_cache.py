@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+
+# Sentinel returned by TTLCache.get when a key is absent or expired
+MISSING = object()
+
+
+# Bounded LRU cache whose entries also expire after a fixed time-to-live
+class TTLCache:
+    """
+    LRU + TTL cache for signature lookups.
+
+    Entries are evicted least-recently-used first once `maxsize` is reached,
+    and are treated as absent `ttl` seconds after they were stored. `None`
+    is a valid cached value, so use MISSING to detect a miss.
+    """
+
+    def __init__(self, maxsize=10000, ttl=600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key, default=MISSING):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < self._clock():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key) is not MISSING
+
+    def __len__(self):
+        return len(self._entries)
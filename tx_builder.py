@@ -0,0 +1,454 @@
+import asyncio
+import base64
+import json
+import os
+import struct
+import sys
+import time
+
+import httpx
+
+import ed25519
+import metrics
+from b58 import b58decode, b58encode_cached
+from bonding_curve import bonding_curve_address
+from ed25519 import find_program_address
+from instruction_decoder import PUMP_FUN_DECODER, PUMP_FUN_PROGRAM_ID
+from structured_log import get_logger
+from ttl_cache import MISSING, TTLCache
+
+log = get_logger("tx")
+
+# Fixed accounts of pump.fun buy/sell instructions
+PUMP_FUN_GLOBAL = "4wTV1YmiEkRvAtNtsSGPtUrqRYQMe5SKy2uB4Jjaxnjf"
+PUMP_FUN_FEE_RECIPIENT = "CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4xC9iM"
+PUMP_FUN_EVENT_AUTHORITY = "Ce6TQqeHC9p8KetsN6JsjHK7UTZk7nasjjnr7XxXp9F1"
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+ASSOCIATED_TOKEN_PROGRAM_ID = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+RENT_SYSVAR_ID = "SysvarRent111111111111111111111111111111111"
+COMPUTE_BUDGET_PROGRAM_ID = "ComputeBudget111111111111111111111111111111"
+
+DEFAULT_COMPUTE_UNIT_LIMIT = 100_000
+
+# A blockhash is usable for ~150 slots (~60s); refuse to build on one older than this
+BLOCKHASH_REFRESH_INTERVAL = 2.0
+BLOCKHASH_MAX_AGE = 45.0
+
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+
+def associated_token_address(owner, mint):
+    return find_program_address([owner, _TOKEN_PROGRAM, mint], _ASSOCIATED_TOKEN_PROGRAM)[0]
+
+
+_PUMP_FUN_PROGRAM = b58decode(PUMP_FUN_PROGRAM_ID)
+_TOKEN_PROGRAM = b58decode(TOKEN_PROGRAM_ID)
+_ASSOCIATED_TOKEN_PROGRAM = b58decode(ASSOCIATED_TOKEN_PROGRAM_ID)
+_SYSTEM_PROGRAM = b58decode(SYSTEM_PROGRAM_ID)
+_RENT_SYSVAR = b58decode(RENT_SYSVAR_ID)
+_COMPUTE_BUDGET_PROGRAM = b58decode(COMPUTE_BUDGET_PROGRAM_ID)
+_GLOBAL = b58decode(PUMP_FUN_GLOBAL)
+_FEE_RECIPIENT = b58decode(PUMP_FUN_FEE_RECIPIENT)
+_EVENT_AUTHORITY = b58decode(PUMP_FUN_EVENT_AUTHORITY)
+
+
+# Accounts a buy or sell needs for one mint
+class MintAccounts:
+    __slots__ = ('mint', 'bonding_curve', 'associated_bonding_curve', 'associated_user')
+
+    def __init__(self, mint, bonding_curve, associated_bonding_curve, associated_user):
+        self.mint = mint
+        self.bonding_curve = bonding_curve
+        self.associated_bonding_curve = associated_bonding_curve
+        self.associated_user = associated_user
+
+
+def derive_mint_accounts(mint, user):
+    """Derive the bonding curve, its token account and the user's token account (raw 32-byte keys)."""
+    bonding_curve = bonding_curve_address(mint)
+    return MintAccounts(mint, bonding_curve, associated_token_address(bonding_curve, mint),
+                        associated_token_address(user, mint))
+
+
+# Legacy message serialization
+def _compact_u16(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def compile_message(payer, instructions, blockhash=bytes(32)):
+    """
+    Serialize a legacy transaction message.
+
+    `instructions` are (program_id, [(pubkey, is_signer, is_writable), ...], data)
+    with raw 32-byte keys. Returns (message, blockhash_offset, data_offsets),
+    where data_offsets[i] is where instruction i's data starts, so a
+    template can be patched in place later.
+    """
+    flags = {payer: [True, True]}
+    order = [payer]
+    for program_id, accounts, _ in instructions:
+        for pubkey, is_signer, is_writable in accounts:
+            if pubkey not in flags:
+                flags[pubkey] = [is_signer, is_writable]
+                order.append(pubkey)
+            else:
+                flags[pubkey][0] |= is_signer
+                flags[pubkey][1] |= is_writable
+        if program_id not in flags:
+            flags[program_id] = [False, False]
+            order.append(program_id)
+
+    keys = ([k for k in order if flags[k] == [True, True]] + [k for k in order if flags[k] == [True, False]]
+            + [k for k in order if flags[k] == [False, True]] + [k for k in order if flags[k] == [False, False]])
+    index = {key: i for i, key in enumerate(keys)}
+    signers = sum(1 for key in keys if flags[key][0])
+    readonly_signed = sum(1 for key in keys if flags[key] == [True, False])
+    readonly_unsigned = sum(1 for key in keys if flags[key] == [False, False])
+
+    message = bytearray([signers, readonly_signed, readonly_unsigned])
+    message += _compact_u16(len(keys)) + b"".join(keys)
+    blockhash_offset = len(message)
+    message += blockhash
+    message += _compact_u16(len(instructions))
+    data_offsets = []
+    for program_id, accounts, data in instructions:
+        message.append(index[program_id])
+        message += _compact_u16(len(accounts)) + bytes(index[pubkey] for pubkey, _, _ in accounts)
+        message += _compact_u16(len(data))
+        data_offsets.append(len(message))
+        message += data
+    return message, blockhash_offset, data_offsets
+
+
+# Serialized message with the offsets of every field that changes between sends
+class MessageTemplate:
+    """
+    Patch blockhash and u64 fields into a copy of the serialized message; no re-serialization.
+
+    `render` patches one shared buffer, so every field in `field_offsets`
+    must be given on every call; otherwise a value from the previous render
+    would leak into this one.
+    """
+
+    __slots__ = ('message', 'blockhash_offset', 'field_offsets')
+
+    def __init__(self, message, blockhash_offset, field_offsets):
+        self.message = bytearray(message)
+        self.blockhash_offset = blockhash_offset
+        self.field_offsets = field_offsets
+
+    def render(self, blockhash, **fields):
+        if fields.keys() != self.field_offsets.keys():
+            raise ValueError(f"render needs exactly the fields {sorted(self.field_offsets)}, got {sorted(fields)}")
+        message = self.message
+        message[self.blockhash_offset:self.blockhash_offset + 32] = blockhash
+        for name, value in fields.items():
+            _U64.pack_into(message, self.field_offsets[name], value)
+        return bytes(message)
+
+
+def _compute_budget_instructions(unit_limit, unit_price=0):
+    return [
+        (_COMPUTE_BUDGET_PROGRAM, [], b"\x02" + _U32.pack(unit_limit)),
+        (_COMPUTE_BUDGET_PROGRAM, [], b"\x03" + _U64.pack(unit_price)),  # Unit price, patched per send
+    ]
+
+
+# Buy/sell builder with per-mint account and template caches
+class TransactionBuilder:
+    """
+    Builds signed pump.fun buy and sell transactions.
+
+    The first trade on a mint derives its PDAs/ATAs and serializes a
+    message template; every later trade copies the template, patches the
+    blockhash, amounts and priority fee, and signs. `prime()` moves the
+    first-trade work off the critical path using the accounts a decoded
+    create instruction already carries.
+    """
+
+    def __init__(self, signing_key, compute_unit_limit=DEFAULT_COMPUTE_UNIT_LIMIT, cache_size=4096):
+        self.signing_key = signing_key
+        self.payer = signing_key.public_key
+        self.compute_unit_limit = compute_unit_limit
+        self._accounts = TTLCache(maxsize=cache_size, ttl=24 * 3600)
+        self._templates = TTLCache(maxsize=cache_size, ttl=24 * 3600)
+
+    def accounts_for(self, mint):
+        accounts = self._accounts.get(mint)
+        if accounts is MISSING:
+            accounts = derive_mint_accounts(mint, self.payer)
+            self._accounts.put(mint, accounts)
+        return accounts
+
+    def prime(self, create_args):
+        """
+        Cache accounts and both templates for a mint from decode_create_instruction output
+        (its `mint`, `bondingCurve` and `associatedBondingCurve` entries).
+        """
+        mint = b58decode(create_args['mint'])
+        self._accounts.put(mint, MintAccounts(
+            mint,
+            b58decode(create_args['bondingCurve']),
+            b58decode(create_args['associatedBondingCurve']),
+            associated_token_address(self.payer, mint),
+        ))
+        self._template("buy", mint)
+        self._template("sell", mint)
+
+    def _instructions(self, kind, mint, amount=0, limit=0, priority_fee=0):
+        """Buy or sell instruction list; templates are compiled from it with zeroed amounts."""
+        a = self.accounts_for(mint)
+        instructions = _compute_budget_instructions(self.compute_unit_limit, priority_fee)
+        if kind == "buy":
+            # Idempotent ATA create so the first buy works without a separate setup transaction
+            instructions.append((_ASSOCIATED_TOKEN_PROGRAM, [
+                (self.payer, True, True), (a.associated_user, False, True), (self.payer, False, False),
+                (mint, False, False), (_SYSTEM_PROGRAM, False, False), (_TOKEN_PROGRAM, False, False),
+            ], b"\x01"))
+            accounts = [
+                (_GLOBAL, False, False), (_FEE_RECIPIENT, False, True), (mint, False, False),
+                (a.bonding_curve, False, True), (a.associated_bonding_curve, False, True),
+                (a.associated_user, False, True), (self.payer, True, True), (_SYSTEM_PROGRAM, False, False),
+                (_TOKEN_PROGRAM, False, False), (_RENT_SYSVAR, False, False),
+                (_EVENT_AUTHORITY, False, False), (_PUMP_FUN_PROGRAM, False, False),
+            ]
+        else:
+            accounts = [
+                (_GLOBAL, False, False), (_FEE_RECIPIENT, False, True), (mint, False, False),
+                (a.bonding_curve, False, True), (a.associated_bonding_curve, False, True),
+                (a.associated_user, False, True), (self.payer, True, True), (_SYSTEM_PROGRAM, False, False),
+                (_ASSOCIATED_TOKEN_PROGRAM, False, False), (_TOKEN_PROGRAM, False, False),
+                (_EVENT_AUTHORITY, False, False), (_PUMP_FUN_PROGRAM, False, False),
+            ]
+        discriminator = PUMP_FUN_DECODER[kind].discriminator
+        instructions.append((_PUMP_FUN_PROGRAM, accounts, discriminator + _U64.pack(amount) + _U64.pack(limit)))
+        return instructions
+
+    def _template(self, kind, mint):
+        key = (kind, mint)
+        template = self._templates.get(key)
+        if template is not MISSING:
+            return template
+        limit_field = "max_sol_cost" if kind == "buy" else "min_sol_output"
+        message, blockhash_offset, data_offsets = compile_message(self.payer, self._instructions(kind, mint))
+        template = MessageTemplate(message, blockhash_offset, {
+            "priority_fee": data_offsets[1] + 1,
+            "amount": data_offsets[-1] + 8,
+            limit_field: data_offsets[-1] + 16,
+        })
+        self._templates.put(key, template)
+        return template
+
+    def _sign(self, message):
+        return b"\x01" + self.signing_key.sign(message) + message
+
+    def build_buy(self, mint, amount, max_sol_cost, blockhash, priority_fee=0):
+        """Signed wire bytes buying `amount` raw tokens of `mint` (raw 32-byte key) for at most `max_sol_cost` lamports."""
+        with metrics.timed("tx_build_seconds"):
+            message = self._template("buy", mint).render(
+                blockhash, amount=amount, max_sol_cost=max_sol_cost, priority_fee=priority_fee)
+            return self._sign(message)
+
+    def build_sell(self, mint, amount, min_sol_output, blockhash, priority_fee=0):
+        """Signed wire bytes selling `amount` raw tokens of `mint` for at least `min_sol_output` lamports."""
+        with metrics.timed("tx_build_seconds"):
+            message = self._template("sell", mint).render(
+                blockhash, amount=amount, min_sol_output=min_sol_output, priority_fee=priority_fee)
+            return self._sign(message)
+
+
+def load_signing_key(path):
+    """Load a Solana CLI keypair file (JSON array of 64 bytes: seed then public key)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        secret = bytes(json.load(f))
+    key = ed25519.SigningKey(secret[:32])
+    if len(secret) == 64 and secret[32:] != key.public_key:
+        raise ValueError(f"Keypair file {path} has a mismatched public key")
+    return key
+
+
+async def _rpc_call(client, url, method, params):
+    response = await client.post(url, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    response.raise_for_status()
+    payload = response.json()
+    if "error" in payload:
+        raise RuntimeError(f"{method} failed on {url}: {payload['error']}")
+    return payload["result"]
+
+
+# Background-refreshed recent blockhash
+class BlockhashCache:
+    """Polls getLatestBlockhash every `refresh_interval` seconds so builds never wait on it."""
+
+    def __init__(self, rpc_urls, http_client=None, refresh_interval=BLOCKHASH_REFRESH_INTERVAL,
+                 max_age=BLOCKHASH_MAX_AGE, commitment="confirmed"):
+        self.rpc_urls = list(rpc_urls)
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.commitment = commitment
+        self._owns_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient(timeout=5)
+        self._blockhash = None
+        self._last_valid_block_height = None
+        self._fetched_at = 0.0
+        self._ready = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def wait_ready(self, timeout=10.0):
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def refresh(self):
+        for url in self.rpc_urls:
+            try:
+                result = await _rpc_call(self._http_client, url, "getLatestBlockhash",
+                                         [{"commitment": self.commitment}])
+            except Exception as e:
+                log.warning("blockhash refresh failed", url=url, error=repr(e))
+                continue
+            self._blockhash = b58decode(result["value"]["blockhash"])
+            self._last_valid_block_height = result["value"]["lastValidBlockHeight"]
+            self._fetched_at = time.monotonic()
+            self._ready.set()
+            return True
+        return False
+
+    async def _refresh_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def current(self):
+        """Latest blockhash (raw 32 bytes); raises if none is fresh enough to build on."""
+        if self._blockhash is None or time.monotonic() - self._fetched_at > self.max_age:
+            raise RuntimeError("No fresh blockhash available")
+        return self._blockhash
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._owns_client:
+            await self._http_client.aclose()
+
+
+# Parallel sendTransaction across endpoints
+class TransactionSender:
+    """
+    Sends the same signed transaction to every endpoint at once.
+
+    `send` returns as soon as one endpoint accepts it; the other requests
+    finish in the background (duplicates are harmless: same signature).
+    """
+
+    def __init__(self, rpc_urls, http_client=None, skip_preflight=True):
+        self.rpc_urls = list(rpc_urls)
+        self.skip_preflight = skip_preflight
+        self._owns_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient(timeout=5)
+        self._background = set()
+
+    async def send(self, transaction):
+        """Return the base58 signature once any endpoint accepts `transaction`; raise if all reject it."""
+        encoded = base64.b64encode(transaction).decode()
+        params = [encoded, {"encoding": "base64", "skipPreflight": self.skip_preflight, "maxRetries": 0}]
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(_rpc_call(self._http_client, url, "sendTransaction", params))
+                 for url in self.rpc_urls]
+        errors = []
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                signature = await next_done
+            except Exception as e:
+                errors.append(e)
+                continue
+            metrics.observe("tx_send_seconds", time.perf_counter() - started)
+            for task in tasks:
+                if not task.done():
+                    self._background.add(task)
+                    task.add_done_callback(self._finish_background)
+            return signature
+        metrics.inc("tx_send_errors")
+        raise RuntimeError(f"sendTransaction rejected by every endpoint: {errors}")
+
+    def _finish_background(self, task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.debug("late sendTransaction failed", error=repr(task.exception()))
+
+    async def close(self):
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        if self._owns_client:
+            await self._http_client.aclose()
+
+
+# Build/sign latency and end-to-end sends against local mock endpoints
+async def _benchmark(count=500, endpoints=2):
+    from mock_rpc import MockRpcServer
+
+    servers = [MockRpcServer() for _ in range(endpoints)]
+    for server in servers:
+        await server.start()
+    urls = [server.url for server in servers]
+    builder = TransactionBuilder(ed25519.SigningKey(os.urandom(32)))
+    blockhashes = BlockhashCache(urls, refresh_interval=0.2)
+    sender = TransactionSender(urls)
+    blockhashes.start()
+    await blockhashes.wait_ready()
+    try:
+        mints = [os.urandom(32) for _ in range(count)]
+
+        start = time.perf_counter()
+        for mint in mints:
+            builder.build_buy(mint, 1_000_000, 10_000_000, blockhashes.current())
+        cold = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        for i, mint in enumerate(mints):
+            builder.build_buy(mint, 1_000_000 + i, 10_000_000, blockhashes.current(), priority_fee=i)
+        warm = (time.perf_counter() - start) / count
+
+        message = builder._template("buy", mints[0]).render(blockhashes.current(), amount=1, max_sol_cost=1,
+                                                             priority_fee=0)
+        start = time.perf_counter()
+        for _ in range(count):
+            builder.signing_key.sign(message)
+        sign_only = (time.perf_counter() - start) / count
+
+        send_latencies = []
+        for mint in mints[:50]:
+            transaction = builder.build_sell(mint, 1_000_000, 1, blockhashes.current())
+            start = time.perf_counter()
+            signature = await sender.send(transaction)
+            send_latencies.append(time.perf_counter() - start)
+            assert signature == b58encode_cached(transaction[1:65])
+        await sender.close()
+        send_latencies.sort()
+
+        print(f"signer backend: {ed25519.BACKEND}")
+        print(f"cold build+sign (derive PDAs/ATAs, serialize): {cold * 1e3:.3f} ms")
+        print(f"warm build+sign (patch template):              {warm * 1e3:.3f} ms")
+        print(f"  of which signing:                            {sign_only * 1e3:.3f} ms")
+        print(f"send to {endpoints} mock endpoints: p50={send_latencies[len(send_latencies) // 2] * 1e3:.3f} ms "
+              f"accepted={[len(server.sent) for server in servers]}")
+    finally:
+        await blockhashes.close()
+        for server in servers:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
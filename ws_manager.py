@@ -0,0 +1,179 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+
+import websockets
+
+import metrics
+from structured_log import get_logger
+
+log = get_logger("ws")
+
+# Cheap dedup keys pulled straight from the raw frame text (no JSON parse)
+_SIGNATURE_RE = re.compile(r'"signature"\s*:\s*"([1-9A-HJ-NP-Za-km-z]+)"')
+_PUBKEY_RE = re.compile(r'"pubkey"\s*:\s*"([1-9A-HJ-NP-Za-km-z]+)"')
+_SLOT_RE = re.compile(r'"slot"\s*:\s*(\d+)')
+
+
+# Default dedup key: signature for logs, (pubkey, slot) for account updates
+def notification_key(frame):
+    """Return a dedup key for a notification frame, or None if it has none (e.g. subscribe acks)."""
+    if isinstance(frame, bytes):
+        frame = frame.decode('utf-8', 'replace')
+    match = _SIGNATURE_RE.search(frame)
+    if match:
+        return match.group(1)
+    pubkey = _PUBKEY_RE.search(frame)
+    slot = _SLOT_RE.search(frame)
+    if pubkey and slot:
+        return pubkey.group(1), int(slot.group(1))
+    return None
+
+
+# Fixed-capacity set that forgets its oldest keys
+class RingSet:
+    """Set of the last `capacity` keys; `add` is O(1) and reports whether the key was new."""
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self._keys = set()
+        self._order = deque()
+
+    def add(self, key):
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self._order.append(key)
+        if len(self._order) > self.capacity:
+            self._keys.discard(self._order.popleft())
+        return True
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# Per-endpoint connection counters
+class EndpointStats:
+    __slots__ = ('url', 'connected', 'reconnects', 'received', 'first_seen', 'duplicates')
+
+    def __init__(self, url):
+        self.url = url
+        self.connected = False
+        self.reconnects = 0
+        self.received = 0
+        self.first_seen = 0
+        self.duplicates = 0
+
+
+# Fan-in of the same subscription across several RPC websocket endpoints
+class ConnectionManager:
+    """
+    Keeps one subscribed connection per endpoint and merges their streams.
+
+    Every endpoint runs its own receive task; the first copy of each
+    notification (by `key_fn`) is delivered through `recv()` and later
+    copies from slower providers are dropped, so delivery latency is the
+    minimum across endpoints. A dropped connection reconnects with
+    exponential backoff and full jitter and calls `on_connect(ws)` again to
+    resubscribe; the other endpoints keep delivering meanwhile.
+    """
+
+    def __init__(self, endpoints, on_connect, key_fn=notification_key, dedup_capacity=65536,
+                 queue_size=10000, backoff_base=0.5, backoff_max=30.0, ping_interval=20, open_timeout=10):
+        if not endpoints:
+            raise ValueError("At least one websocket endpoint is required")
+        self.endpoints = list(endpoints)
+        self.on_connect = on_connect
+        self.key_fn = key_fn
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.ping_interval = ping_interval
+        self.open_timeout = open_timeout
+        self.endpoint_stats = {url: EndpointStats(url) for url in self.endpoints}
+        self._seen = RingSet(dedup_capacity)
+        self._queue = asyncio.Queue(queue_size)
+        self._tasks = []
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def start(self):
+        for url in self.endpoints:
+            self._tasks.append(asyncio.create_task(self._run_endpoint(url)))
+
+    async def recv(self):
+        """Next deduplicated frame from whichever endpoint delivered it first."""
+        received_at, frame = await self._queue.get()
+        if metrics.ENABLED:
+            metrics.histogram("ws_receive_seconds", "Time from socket read to hand-off to the pipeline").record_ns(
+                time.perf_counter_ns() - received_at)
+        return frame
+
+    def _offer(self, stats, frame):
+        received_at = time.perf_counter_ns()
+        stats.received += 1
+        metrics.inc("ws_frames")
+        key = self.key_fn(frame)
+        if key is not None and not self._seen.add(key):
+            stats.duplicates += 1
+            metrics.inc("ws_duplicates")
+            return
+        if key is not None:
+            stats.first_seen += 1
+        if self._queue.full():
+            # The consumer is behind; keep the newest data flowing
+            self._queue.get_nowait()
+            metrics.inc("ws_dropped")
+        self._queue.put_nowait((received_at, frame))
+
+    async def _run_endpoint(self, url):
+        stats = self.endpoint_stats[url]
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=self.ping_interval,
+                                              open_timeout=self.open_timeout) as ws:
+                    await self.on_connect(ws)
+                    stats.connected = True
+                    attempt = 0
+                    async for frame in ws:
+                        self._offer(stats, frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("websocket failed", url=url, error=repr(e))
+            stats.connected = False
+            stats.reconnects += 1
+            metrics.inc("ws_reconnects")
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            attempt += 1
+            log.info("reconnecting", url=url, delay=f"{delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def stats(self):
+        """Per-endpoint connection state, message counts and first-seen wins."""
+        return {
+            url: {
+                "connected": s.connected,
+                "reconnects": s.reconnects,
+                "received": s.received,
+                "first_seen": s.first_seen,
+                "duplicates": s.duplicates,
+            }
+            for url, s in self.endpoint_stats.items()
+        }
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()